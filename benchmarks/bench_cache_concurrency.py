@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Multi-process file cache stress benchmark
+
+Starts N processes on one cache directory. Each writes its own set of
+translations and repeatedly hits one shared translation, then flushes.
+Afterwards every written key must be present and the shared entry's
+use_count must equal the total number of hits - any lost update fails the
+run. Reports aggregate throughput as the writer count grows.
+
+Usage: python benchmarks/bench_cache_concurrency.py [--writers 1 2 4 8] [--operations N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlcli.storage.file_cache import FileCacheManager
+
+SHARED_REQUEST = 'show disk usage'
+
+
+def worker(cache_dir: str, writer: int, operations: int, start_event):
+    cache = FileCacheManager(cache_dir, max_memory_entries=50)
+    start_event.wait()
+    for i in range(operations):
+        cache.cache_translation(f'writer {writer} request {i}', 'linux', {'command': f'echo {writer} {i}'})
+        cache.get_cached_translation(SHARED_REQUEST, 'linux')
+    cache.force_save()
+
+
+def run(writers: int, operations: int) -> float:
+    """Return operations per second, raising AssertionError on lost updates"""
+    context = multiprocessing.get_context('fork')
+    with tempfile.TemporaryDirectory() as cache_dir:
+        seed = FileCacheManager(cache_dir)
+        seed.cache_translation(SHARED_REQUEST, 'linux', {'command': 'df -h'})
+        seed.close()
+
+        start_event = context.Event()
+        processes = [context.Process(target=worker, args=(cache_dir, n, operations, start_event))
+                     for n in range(writers)]
+        for process in processes:
+            process.start()
+        time.sleep(0.2)
+        start = time.perf_counter()
+        start_event.set()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        check = FileCacheManager(cache_dir)
+        missing = [(n, i) for n in range(writers) for i in range(operations)
+                   if check.log.get(check._get_input_hash(f'writer {n} request {i}', 'linux')) is None]
+        shared = check.log.get(check._get_input_hash(SHARED_REQUEST, 'linux'))
+        assert not missing, f"{len(missing)} lost writes"
+        assert shared['use_count'] == 1 + writers * operations, \
+            f"use_count {shared['use_count']}, expected {1 + writers * operations}"
+
+    return writers * operations * 2 / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--operations', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'writers':>8} {'ops/s':>10}  (write + shared hit per iteration, no lost updates)")
+    for writers in args.writers:
+        print(f"{writers:>8} {run(writers, args.operations):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+CLI cold-start benchmark
+
+Seeds a throwaway home directory with a populated translation cache and
+command history, then times one-shot `nlcli translate` runs in fresh
+interpreters: a query answered by the Level 2 command filter (which should
+never open the storage files) and a cache hit. Also reports in-process
+manager construction, which is lazy, against constructing and loading,
+and AITranslator construction against collecting its persistent context.
+
+Usage: python benchmarks/bench_cold_start.py [--entries N] [--history N] [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from nlcli.pipeline.ai_translator import AITranslator
+from nlcli.storage.file_cache import FileCacheManager
+from nlcli.storage.file_history import FileHistoryManager, HistoryEntry
+
+
+def seed(storage_dir: str, entries: int, history: int):
+    cache = FileCacheManager(storage_dir, flush_interval=0)
+    cache.put_many([(f'request number {i}', {'command': f'echo {i}', 'explanation': 'Print a number',
+                                             'confidence': 0.9}) for i in range(entries)], 'Linux')
+    cache.close()
+
+    history_manager = FileHistoryManager(storage_dir, max_entries=history)
+    history_manager.entries = [
+        HistoryEntry(id=i + 1, natural_language=f'request number {i}', command=f'echo {i}',
+                     explanation='Print a number', timestamp=1.7e9 + i, platform='Linux')
+        for i in reversed(range(history))
+    ]
+    history_manager.next_id = history + 1
+    history_manager.force_save()
+
+
+def run_cli(home: str, query: str, runs: int) -> float:
+    """Median milliseconds for `nlcli translate QUERY --explain-only` in a new interpreter"""
+    env = dict(os.environ, HOME=home, PYTHONPATH=ROOT)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'nlcli.cli.main', 'translate', query, '--explain-only'],
+                       env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def run_import(home: str, runs: int) -> float:
+    """Median milliseconds to start an interpreter and import the CLI"""
+    env = dict(os.environ, HOME=home, PYTHONPATH=ROOT)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import nlcli.cli.main'], env=env, check=False)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def timed_ms(function) -> float:
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=20000)
+    parser.add_argument('--history', type=int, default=1000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        storage_dir = os.path.join(home, '.nlcli')
+        os.makedirs(storage_dir)
+        seed(storage_dir, args.entries, args.history)
+
+        lazy_cache_ms = timed_ms(lambda: FileCacheManager(storage_dir).close())
+        eager_cache_ms = timed_ms(lambda: FileCacheManager(storage_dir).get_cache_stats())
+        lazy_history_ms = timed_ms(lambda: FileHistoryManager(storage_dir))
+        eager_history_ms = timed_ms(lambda: FileHistoryManager(storage_dir).get_statistics())
+        AITranslator(api_key=None, enable_cache=False)
+        lazy_translator_ms = timed_ms(lambda: AITranslator(api_key=None, enable_cache=False))
+        eager_translator_ms = timed_ms(lambda: AITranslator(api_key=None, enable_cache=False).persistent_context)
+
+        import_ms = run_import(home, args.runs)
+        level2_ms = run_cli(home, 'ls', args.runs)
+        cache_hit_ms = run_cli(home, 'request number 7', args.runs)
+
+    print(f"cache entries: {args.entries}, history entries: {args.history}, runs: {args.runs}")
+    print(f"FileCacheManager()        lazy {lazy_cache_ms:8.2f} ms   loaded {eager_cache_ms:8.2f} ms")
+    print(f"FileHistoryManager()      lazy {lazy_history_ms:8.2f} ms   loaded {eager_history_ms:8.2f} ms")
+    print(f"AITranslator()            lazy {lazy_translator_ms:8.2f} ms   context {eager_translator_ms:8.2f} ms")
+    print(f"interpreter + import:          {import_ms:8.1f} ms")
+    print(f"translate 'ls' (Level 2):      {level2_ms:8.1f} ms")
+    print(f"translate cache hit:           {cache_hit_ms:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
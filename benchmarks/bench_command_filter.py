@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Level 2 Command Filter benchmark
+
+Measures per-query latency of CommandFilter.get_pipeline_metadata at the
+shipped table size and with the command tables inflated 10x.
+
+Usage: python benchmarks/bench_command_filter.py [--queries N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlcli.pipeline.command_filter import CommandFilter
+
+
+def build_queries(command_filter: CommandFilter, count: int) -> list:
+    """Mix of exact hits, prefix hits and natural language misses"""
+    rng = random.Random(42)
+    keys = list(command_filter.direct_commands) + list(command_filter.direct_commands_with_args)
+    misses = ['find all log files', 'show me running processes', 'please list files',
+              'what is using port 8080', 'ls all hidden files', 'grep for errors in logs']
+    queries = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            queries.append(rng.choice(keys))
+        elif roll < 0.8:
+            queries.append(f"{rng.choice(keys)} ./some/path -v")
+        else:
+            queries.append(rng.choice(misses))
+    return queries
+
+
+def inflate(command_filter: CommandFilter, factor: int):
+    """Add synthetic commands so the tables are `factor` times larger"""
+    for table in (command_filter.direct_commands, command_filter.direct_commands_with_args):
+        for key, value in list(table.items()):
+            for n in range(1, factor):
+                table[f"{key}{n}"] = dict(value, command=f"{value['command']}{n}")
+    command_filter.rebuild_index()
+
+
+def run(command_filter: CommandFilter, queries: list) -> float:
+    """Return mean microseconds per query"""
+    lookup = command_filter.get_pipeline_metadata
+    start = time.perf_counter()
+    for query in queries:
+        lookup(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--queries', type=int, default=50000)
+    args = parser.parse_args()
+
+    for factor in (1, 10):
+        command_filter = CommandFilter()
+        if factor > 1:
+            inflate(command_filter, factor)
+        queries = build_queries(command_filter, args.queries)
+        run(command_filter, queries[:1000])  # warm up
+        total = len(command_filter.direct_commands) + len(command_filter.direct_commands_with_args)
+        print(f"{factor:>3}x tables ({total:>6} commands): {run(command_filter, queries):7.2f} us/query")
+
+
+if __name__ == '__main__':
+    main()
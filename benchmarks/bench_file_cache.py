@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+File cache benchmark
+
+Measures FileCacheManager write and file-hit latency on a cache with many
+entries, and the cost of the previous whole-file JSON read-merge-rewrite
+that every save and every file hit used to pay.
+
+Usage: python benchmarks/bench_file_cache.py [--entries N] [--operations N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlcli.storage.file_cache import FileCacheManager
+
+
+def populate(cache: FileCacheManager, count: int):
+    for i in range(count):
+        cache.cache_translation(f'request number {i}', 'linux',
+                                {'command': f'echo {i}', 'explanation': 'Print a number', 'confidence': 0.9})
+    cache.force_save()
+
+
+def timed(function, count: int) -> float:
+    """Return mean microseconds per call"""
+    start = time.perf_counter()
+    for i in range(count):
+        function(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=20000)
+    parser.add_argument('--operations', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        populate(FileCacheManager(cache_dir, max_memory_entries=10), args.entries)
+
+        # Fresh instance: empty memory layer, every lookup is a file hit
+        start = time.perf_counter()
+        cache = FileCacheManager(cache_dir, max_memory_entries=10)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        step = max(1, args.entries // args.operations)
+        hit_us = timed(lambda i: cache.get_cached_translation(f'request number {i * step}', 'linux'),
+                       args.operations)
+        write_us = timed(lambda i: cache.cache_translation(f'new request {i}', 'linux', {'command': 'ls'}),
+                         args.operations)
+
+        # Previous save path: load the whole JSON, merge, write it back
+        legacy_path = os.path.join(cache_dir, 'legacy.json')
+        with open(legacy_path, 'w') as f:
+            json.dump({key: value for key, value in cache.log.items()}, f, separators=(',', ':'))
+
+        def legacy_rewrite(i):
+            with open(legacy_path) as f:
+                data = json.load(f)
+            data[f'key{i}'] = {'command': 'ls'}
+            with open(legacy_path, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+
+        legacy_us = timed(legacy_rewrite, min(args.operations, 20))
+
+    print(f"entries: {args.entries}, log size: {cache.log.size_bytes / 1024:.0f} KB")
+    print(f"open:                     {open_ms:10.1f} ms")
+    print(f"file hit:                 {hit_us:10.1f} us")
+    print(f"write (append):           {write_us:10.1f} us")
+    print(f"legacy JSON rewrite:      {legacy_us:10.1f} us")
+
+
+if __name__ == '__main__':
+    main()
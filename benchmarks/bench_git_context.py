@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Git context benchmark
+
+Creates a throwaway repository with N tracked files (some modified, some
+untracked) and times a GitContextManager refresh against the previous
+sequence of separate git calls for branch, upstream, ahead/behind and
+status, the cost of a cached lookup when no git metadata changed, and
+reading the branch from .git against `git branch --show-current`.
+
+Usage: python benchmarks/bench_git_context.py [--files N] [--runs N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlcli.context.git_context import GitContextManager
+
+
+def git(repo: str, *args: str):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+
+def make_repository(repo: str, files: int):
+    git(repo, 'init', '-q', '-b', 'main')
+    git(repo, 'config', 'user.email', 'bench@example.com')
+    git(repo, 'config', 'user.name', 'bench')
+    for i in range(files):
+        with open(os.path.join(repo, f'file{i}.txt'), 'w') as f:
+            f.write(f'{i}\n')
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', 'initial')
+    for i in range(0, files, 10):
+        with open(os.path.join(repo, f'file{i}.txt'), 'a') as f:
+            f.write('changed\n')
+    for i in range(10):
+        with open(os.path.join(repo, f'new{i}.txt'), 'w') as f:
+            f.write('new\n')
+
+
+def previous_refresh(manager: GitContextManager, repo: str):
+    """One git process per field, as before"""
+    branch = manager._run_git_command(['branch', '--show-current'], repo)[1]
+    remote_branch = manager._run_git_command(['config', '--get', f'branch.{branch}.merge'], repo)[1]
+    manager.get_ahead_behind_count(repo, branch, remote_branch)
+    manager.get_repository_status(repo)
+
+
+def timed_ms(function, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        function()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        make_repository(repo, args.files)
+        manager = GitContextManager()
+        manager.current_directory = repo
+
+        single_ms = timed_ms(lambda: manager.get_repository_state(force_refresh=True), args.runs)
+        previous_ms = timed_ms(lambda: previous_refresh(manager, repo), args.runs)
+        manager.get_repository_state()
+        cached_ms = timed_ms(manager.get_repository_state, args.runs * 100)
+        head_ms = timed_ms(lambda: manager.get_head_state(repo), args.runs * 10)
+        branch_ms = timed_ms(lambda: manager._run_git_command(['branch', '--show-current'], repo), args.runs)
+        state = manager.get_repository_state(force_refresh=True)
+
+    print(f"files: {args.files}, branch: {state.current_branch}, "
+          f"unstaged: {len(state.unstaged_files)}, untracked: {len(state.untracked_files)}")
+    print(f"single status call:       {single_ms:8.1f} ms")
+    print(f"separate git calls:       {previous_ms:8.1f} ms")
+    print(f"cached, unchanged:        {cached_ms:8.3f} ms")
+    print(f"branch from .git:         {head_ms:8.3f} ms")
+    print(f"git branch subprocess:    {branch_ms:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+History write benchmark
+
+Measures FileHistoryManager.add_command on a full history, where each
+command is appended to the journal, against the previous behaviour of
+rewriting the whole history file after every command.
+
+Usage: python benchmarks/bench_history.py [--entries N] [--operations N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlcli.storage.file_history import FileHistoryManager
+
+
+def timed(function, count: int) -> float:
+    """Return mean microseconds per call"""
+    start = time.perf_counter()
+    for i in range(count):
+        function(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=10000)
+    parser.add_argument('--operations', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as history_dir:
+        manager = FileHistoryManager(history_dir, max_entries=args.entries)
+        for i in range(args.entries):
+            manager.add_command(f'request number {i}', f'echo {i}', 'Print a number', True)
+        manager.force_save()
+
+        # Stay below max_entries journal records so no compaction runs
+        journal_us = timed(lambda i: manager.add_command(f'new request {i}', 'ls', 'List files', True),
+                           args.operations)
+
+        def rewrite(i):
+            manager.add_command(f'rewrite request {i}', 'ls', 'List files', True)
+            manager.force_save()
+
+        rewrite_us = timed(rewrite, min(args.operations, 50))
+
+        start = time.perf_counter()
+        loaded = FileHistoryManager(history_dir, max_entries=args.entries)
+        count = len(loaded.entries)
+        load_ms = (time.perf_counter() - start) * 1000
+
+    print(f"entries: {args.entries}")
+    print(f"add_command (journal):    {journal_us:10.1f} us")
+    print(f"add_command + rewrite:    {rewrite_us:10.1f} us")
+    print(f"load ({count} entries):     {load_ms:10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
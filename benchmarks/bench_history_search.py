@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+History search benchmark
+
+Builds the history search index over N synthetic commands and compares
+query latency with the previous lowercase-and-scan of every entry, for
+common, rare and missing queries. With --sqlite the same queries also run
+against the SQLite history backend (FTS5 trigram index).
+
+Usage: python benchmarks/bench_history_search.py [--entries N] [--queries N] [--words] [--sqlite]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlcli.storage.file_history import HistoryEntry
+from nlcli.storage.history_index import HistorySearchIndex
+from nlcli.storage.sqlite_history import INSERT_COMMAND, SQLiteHistoryManager
+
+WORDS = ['git', 'status', 'push', 'list', 'files', 'docker', 'logs', 'kill', 'port', 'show', 'disk',
+         'usage', 'find', 'large', 'compress', 'folder', 'memory', 'network', 'restart', 'service']
+QUERIES = ['git', 'docker logs', 'kill port', 'compress folder 17', 'no such thing']
+
+
+def make_entries(count: int) -> list:
+    rng = random.Random(42)
+    entries = []
+    for i in range(count):
+        text = ' '.join(rng.choice(WORDS) for _ in range(3)) + f' {i % 1000}'
+        entries.append(HistoryEntry(id=i + 1, natural_language=text, command=text.replace(' ', '-'),
+                                    success=rng.random() > 0.2, timestamp=1.7e9 + i))
+    return entries
+
+
+def linear_search(entries: list, query: str, limit: int = 10) -> list:
+    """Previous implementation: newest first, stop at limit"""
+    query_lower = query.lower()
+    matches = []
+    for entry in reversed(entries):
+        if query_lower in entry.natural_language.lower() or query_lower in entry.command.lower():
+            matches.append(entry)
+            if len(matches) >= limit:
+                break
+    return matches
+
+
+def timed(function, count: int) -> float:
+    """Return mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--words', action='store_true', help='index words instead of trigrams')
+    parser.add_argument('--sqlite', action='store_true', help='also query the SQLite backend')
+    args = parser.parse_args()
+
+    entries = make_entries(args.entries)
+    index = HistorySearchIndex(use_trigrams=not args.words)
+    start = time.perf_counter()
+    index.add_all(entries)
+    build_s = time.perf_counter() - start
+
+    print(f"entries: {args.entries}, index: {'words' if args.words else 'trigrams'}, "
+          f"build: {build_s:.2f} s ({build_s / args.entries * 1e6:.1f} us per add)")
+    with tempfile.TemporaryDirectory() as db_dir:
+        sqlite_history = None
+        if args.sqlite:
+            sqlite_history = SQLiteHistoryManager(os.path.join(db_dir, 'history.db'))
+            conn = sqlite_history._conn()
+            with conn:
+                conn.executemany(INSERT_COMMAND, [
+                    (e.natural_language, e.command, '', int(e.success), e.timestamp, '', '') for e in entries
+                ])
+
+        print(f"{'query':<22}{'index us':>12}{'scan us':>12}" + (f"{'sqlite us':>12}" if args.sqlite else ''))
+        for query in QUERIES:
+            index_us = timed(lambda: index.search(query), args.queries)
+            scan_us = timed(lambda: linear_search(entries, query), max(1, args.queries // 10))
+            line = f"{query:<22}{index_us:12.1f}{scan_us:12.1f}"
+            if sqlite_history is not None:
+                line += f"{timed(lambda: sqlite_history.search_commands(query), args.queries):12.1f}"
+            print(line)
+
+        if sqlite_history is not None:
+            sqlite_history.close()
+
+
+if __name__ == '__main__':
+    main()
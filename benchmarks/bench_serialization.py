@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Serializer benchmark
+
+Saves and loads N cache and history entries as a single table, the way the
+history file is written, comparing the previous asdict + json.dump path with
+the binary serializer. Also reports per-record encode/decode as used by the
+cache log, and the on-disk size of each format.
+
+Usage: python benchmarks/bench_serialization.py [--entries N]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlcli.storage.file_cache import CacheEntry
+from nlcli.storage.file_history import HistoryEntry
+from nlcli.storage.serialization import get_serializer
+
+REQUESTS = ['list files', 'show disk usage', 'find large files', 'check memory', 'show running processes',
+            'compress folder', 'what is my ip', 'git status', 'kill process on port 8080', 'count lines']
+
+
+def make_entries(record_class, count: int) -> list:
+    rng = random.Random(42)
+    entries = []
+    for i in range(count):
+        request = f'{rng.choice(REQUESTS)} {i % 500}'
+        if record_class is CacheEntry:
+            entries.append(CacheEntry(command=f'echo {i}', explanation=f'Explains {request}', confidence=0.9,
+                                      created_at=1.7e9 + i, last_used=1.7e9 + i, use_count=rng.randint(1, 50),
+                                      platform='linux', source='ai'))
+        else:
+            entries.append(HistoryEntry(id=i + 1, natural_language=request, command=f'echo {i}',
+                                        explanation='', timestamp=1.7e9 + i, platform='Linux',
+                                        session_id='session-1'))
+    return entries
+
+
+def measure(record_class, entries: list, directory: str):
+    records = [entry.to_dict() for entry in entries]
+    rows = []
+    for name in ('json', 'binary'):
+        serializer = get_serializer(name, record_class)
+        path = os.path.join(directory, f'{record_class.__name__}{serializer.file_suffix}')
+
+        start = time.perf_counter()
+        with open(path, 'wb') as f:
+            f.write(serializer.dump_table([entry.to_dict() for entry in entries], {'next_id': len(entries)}))
+        save = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(path, 'rb') as f:
+            loaded, _ = serializer.load_table(f.read())
+        [record_class.from_dict(record) for record in loaded]
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        encoded = [serializer.dumps(record) for record in records]
+        encode = time.perf_counter() - start
+        start = time.perf_counter()
+        for data in encoded:
+            serializer.loads(data)
+        decode = time.perf_counter() - start
+
+        rows.append((name, save, load, os.path.getsize(path), sum(map(len, encoded)), encode, decode))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for record_class in (CacheEntry, HistoryEntry):
+            entries = make_entries(record_class, args.entries)
+            print(f"{record_class.__name__} x {args.entries}")
+            print(f"  {'format':8} {'save ms':>9} {'load ms':>9} {'table KB':>9} {'records KB':>11} "
+                  f"{'encode ms':>10} {'decode ms':>10}")
+            for name, save, load, table, records, encode, decode in measure(record_class, entries, directory):
+                print(f"  {name:8} {save * 1000:9.0f} {load * 1000:9.0f} {table / 1024:9.0f} "
+                      f"{records / 1024:11.0f} {encode * 1000:10.0f} {decode * 1000:10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Level 4 typo corrector benchmark
+
+Compares per-query latency of PhoneticMatcher.match with the previous scan
+that recomputed the consonant skeleton of every variation on each query,
+and reports LevenshteinMatcher.match for reference.
+
+Usage: python benchmarks/bench_typo_corrector.py [--queries N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlcli.pipeline.simple_typo_corrector import LevenshteinMatcher, PhoneticMatcher, NON_LETTER_PATTERN
+
+
+def build_queries(count: int) -> list:
+    """Mix of exact phonetic variants, near misses and natural language"""
+    rng = random.Random(42)
+    exact = ['lyst', 'liss', 'see-dee', 'pees', 'fynd', 'zyp', 'copy', 'remove']
+    near = ['lsit', 'prcesses', 'kopy', 'remoove', 'dsk usge', 'secure shel', 'grp', 'pyngg']
+    misses = ['find all log files', 'show me running processes', 'what is using port 8080',
+              'compress the backup folder', 'delete temp files']
+    queries = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.3:
+            queries.append(rng.choice(exact))
+        elif roll < 0.7:
+            queries.append(rng.choice(near))
+        else:
+            queries.append(rng.choice(misses))
+    return queries
+
+
+def legacy_phonetic_match(matcher: PhoneticMatcher, text: str, threshold: float = 0.6):
+    """Scan every variation and recompute both skeletons, as before precomputation"""
+    text_clean = NON_LETTER_PATTERN.sub('', text.lower().strip())
+    if not text_clean:
+        return None
+    best_match = None
+    best_score = 0
+    for command, variations in matcher.phonetic_mappings.items():
+        for variation in variations:
+            score = matcher._phonetic_similarity(text_clean, variation)
+            if score > best_score and score >= threshold:
+                best_score = score
+                best_match = command
+    return best_match
+
+
+def run(lookup, queries: list) -> float:
+    """Return mean microseconds per query"""
+    start = time.perf_counter()
+    for query in queries:
+        lookup(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--queries', type=int, default=20000)
+    args = parser.parse_args()
+
+    queries = build_queries(args.queries)
+    phonetic = PhoneticMatcher()
+    levenshtein = LevenshteinMatcher()
+
+    benchmarks = [
+        ('phonetic (per-query skeletons)', lambda text: legacy_phonetic_match(phonetic, text)),
+        ('phonetic (precomputed keys)', phonetic.match),
+        ('levenshtein (deletion index)', levenshtein.match),
+    ]
+    for name, lookup in benchmarks:
+        run(lookup, queries[:1000])  # warm up
+        print(f"{name:<32}: {run(lookup, queries):7.2f} us/query")
+
+
+if __name__ == '__main__':
+    main()
@@ -52,14 +52,23 @@ def cli(ctx, config_path, verbose):
     # Initialize components
     config = ConfigManager(config_path)
     ctx.obj['config'] = config
-    ctx.obj['history'] = HistoryManager(config.get_db_path())
+    ctx.obj['history'] = HistoryManager(
+        config.get_db_path(),
+        backend=config.get('storage', 'history_backend', fallback='file') or 'file'
+    )
     # Initialize AI translator without requiring API key upfront
     try:
         api_key = config.get_openai_key()
         cache_setting = config.get('performance', 'enable_cache', fallback='true')
         ctx.obj['ai_translator'] = AITranslator(
             api_key=api_key,
-            enable_cache=cache_setting.lower() == 'true' if cache_setting else True
+            enable_cache=cache_setting.lower() == 'true' if cache_setting else True,
+            prompt_mode=config.get('ai', 'prompt_mode', fallback='compact'),
+            prompt_token_budget=config.get_int('ai', 'prompt_token_budget', fallback=800),
+            cache_ttl=config.get_float('performance', 'cache_ttl_seconds', fallback=604800.0) or None,
+            negative_cache_ttl=config.get_float('performance', 'negative_cache_ttl_seconds', fallback=60.0),
+            cache_flush_interval=config.get_float('performance', 'cache_flush_interval', fallback=1.0),
+            cache_flush_batch_size=config.get_int('performance', 'cache_flush_batch_size', fallback=64)
         )
     except Exception as e:
         # If initialization fails, create a limited translator that will prompt for API key when needed
@@ -91,6 +100,13 @@ def interactive_mode(obj):
     executor = obj['executor']
     config = obj['config']
 
+    # Warm the cache and history files while the user types the first command
+    if config.get_bool('performance', 'prefetch_storage', fallback=False):
+        if history:
+            history.prefetch()
+        if getattr(ai_translator, 'cache_manager', None):
+            ai_translator.cache_manager.prefetch()
+
     # Initialize enhanced persistent input handler
     config_dir = os.path.expanduser('~/.nlcli')
     os.makedirs(config_dir, exist_ok=True)
@@ -144,7 +160,18 @@ def interactive_mode(obj):
                     
                     # Step 2: Use context-driven translation
                     api_timeout = float(obj['config'].get('performance', 'api_timeout', fallback='8.0'))
-                    translation_result = ai_translator.translate(user_input, context=context, timeout=api_timeout)
+                    
+                    # Stream AI translations: preview and safety-check the command while the
+                    # explanation is still being generated
+                    early_safety = {}
+                    on_command = None
+                    if config.get_bool('performance', 'stream_ai', fallback=True):
+                        def on_command(streamed_command):
+                            early_safety[streamed_command] = safety_checker.check_command(streamed_command)
+                            console.print(f"[dim]→ {streamed_command}[/dim]")
+                    
+                    translation_result = ai_translator.translate(user_input, context=context, timeout=api_timeout,
+                                                                 on_command=on_command)
                     
                     # Calculate elapsed time for formatter display
                     elapsed = time.time() - start_time
@@ -166,8 +193,8 @@ def interactive_mode(obj):
                     }
                     formatter.format_command_result(result_data, elapsed)
                     
-                    # Safety check
-                    safety_result = safety_checker.check_command(command)
+                    # Safety check (reuse the result computed while streaming)
+                    safety_result = early_safety.get(command) or safety_checker.check_command(command)
                     
                     if not safety_result['safe']:
                         console.print(f"[red]⚠️  Safety Warning: {safety_result['reason']}[/red]")
@@ -5,9 +5,11 @@ Environment Context Manager for project type detection and environment variable
 import os
 import json
 import re
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Any
 from dataclasses import dataclass, field
+from .file_watch import ChangeWatcher
 from ..utils.utils import setup_logging
 
 logger = setup_logging()
@@ -47,7 +49,12 @@ class EnvironmentContextManager:
         self.current_directory = os.getcwd()
         self._cached_environment = None
         self._cache_timestamp = 0
-        self._cache_ttl = 60  # Cache for 60 seconds
+        self._cache_ttl = 60  # Upper bound; project file or variable changes invalidate sooner
+        self._cached_directory = None
+        self._environ_signature = None
+        self._watcher = None
+        # A collector that timed out may still be refreshing when the next one starts
+        self._environment_lock = threading.Lock()
         
         # Project type detection patterns
         self.project_indicators = {
@@ -107,6 +114,9 @@ class EnvironmentContextManager:
                 'frameworks': {}
             }
         }
+        
+        # Files whose contents (not just presence) feed the project environment
+        self.manifest_files = ['package.json', 'requirements.txt', 'pyproject.toml', 'Pipfile']
     
     def detect_project_type(self, directory: Optional[str] = None) -> str:
         """
@@ -251,6 +261,14 @@ class EnvironmentContextManager:
         
         return categories
     
+    def detect_environment_type(self) -> str:
+        """Deployment stage from NODE_ENV or ENVIRONMENT: development, production or testing"""
+        if os.getenv('NODE_ENV') == 'production' or os.getenv('ENVIRONMENT') == 'production':
+            return "production"
+        if os.getenv('NODE_ENV') == 'test' or os.getenv('ENVIRONMENT') == 'test':
+            return "testing"
+        return "development"
+    
     def parse_package_json(self, directory: Optional[str] = None) -> Dict[str, Any]:
         """Parse package.json for Node.js projects"""
         if directory is None:
@@ -313,6 +331,38 @@ class EnvironmentContextManager:
         
         return tools
     
+    def get_watched_paths(self, directory: Optional[str] = None) -> List[str]:
+        """
+        Files the project environment is derived from
+        
+        The directory itself changes whenever an entry is added or removed,
+        which covers the indicator and tool files; manifests whose contents
+        are read are watched individually.
+        """
+        if directory is None:
+            directory = self.current_directory
+        return [directory] + [os.path.join(directory, name) for name in self.manifest_files]
+    
+    def _cache_is_valid(self, current_time: float) -> bool:
+        """Cached environment is younger than the TTL and none of its inputs changed"""
+        if not self._cached_environment or current_time - self._cache_timestamp >= self._cache_ttl:
+            return False
+        if self._cached_directory != self.current_directory:
+            return False
+        if self._environ_signature != hash(frozenset(os.environ.items())):
+            return False
+        return not self._watcher.changed()
+    
+    def _watch_directory(self):
+        """Snapshot the inputs of the environment about to be computed"""
+        if self._watcher is None or self._cached_directory != self.current_directory:
+            if self._watcher is not None:
+                self._watcher.close()
+            self._watcher = ChangeWatcher(self.get_watched_paths())
+        self._watcher.reset()
+        self._cached_directory = self.current_directory
+        self._environ_signature = hash(frozenset(os.environ.items()))
+    
     def get_project_environment(self, force_refresh: bool = False) -> ProjectEnvironment:
         """
         Get comprehensive project environment with caching
@@ -327,81 +377,79 @@ class EnvironmentContextManager:
         
         current_time = time.time()
         
-        # Return cached environment if still valid
-        if (not force_refresh and 
-            self._cached_environment and 
-            current_time - self._cache_timestamp < self._cache_ttl):
-            return self._cached_environment
-        
-        # Detect project type and framework
-        project_type = self.detect_project_type()
-        framework = self.detect_framework(project_type)
-        
-        # Get project name from directory or package.json
-        project_name = Path(self.current_directory).name
-        if project_type == 'nodejs':
-            package_data = self.parse_package_json()
-            if package_data and 'name' in package_data:
-                project_name = package_data['name']
-        
-        # Scan environment variables
-        env_categories = self.scan_environment_variables()
-        
-        # Detect development tools
-        dev_tools = self.detect_development_tools()
-        
-        # Determine environment type
-        env_type = "development"
-        if os.getenv('NODE_ENV') == 'production' or os.getenv('ENVIRONMENT') == 'production':
-            env_type = "production"
-        elif os.getenv('NODE_ENV') == 'test' or os.getenv('ENVIRONMENT') == 'test':
-            env_type = "testing"
-        
-        # Extract database URL
-        database_url = None
-        for key, value in env_categories['database']:
-            if 'URL' in key.upper():
-                database_url = value
-                break
-        
-        # Create environment object
-        environment = ProjectEnvironment(
-            project_type=project_type,
-            project_name=project_name,
-            project_root=self.current_directory,
-            framework=framework,
-            language=project_type if project_type != 'unknown' else '',
-            environment_type=env_type,
-            database_url=database_url,
-            has_docker=dev_tools['docker'],
-            has_tests=dev_tools['tests'],
-            has_linting=dev_tools['linting'],
-            has_ci_cd=dev_tools['ci_cd']
-        )
-        
-        # Add package manager and scripts for Node.js
-        if project_type == 'nodejs':
-            package_data = self.parse_package_json()
-            if package_data:
-                environment.dependencies = package_data.get('dependencies', {})
-                environment.dev_dependencies = package_data.get('devDependencies', {})
-                environment.scripts = package_data.get('scripts', {})
-                
-                # Detect package manager
-                if Path(self.current_directory, 'yarn.lock').exists():
-                    environment.package_manager = 'yarn'
-                elif Path(self.current_directory, 'pnpm-lock.yaml').exists():
-                    environment.package_manager = 'pnpm'
-                else:
-                    environment.package_manager = 'npm'
-        
-        # Cache the environment
-        self._cached_environment = environment
-        self._cache_timestamp = current_time
-        
-        logger.debug(f"Environment context updated: {project_type} ({framework}) project")
-        
-        return environment
+        with self._environment_lock:
+            # Return cached environment if still valid
+            if not force_refresh and self._cache_is_valid(current_time):
+                return self._cached_environment
+            
+            # Snapshot the inputs first so changes made while reading are not missed
+            self._watch_directory()
+            
+            # Detect project type and framework
+            project_type = self.detect_project_type()
+            framework = self.detect_framework(project_type)
+            
+            # Get project name from directory or package.json
+            project_name = Path(self.current_directory).name
+            if project_type == 'nodejs':
+                package_data = self.parse_package_json()
+                if package_data and 'name' in package_data:
+                    project_name = package_data['name']
+            
+            # Scan environment variables
+            env_categories = self.scan_environment_variables()
+            
+            # Detect development tools
+            dev_tools = self.detect_development_tools()
+            
+            # Determine environment type
+            env_type = self.detect_environment_type()
+            
+            # Extract database URL
+            database_url = None
+            for key, value in env_categories['database']:
+                if 'URL' in key.upper():
+                    database_url = value
+                    break
+            
+            # Create environment object
+            environment = ProjectEnvironment(
+                project_type=project_type,
+                project_name=project_name,
+                project_root=self.current_directory,
+                framework=framework,
+                language=project_type if project_type != 'unknown' else '',
+                environment_type=env_type,
+                database_url=database_url,
+                has_docker=dev_tools['docker'],
+                has_tests=dev_tools['tests'],
+                has_linting=dev_tools['linting'],
+                has_ci_cd=dev_tools['ci_cd']
+            )
+            
+            # Add package manager and scripts for Node.js
+            if project_type == 'nodejs':
+                package_data = self.parse_package_json()
+                if package_data:
+                    environment.dependencies = package_data.get('dependencies', {})
+                    environment.dev_dependencies = package_data.get('devDependencies', {})
+                    environment.scripts = package_data.get('scripts', {})
+                    
+                    # Detect package manager
+                    if Path(self.current_directory, 'yarn.lock').exists():
+                        environment.package_manager = 'yarn'
+                    elif Path(self.current_directory, 'pnpm-lock.yaml').exists():
+                        environment.package_manager = 'pnpm'
+                    else:
+                        environment.package_manager = 'npm'
+            
+            # Cache the environment
+            self._cached_environment = environment
+            self._cache_timestamp = current_time
+            
+            logger.debug(f"Environment context updated: {project_type} ({framework}) project")
+            
+            return environment
     
     def suggest_environment_command(self, natural_language: str, env_context: Optional[ProjectEnvironment] = None) -> Optional[Dict]:
         """
@@ -0,0 +1,178 @@
+"""
+Change detection for the files a cached context was computed from
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..utils.utils import setup_logging
+
+logger = setup_logging()
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_MASK_ADD = 0x20000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+# Files are often replaced by rename, so watch their directory for entry changes too
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+HAS_INOTIFY = _libc is not None
+
+
+def stat_signature(paths: Iterable[str]) -> Tuple:
+    """(mtime_ns, size, inode) per path, None for missing paths"""
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size, st.st_ino))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class InotifyWatch:
+    """
+    Kernel change notifications for a set of files and directories (Linux).
+
+    Each file is watched through its parent directory, so replacing it by
+    rename is seen; a watched directory reports any entry being created,
+    deleted or renamed. Unrelated activity in a watched directory is
+    filtered out by name.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self._fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch descriptor -> names of interest, None for any entry
+        self._names: Dict[int, Optional[Set[str]]] = {}
+        try:
+            for path in paths:
+                if os.path.isdir(path):
+                    self._watch(path, None)
+                parent, name = os.path.split(os.path.abspath(path))
+                self._watch(parent, name)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch(self, directory: str, name: Optional[str]):
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK | IN_MASK_ADD)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        if wd in self._names and self._names[wd] is None:
+            return
+        if name is None:
+            self._names[wd] = None
+        else:
+            self._names.setdefault(wd, set()).add(name)
+
+    def changed(self) -> bool:
+        """True if a relevant event arrived since the last call"""
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+            position = 0
+            while position + EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, position)
+                position += EVENT_HEADER.size
+                name = data[position:position + length].rstrip(b'\0').decode('utf-8', 'replace')
+                position += length
+                if mask & (IN_Q_OVERFLOW | IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                    changed = True
+                    continue
+                names = self._names.get(wd)
+                if names is None or name in names:
+                    changed = True
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ChangeWatcher:
+    """
+    Tells whether any of a set of input files changed since ``reset()``.
+
+    Uses inotify where available, so an unchanged check costs one
+    non-blocking read; otherwise compares one stat per path. Call
+    ``reset()`` just before recomputing what depends on the files, so a
+    change made during the computation is still reported next time.
+    """
+
+    def __init__(self, paths: Iterable[str], use_inotify: bool = True):
+        self.paths: List[str] = list(paths)
+        self._signature: Optional[Tuple] = None
+        self._inotify: Optional[InotifyWatch] = None
+        if use_inotify and HAS_INOTIFY:
+            try:
+                self._inotify = InotifyWatch(self.paths)
+            except OSError as e:
+                logger.debug(f"inotify unavailable, using stat checks: {e}")
+
+    def reset(self):
+        """Remember the current state of the files"""
+        if self._inotify is not None:
+            self._inotify.changed()
+        self._signature = stat_signature(self.paths)
+
+    def changed(self) -> bool:
+        """True if a file changed, appeared or disappeared since reset()"""
+        if self._signature is None:
+            return True
+        if self._inotify is not None:
+            if not self._inotify.changed():
+                return False
+            self._signature = None
+            return True
+        if stat_signature(self.paths) != self._signature:
+            self._signature = None
+            return True
+        return False
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
@@ -4,10 +4,13 @@ Git Context Manager for repository awareness and intelligent Git command suggest
 
 import os
 import subprocess
+import threading
 import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
+from .file_watch import ChangeWatcher
+from .git_metadata import GitMetadataReader
 from ..utils.utils import setup_logging
 
 logger = setup_logging()
@@ -38,7 +41,11 @@ class GitContextManager:
         self.current_directory = os.getcwd()
         self._cached_state = None
         self._cache_timestamp = 0
-        self._cache_ttl = 30  # Cache for 30 seconds
+        self._cache_ttl = 30  # Upper bound; git metadata changes invalidate sooner
+        self._cached_directory = None
+        self._watcher = None
+        # A collector that timed out may still be refreshing when the next one starts
+        self._state_lock = threading.Lock()
     
     def find_git_repository(self, start_path: Optional[str] = None) -> Optional[str]:
         """
@@ -75,21 +82,15 @@ class GitContextManager:
             Tuple of (success, output)
         """
         try:
-            original_cwd = None
-            if repository_root:
-                original_cwd = os.getcwd()
-                os.chdir(repository_root)
-            
+            # cwd= instead of os.chdir, so concurrent callers don't race on the process cwd
             result = subprocess.run(
                 ['git'] + command,
+                cwd=repository_root,
                 capture_output=True,
                 text=True,
                 timeout=10
             )
             
-            if repository_root and original_cwd:
-                os.chdir(original_cwd)
-            
             success = result.returncode == 0
             output = result.stdout.strip() if success else result.stderr.strip()
             
@@ -104,11 +105,17 @@ class GitContextManager:
     
     def get_current_branch(self, repository_root: str) -> str:
         """Get current branch name"""
+        head = GitMetadataReader(repository_root).read_head()
+        if head is not None:
+            return head[0]
         success, output = self._run_git_command(['branch', '--show-current'], repository_root)
         return output if success else ""
     
     def get_remote_tracking_branch(self, repository_root: str, branch: str) -> str:
         """Get remote tracking branch for current branch"""
+        upstream = GitMetadataReader(repository_root).read_upstream(branch)
+        if upstream is not None:
+            return upstream[1]
         success, output = self._run_git_command(
             ['config', '--get', f'branch.{branch}.merge'], 
             repository_root
@@ -183,10 +190,161 @@ class GitContextManager:
             'has_untracked_files': len(untracked_files) > 0
         }
     
+    def get_status_snapshot(self, repository_root: str) -> Dict:
+        """
+        Branch, upstream, ahead/behind and file status from one git invocation
+        
+        Args:
+            repository_root: Repository root directory
+            
+        Returns:
+            Dictionary with the GitRepositoryState branch and file fields
+        """
+        success, output = self._run_git_command(
+            ['--no-optional-locks', 'status', '--porcelain=v2', '--branch', '-z'],
+            repository_root
+        )
+        return self.parse_porcelain_v2(output if success else '')
+    
+    @staticmethod
+    def parse_porcelain_v2(output: str) -> Dict:
+        """Parse `git status --porcelain=v2 --branch -z` output"""
+        snapshot = {
+            'current_branch': '',
+            'remote_branch': '',
+            'ahead_commits': 0,
+            'behind_commits': 0,
+            'staged_files': [],
+            'unstaged_files': [],
+            'untracked_files': []
+        }
+        
+        records = output.split('\0')
+        index = 0
+        while index < len(records):
+            record = records[index]
+            index += 1
+            if not record:
+                continue
+            
+            kind = record[0]
+            if kind == '#':
+                key, _, value = record[2:].partition(' ')
+                if key == 'branch.head' and value != '(detached)':
+                    snapshot['current_branch'] = value
+                elif key == 'branch.upstream':
+                    # origin/feature/x -> feature/x, as in branch.<name>.merge
+                    snapshot['remote_branch'] = value.split('/', 1)[-1]
+                elif key == 'branch.ab':
+                    ahead, behind = value.split()
+                    snapshot['ahead_commits'] = int(ahead)
+                    snapshot['behind_commits'] = -int(behind)
+                continue
+            
+            if kind == '?':
+                snapshot['untracked_files'].append(record[2:])
+                continue
+            
+            # Changed (1), renamed or copied (2, followed by the original path) and unmerged (u) entries
+            fields = {'1': 8, '2': 9, 'u': 10}.get(kind)
+            if fields is None:
+                continue
+            parts = record.split(' ', fields)
+            status, filename = parts[1], parts[-1]
+            if kind == '2':
+                index += 1
+            
+            if status[0] in 'MADRC':
+                snapshot['staged_files'].append(filename)
+            if status[1] in 'MD':
+                snapshot['unstaged_files'].append(filename)
+        
+        return snapshot
+    
+    def resolve_git_dirs(self, repository_root: str) -> Tuple[str, str]:
+        """Locate the git directory and the common directory holding refs"""
+        return GitMetadataReader.resolve_git_dirs(repository_root)
+    
+    def get_watched_paths(self, repository_root: str, state: GitRepositoryState) -> List[str]:
+        """
+        Files whose change means the cached repository state is stale
+        
+        HEAD, the index and the branch refs cover checkouts, staging, commits,
+        fetches and merges. The repository root catches files being created
+        or removed at the top level; edits deeper in the working tree leave
+        git metadata alone and are picked up when the cache TTL expires.
+        """
+        git_dir, common_dir = self.resolve_git_dirs(repository_root)
+        paths = [
+            repository_root,
+            os.path.join(git_dir, 'HEAD'),
+            os.path.join(git_dir, 'index'),
+            os.path.join(git_dir, 'MERGE_HEAD'),
+            os.path.join(common_dir, 'packed-refs'),
+            os.path.join(common_dir, 'FETCH_HEAD'),
+            os.path.join(common_dir, 'refs', 'heads'),
+            os.path.join(common_dir, 'refs', 'remotes')
+        ]
+        if state.current_branch:
+            paths.append(os.path.join(common_dir, 'refs', 'heads', state.current_branch))
+        if state.remote_branch:
+            remotes_dir = os.path.join(common_dir, 'refs', 'remotes')
+            try:
+                remotes = sorted(os.listdir(remotes_dir))
+            except OSError:
+                remotes = []
+            paths.extend(os.path.join(remotes_dir, remote, state.remote_branch) for remote in remotes)
+        return paths
+    
+    def _cache_is_valid(self, current_time: float) -> bool:
+        """Cached state is younger than the TTL and nothing it depends on changed"""
+        if not self._cached_state or current_time - self._cache_timestamp >= self._cache_ttl:
+            return False
+        if self._cached_directory != self.current_directory:
+            return False
+        return self._watcher is None or not self._watcher.changed()
+    
+    def _cache_state(self, state: GitRepositoryState, current_time: float):
+        """Cache the state and watch the files it was read from (caller holds _state_lock)"""
+        self._cached_state = state
+        self._cache_timestamp = current_time
+        self._cached_directory = self.current_directory
+        
+        paths = self.get_watched_paths(state.repository_root, state) if state.is_git_repo else []
+        if self._watcher is not None and self._watcher.paths == paths:
+            return
+        if self._watcher is not None:
+            self._watcher.close()
+        self._watcher = ChangeWatcher(paths) if paths else None
+        if self._watcher is not None:
+            self._watcher.reset()
+    
     def check_merge_conflict(self, repository_root: str) -> bool:
         """Check if repository is in merge conflict state"""
-        merge_head_file = Path(repository_root) / '.git' / 'MERGE_HEAD'
-        return merge_head_file.exists()
+        return GitMetadataReader(repository_root).in_merge()
+    
+    def get_head_state(self, repository_root: Optional[str] = None) -> GitRepositoryState:
+        """
+        Branch, upstream and merge state read from the .git directory
+        
+        Cheaper than get_repository_state: git is only started when the
+        metadata cannot be read directly, and file status and ahead/behind
+        counts are left empty.
+        """
+        if repository_root is None:
+            repository_root = self.find_git_repository()
+        if not repository_root:
+            return GitRepositoryState(is_git_repo=False)
+        
+        fields = GitMetadataReader(repository_root).read_state()
+        if fields is None:
+            branch = self.get_current_branch(repository_root)
+            fields = {
+                'current_branch': branch,
+                'remote_branch': self.get_remote_tracking_branch(repository_root, branch) if branch else '',
+                'in_merge_conflict': self.check_merge_conflict(repository_root)
+            }
+        return GitRepositoryState(is_git_repo=True, repository_root=repository_root, **fields)
     
     def get_repository_state(self, force_refresh: bool = False) -> GitRepositoryState:
         """
@@ -202,62 +360,52 @@ class GitContextManager:
         
         current_time = time.time()
         
-        # Return cached state if still valid
-        if (not force_refresh and 
-            self._cached_state and 
-            current_time - self._cache_timestamp < self._cache_ttl):
-            return self._cached_state
-        
-        # Find repository
-        repository_root = self.find_git_repository()
-        
-        if not repository_root:
-            state = GitRepositoryState(is_git_repo=False)
-            self._cached_state = state
-            self._cache_timestamp = current_time
+        with self._state_lock:
+            # Return cached state if still valid
+            if not force_refresh and self._cache_is_valid(current_time):
+                return self._cached_state
+            
+            # Snapshot the watched files first so changes made while reading are not missed
+            if self._watcher is not None:
+                self._watcher.reset()
+            
+            # Find repository
+            repository_root = self.find_git_repository()
+            
+            if not repository_root:
+                state = GitRepositoryState(is_git_repo=False)
+                self._cache_state(state, current_time)
+                return state
+            
+            # Branch, upstream, ahead/behind and file status in a single git call
+            snapshot = self.get_status_snapshot(repository_root)
+            
+            # Keep the branch fields read from .git if git status failed or timed out
+            if not snapshot['current_branch']:
+                head = GitMetadataReader(repository_root).read_state() or {}
+                snapshot['current_branch'] = head.get('current_branch', '')
+                snapshot['remote_branch'] = snapshot['remote_branch'] or head.get('remote_branch', '')
+            
+            # Check merge conflict
+            in_merge_conflict = self.check_merge_conflict(repository_root)
+            
+            # Create state object
+            state = GitRepositoryState(
+                is_git_repo=True,
+                has_staged_changes=bool(snapshot['staged_files']),
+                has_unstaged_changes=bool(snapshot['unstaged_files']),
+                has_untracked_files=bool(snapshot['untracked_files']),
+                in_merge_conflict=in_merge_conflict,
+                repository_root=repository_root,
+                **snapshot
+            )
+            
+            # Cache the state
+            self._cache_state(state, current_time)
+            
+            logger.debug(f"Git state updated: {state.current_branch}, {len(state.staged_files)} staged files")
+            
             return state
-        
-        # Get current branch
-        current_branch = self.get_current_branch(repository_root)
-        
-        # Get remote tracking branch
-        remote_branch = self.get_remote_tracking_branch(repository_root, current_branch)
-        
-        # Get ahead/behind count
-        ahead_commits, behind_commits = self.get_ahead_behind_count(
-            repository_root, current_branch, remote_branch
-        )
-        
-        # Get repository status
-        status_info = self.get_repository_status(repository_root)
-        
-        # Check merge conflict
-        in_merge_conflict = self.check_merge_conflict(repository_root)
-        
-        # Create state object
-        state = GitRepositoryState(
-            is_git_repo=True,
-            current_branch=current_branch,
-            remote_branch=remote_branch,
-            ahead_commits=ahead_commits,
-            behind_commits=behind_commits,
-            has_staged_changes=status_info['has_staged_changes'],
-            has_unstaged_changes=status_info['has_unstaged_changes'],
-            has_untracked_files=status_info['has_untracked_files'],
-            in_merge_conflict=in_merge_conflict,
-            staged_files=status_info['staged_files'],
-            unstaged_files=status_info['unstaged_files'],
-            untracked_files=status_info['untracked_files'],
-            repository_root=repository_root
-        )
-        
-        # Cache the state
-        self._cached_state = state
-        self._cache_timestamp = current_time
-        
-        logger.debug(f"Git state updated: {current_branch}, {len(status_info['staged_files'])} staged files")
-        
-        return state
     
     def suggest_git_command(self, natural_language: str, context_state: Optional[GitRepositoryState] = None) -> Optional[Dict]:
         """
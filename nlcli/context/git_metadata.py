@@ -0,0 +1,170 @@
+"""
+Reads branch, HEAD and merge state straight from the .git directory
+"""
+
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+OBJECT_ID = re.compile(r'^[0-9a-f]{40}([0-9a-f]{24})?$')
+SECTION = re.compile(r'^\[\s*([A-Za-z0-9.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]$')
+
+
+class GitMetadataReader:
+    """
+    Answers the questions a shell prompt asks without starting git.
+
+    Handles linked worktrees and submodules (a `.git` file with `gitdir:`),
+    loose refs and packed-refs. Anything this reader does not understand,
+    such as reftable storage or config includes, yields None so the caller
+    can fall back to running git.
+    """
+
+    def __init__(self, repository_root: str):
+        self.repository_root = repository_root
+        self.git_dir, self.common_dir = self.resolve_git_dirs(repository_root)
+
+    @staticmethod
+    def resolve_git_dirs(repository_root: str) -> Tuple[str, str]:
+        """
+        Locate the git directory and the common directory holding refs
+
+        Linked worktrees and submodules have a `.git` file pointing at their
+        git directory; worktrees share refs through its `commondir` file.
+        """
+        git_dir = os.path.join(repository_root, '.git')
+        if os.path.isfile(git_dir):
+            content = _read_text(git_dir)
+            if content and content.startswith('gitdir:'):
+                git_dir = os.path.normpath(os.path.join(repository_root, content[len('gitdir:'):].strip()))
+
+        common_dir = git_dir
+        relative = _read_text(os.path.join(git_dir, 'commondir'))
+        if relative:
+            common_dir = os.path.normpath(os.path.join(git_dir, relative))
+
+        return git_dir, common_dir
+
+    def read_head(self) -> Optional[Tuple[str, str]]:
+        """
+        Current branch and commit
+
+        Returns:
+            (branch, object id); branch is empty for a detached HEAD and the
+            object id is empty on an unborn branch. None if HEAD is unreadable.
+        """
+        if os.path.isdir(os.path.join(self.common_dir, 'reftable')):
+            return None
+        head = _read_text(os.path.join(self.git_dir, 'HEAD'))
+        if not head:
+            return None
+        if OBJECT_ID.match(head):
+            return '', head
+        if not head.startswith('ref:'):
+            return None
+
+        ref = head[len('ref:'):].strip()
+        branch = ref[len('refs/heads/'):] if ref.startswith('refs/heads/') else ''
+        return branch, self.resolve_ref(ref) or ''
+
+    def resolve_ref(self, ref: str) -> Optional[str]:
+        """Object id of a full ref name from loose refs or packed-refs"""
+        for _ in range(5):
+            value = _read_text(os.path.join(self.common_dir, *ref.split('/')))
+            if value is None:
+                return self._packed_refs().get(ref)
+            if not value.startswith('ref:'):
+                return value if OBJECT_ID.match(value) else None
+            ref = value[len('ref:'):].strip()
+        return None
+
+    def _packed_refs(self) -> Dict[str, str]:
+        refs = {}
+        content = _read_text(os.path.join(self.common_dir, 'packed-refs'))
+        for line in (content or '').splitlines():
+            # Comments and peeled tag lines (^oid) carry no ref name
+            if not line or line[0] in '#^':
+                continue
+            object_id, _, name = line.partition(' ')
+            refs[name] = object_id
+        return refs
+
+    def read_upstream(self, branch: str) -> Optional[Tuple[str, str]]:
+        """
+        Remote and remote branch the given branch tracks
+
+        Returns:
+            (remote, branch on the remote), empty strings when the branch has
+            no upstream, or None if the config could not be fully understood.
+        """
+        config = self._branch_config()
+        if config is None:
+            return None
+        settings = config.get(branch, {})
+        merge = settings.get('merge', '')
+        if merge.startswith('refs/heads/'):
+            merge = merge[len('refs/heads/'):]
+        return settings.get('remote', ''), merge
+
+    def _branch_config(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """`[branch "<name>"]` sections of the repository config"""
+        content = _read_text(os.path.join(self.common_dir, 'config'), strip=False)
+        if content is None:
+            return None
+
+        branches: Dict[str, Dict[str, str]] = {}
+        current = None
+        for raw_line in content.splitlines():
+            line = raw_line.strip()
+            if not line or line[0] in '#;':
+                continue
+            if line.startswith('['):
+                match = SECTION.match(line)
+                if not match:
+                    return None
+                section, subsection = match.group(1).lower(), match.group(2)
+                if section in ('include', 'includeif'):
+                    return None
+                current = None
+                if section == 'branch' and subsection is not None:
+                    current = branches.setdefault(subsection.replace('\\"', '"').replace('\\\\', '\\'), {})
+                continue
+            if current is None:
+                continue
+            key, _, value = line.partition('=')
+            value = re.split(r'\s[#;]', value, maxsplit=1)[0].strip().strip('"')
+            current[key.strip().lower()] = value
+        return branches
+
+    def in_merge(self) -> bool:
+        """True while a merge is in progress"""
+        return os.path.exists(os.path.join(self.git_dir, 'MERGE_HEAD'))
+
+    def read_state(self) -> Optional[Dict]:
+        """
+        Branch, upstream and merge fields of GitRepositoryState
+
+        Returns:
+            Dictionary of fields, or None if git has to be asked instead
+        """
+        head = self.read_head()
+        if head is None:
+            return None
+        branch = head[0]
+        upstream = self.read_upstream(branch) if branch else ('', '')
+        if upstream is None:
+            return None
+        return {
+            'current_branch': branch,
+            'remote_branch': upstream[1] if upstream[0] else '',
+            'in_merge_conflict': self.in_merge()
+        }
+
+
+def _read_text(path: str, strip: bool = True) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+    return content.strip() if strip else content
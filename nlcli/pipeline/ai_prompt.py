@@ -0,0 +1,159 @@
+"""
+Compact, cache-friendly prompts for the Level 6 OpenAI fallback
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+# Try to import tiktoken for exact token counts
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    tiktoken = None
+    HAS_TIKTOKEN = False
+
+
+# Static prefix: byte-identical on every request so provider-side prompt
+# caching can reuse it. Anything that varies belongs in the context suffix.
+COMPACT_SYSTEM_PROMPT = """You translate natural language requests into a single OS command for the user's system.
+Rules:
+- Use the context lines in the request to pick platform, shell and project appropriate variants.
+- Prefer the most common, safe and modern form; use relative paths unless asked otherwise.
+- Map file types to patterns ("python files" -> *.py, "log files" -> *.log, "config files" -> *.conf -o *.cfg).
+- Size: "large" -> +100M, "small" -> -1M. Time: "recent" -> -7 days, "old" -> +30 days.
+- Mark a command unsafe if it deletes data, changes system configuration, needs elevated privileges or affects network security.
+- For ambiguous requests choose the safest interpretation.
+Respond with JSON only, command first:
+{"command": "...", "explanation": "...", "confidence": 0.0-1.0, "safe": true, "reasoning": "..."}"""
+
+# Per-message framing overhead of the chat format
+MESSAGE_TOKEN_OVERHEAD = 4
+
+
+class TokenCounter:
+    """Counts prompt tokens with tiktoken when installed, otherwise estimates ~4 characters per token"""
+
+    def __init__(self, model: str = 'gpt-4o-mini'):
+        self.model = model
+        self.exact = False
+        self._encoding = None
+        if HAS_TIKTOKEN:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+                self.exact = True
+            except Exception:
+                self._encoding = None
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text"""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return math.ceil(len(text) / 4)
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """Number of prompt tokens for a list of chat messages"""
+        return sum(self.count(message['content']) + MESSAGE_TOKEN_OVERHEAD for message in messages)
+
+
+def context_lines(context: Optional[Dict[str, Any]]) -> List[str]:
+    """Compact context lines, most important first"""
+    if not context:
+        return []
+
+    git_context = context.get('git') or {}
+    env_context = context.get('environment') or {}
+    lines = []
+
+    platform_name = context.get('platform')
+    shell = context.get('shell')
+    if platform_name or shell:
+        lines.append(f"platform: {platform_name or 'unknown'}, shell: {shell or 'unknown'}")
+
+    directory = env_context.get('project_root') or context.get('current_directory')
+    if directory:
+        lines.append(f"cwd: {directory}")
+
+    project_type = env_context.get('project_type')
+    if project_type and project_type != 'unknown':
+        framework = env_context.get('framework')
+        if framework and framework != 'unknown':
+            lines.append(f"project: {project_type} ({framework})")
+        else:
+            lines.append(f"project: {project_type}")
+
+    if git_context.get('is_git_repo'):
+        changed = git_context.get('has_staged_changes') or git_context.get('has_unstaged_changes')
+        lines.append(f"git: branch {git_context.get('current_branch', 'unknown')}, "
+                     f"{'uncommitted changes' if changed else 'clean'}")
+
+    shell_features = context.get('shell_features')
+    if shell_features:
+        lines.append(f"shell features: {', '.join(shell_features)}")
+
+    available_commands = context.get('available_commands')
+    if isinstance(available_commands, dict):
+        names = sorted({name for names in available_commands.values() for name in names})
+    else:
+        names = sorted(available_commands or [])
+    if names:
+        lines.append(f"commands: {' '.join(names)}")
+
+    return lines
+
+
+class CompactPromptBuilder:
+    """
+    Builds a static system prefix plus a small dynamic user message.
+
+    Context lines are added in priority order until the token budget for the
+    whole prompt is used up; the request itself is always included.
+    """
+
+    def __init__(self, token_budget: int = 800, model: str = 'gpt-4o-mini'):
+        self.token_budget = token_budget
+        self.counter = TokenCounter(model)
+        self.static_tokens = self.counter.count(COMPACT_SYSTEM_PROMPT) + MESSAGE_TOKEN_OVERHEAD
+
+    def build(self, natural_language: str,
+              context: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """Return (messages, token usage) for a request"""
+        request_line = f'Request: "{natural_language}"'
+        request_tokens = self.counter.count(request_line) + MESSAGE_TOKEN_OVERHEAD
+        remaining = self.token_budget - self.static_tokens - request_tokens
+
+        included = []
+        candidates = context_lines(context)
+        # "Context:" header plus newline separators
+        header_tokens = self.counter.count('Context:\n')
+        for line in candidates:
+            line_tokens = self.counter.count(f"- {line}\n")
+            cost = line_tokens + (header_tokens if not included else 0)
+            if cost > remaining:
+                continue
+            included.append(f"- {line}")
+            remaining -= cost
+
+        if included:
+            user_prompt = 'Context:\n' + '\n'.join(included) + '\n' + request_line
+        else:
+            user_prompt = request_line
+        messages = [
+            {"role": "system", "content": COMPACT_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+
+        prompt_tokens = self.counter.count_messages(messages)
+        usage = {
+            'mode': 'compact',
+            'estimated_prompt_tokens': prompt_tokens,
+            'static_tokens': self.static_tokens,
+            'dynamic_tokens': prompt_tokens - self.static_tokens,
+            'token_budget': self.token_budget,
+            'context_lines': len(included),
+            'context_lines_dropped': len(candidates) - len(included),
+            'exact_count': self.counter.exact
+        }
+        return messages, usage
@@ -0,0 +1,174 @@
+"""
+Streaming support for the Level 6 OpenAI fallback
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class StreamingCommandParser:
+    """
+    Incremental scanner for a streamed JSON object.
+
+    Chunks of the model response are fed as they arrive. As soon as the
+    top-level string value of ``field`` is complete it is returned from
+    ``feed``, long before the rest of the object (explanation, reasoning)
+    has been generated. The full text is still parsed with ``json.loads``
+    once the stream ends.
+    """
+
+    def __init__(self, field: str = 'command'):
+        self.field = field
+        self.text = ''
+        self.command: Optional[str] = None
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key: Optional[str] = None
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Add a chunk, returns the field value the first time it becomes complete"""
+        self.text += chunk
+        if self.command is not None:
+            return None
+
+        text = self.text
+        for index in range(self._position, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._string_closed(index):
+                        self._position = index + 1
+                        return self.command
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in '{[':
+                self._depth += 1
+                self._expect_key = self._depth == 1 and char == '{'
+            elif char in '}]':
+                self._depth -= 1
+            elif self._depth == 1:
+                if char == ',':
+                    self._expect_key = True
+                elif char == ':':
+                    self._expect_key = False
+
+        self._position = len(text)
+        return None
+
+    def _string_closed(self, end: int) -> bool:
+        """Handle a completed top-level string, returns True if it is the field value"""
+        try:
+            value = json.loads(self.text[self._string_start:end + 1])
+        except ValueError:
+            return False
+        if self._expect_key:
+            self._key = value
+            return False
+        if self._key == self.field and self.command is None:
+            self.command = value
+            return True
+        return False
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """Parse the complete response"""
+        if not self.text:
+            return None
+        return json.loads(self.text)
+
+
+async def stream_json_completion(client, request: Dict[str, Any],
+                                 on_command: Optional[Callable[[str], None]] = None,
+                                 field: str = 'command',
+                                 on_usage: Optional[Callable[[Any], None]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Run a streaming chat completion that returns a JSON object.
+
+    Args:
+        client: AsyncOpenAI compatible client
+        request: Keyword arguments for chat.completions.create (without stream)
+        on_command: Called with the value of ``field`` as soon as it has streamed in
+        field: Top-level JSON field to report early
+        on_usage: Called with the token usage reported at the end of the stream
+
+    Returns:
+        Parsed JSON object, or None for an empty response
+    """
+    parser = StreamingCommandParser(field)
+    if on_usage is not None:
+        request = dict(request, stream_options={'include_usage': True})
+    stream = await client.chat.completions.create(stream=True, **request)
+    async for chunk in stream:
+        if on_usage is not None and getattr(chunk, 'usage', None) is not None:
+            on_usage(chunk.usage)
+        if not chunk.choices:
+            continue
+        content = chunk.choices[0].delta.content
+        if not content:
+            continue
+        command = parser.feed(content)
+        if command is not None and on_command:
+            on_command(command)
+    return parser.result()
+
+
+class EventLoopThread:
+    """
+    Background thread running one asyncio event loop.
+
+    The async OpenAI client keeps its connection pool bound to the loop it
+    was first used on, so all streaming requests are scheduled on the same
+    long-lived loop instead of a fresh ``asyncio.run`` per call. Works the
+    same whether or not the caller is already inside an event loop.
+    """
+
+    def __init__(self, name: str = 'nlcli-ai-stream'):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coroutine, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and wait for its result
+
+        Raises concurrent.futures.TimeoutError after timeout seconds and
+        cancels the coroutine.
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._ensure_started())
+        try:
+            return future.result(timeout=timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self):
+        """Stop the loop and join the thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout=1.0)
+            loop.close()
@@ -7,13 +7,18 @@ import os
 import platform
 import threading
 import time
+from collections import OrderedDict, deque
 from concurrent.futures import ThreadPoolExecutor, TimeoutError
-from openai import OpenAI
-from typing import Dict, Optional
+from openai import AsyncOpenAI, OpenAI
+from typing import Any, Callable, Dict, Optional, Tuple
 from rich.console import Console
 from rich.prompt import Prompt
 from ..utils.utils import get_platform_info, setup_logging
 from ..storage.cache_manager import CacheManager
+from ..storage.file_cache import get_input_hash
+from .ai_prompt import CompactPromptBuilder
+from .ai_stream import EventLoopThread, stream_json_completion
+from .single_flight import SingleFlight
 
 logger = setup_logging()
 console = Console()
@@ -21,8 +26,29 @@ console = Console()
 class AITranslator:
     """Handles natural language to OS command translation using OpenAI with caching and optimization"""
     
-    def __init__(self, api_key: Optional[str] = None, enable_cache: bool = True):
-        """Initialize AI translator with OpenAI API key and performance optimizations"""
+    # Working directories whose persistent context is kept
+    CONTEXT_MEMO_SIZE = 8
+    
+    # Level 6 failures worth remembering; a timeout or missing API key is
+    # transient and the next request should try again
+    NEGATIVE_CACHE_FAILURES = ('api_error', 'invalid_response')
+    
+    def __init__(self, api_key: Optional[str] = None, enable_cache: bool = True,
+                 prompt_mode: str = 'compact', prompt_token_budget: int = 800,
+                 cache_ttl: Optional[float] = 7 * 24 * 3600, negative_cache_ttl: float = 60.0,
+                 cache_flush_interval: float = 1.0, cache_flush_batch_size: int = 64):
+        """Initialize AI translator with OpenAI API key and performance optimizations
+        
+        Args:
+            api_key: OpenAI API key, defaults to OPENAI_API_KEY
+            enable_cache: Cache Level 6 translations
+            prompt_mode: 'compact' (static cacheable prefix plus budgeted context) or 'full'
+            prompt_token_budget: Maximum estimated prompt tokens in compact mode
+            cache_ttl: Seconds cached Level 4-6 results stay valid (None: until cleanup)
+            negative_cache_ttl: Seconds a failed Level 6 translation is remembered (0 disables)
+            cache_flush_interval: Seconds cache writes are buffered before the background flush
+            cache_flush_batch_size: Buffered cache writes that trigger an early flush
+        """
         
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.client = None
@@ -38,13 +64,34 @@ class AITranslator:
         
         # Performance optimizations
         self.enable_cache = enable_cache
-        self.cache_manager = CacheManager() if enable_cache else None
+        self.cache_manager = CacheManager(
+            flush_interval=cache_flush_interval, flush_batch_size=cache_flush_batch_size
+        ) if enable_cache else None
+        self.cache_ttl = cache_ttl
+        self.negative_cache_ttl = negative_cache_ttl
         self.executor = ThreadPoolExecutor(max_workers=2)
         
-        # Persistent context system
-        self.persistent_context = None
-        self.persistent_system_prompt = None
-        self.last_context_hash = None
+        # Streaming Level 6: async client is created on first use
+        self.async_client = None
+        self._stream_loop = EventLoopThread()
+        
+        # Prompt construction and per-request token accounting
+        self.prompt_mode = prompt_mode
+        self.prompt_builder = CompactPromptBuilder(prompt_token_budget)
+        self.prompt_token_log = deque(maxlen=100)
+        
+        # Concurrent identical Level 6 requests wait on one in-flight call
+        self.single_flight = SingleFlight()
+        # Why the last Level 6 call in this thread returned None
+        self._ai_failure = threading.local()
+        
+        # Persistent context system: collected on first use, memoized per working directory
+        self._persistent_context = None
+        self._persistent_system_prompt = None
+        self._last_context_hash = None
+        self._context_directory = None
+        self._context_memo = OrderedDict()
+        self._context_lock = threading.Lock()
         
         # Initialize Pipeline Components (Level 1-4) - Clean Architecture
         from .shell_adapter import ShellAdapter
@@ -61,14 +108,12 @@ class AITranslator:
         self.typo_corrector = SimpleTypoCorrector()
         self.command_selector = CommandSelector()
         
-        # Load persistent context from shell adapter
-        self._load_persistent_context()
-        
         # REMOVED: Hard-coded instant patterns - defeats the purpose of AI intelligence
         # Let semantic understanding and AI translation handle all natural language patterns
         self.instant_patterns = {}
         
-    def translate(self, natural_language: str, context: Optional[Dict] = None, timeout: float = 8.0) -> Optional[Dict]:
+    def translate(self, natural_language: str, context: Optional[Dict] = None, timeout: float = 8.0,
+                  on_command: Optional[Callable[[str], None]] = None) -> Optional[Dict]:
         """
         Translate natural language to OS command using provided context
         
@@ -76,6 +121,8 @@ class AITranslator:
             natural_language: User's natural language input
             context: Platform/shell context from shell_adapter (optional for backwards compatibility)
             timeout: Maximum time to wait for API response
+            on_command: Stream the Level 6 response and call this with the command
+                as soon as it arrives (runs on the streaming thread, keep it short)
             
         Returns:
             Dictionary containing command, explanation, and confidence
@@ -92,13 +139,26 @@ class AITranslator:
             level2_result = self.command_filter.get_pipeline_metadata(natural_language)
             if level2_result:
                 logger.debug(f"Level 2 (Command Filter): Direct match found")
-                return {**level2_result, 'cached': False, 'instant': True}
+                # Level 2 results are prebuilt and already flagged cached=False, instant=True
+                return level2_result
+            
+            # Read-through cache for Levels 4-6
+            platform_key = context.get('platform', 'unknown')
+            cached_result = self._get_cached_result(natural_language, platform_key)
+            if cached_result:
+                if cached_result.get('negative'):
+                    logger.debug(f"Cache: recent AI failure remembered, skipping Levels 4-6")
+                    return None
+                logger.debug(f"Cache: hit from {cached_result.get('cache_source')}")
+                return cached_result
             
             # Level 4: Typo Corrector - Simple typo correction (Levenshtein + Phonetic)
             level4_result = self.typo_corrector.get_pipeline_metadata(natural_language, context)
             if level4_result:
                 logger.debug(f"Level 4 (Typo Corrector): Typo correction found")
-                return {**level4_result, 'cached': False, 'instant': True}
+                result = {**level4_result, 'cached': False, 'instant': True}
+                self._store_cached_result(natural_language, platform_key, result)
+                return result
             
             # Level 5: Semantic Matcher - Intelligent Intent Classification
             try:
@@ -109,7 +169,9 @@ class AITranslator:
                 level5_result = self._semantic_matcher.get_pipeline_metadata(natural_language, context)
                 if level5_result:
                     logger.debug(f"Level 5 (Semantic Matcher): Intent classified")
-                    return {**level5_result, 'cached': False, 'instant': True}
+                    result = {**level5_result, 'cached': False, 'instant': True}
+                    self._store_cached_result(natural_language, platform_key, result)
+                    return result
             except ImportError:
                 logger.debug("Semantic Matcher not available")
             except Exception as e:
@@ -117,16 +179,7 @@ class AITranslator:
             
             # Level 6: AI Translation - OpenAI fallback
             logger.debug(f"Level 6 (AI Translation): Using OpenAI fallback")
-            api_result = self._translate_with_ai(natural_language, timeout, context)
-            
-            # Cache the result for future use
-            if api_result and self.cache_manager:
-                platform_key = context.get('platform', 'unknown')
-                self.cache_manager.cache_translation(
-                    natural_language, platform_key, api_result
-                )
-            
-            return api_result
+            return self._translate_with_ai_coalesced(natural_language, timeout, context, on_command)
             
         except Exception as e:
             logger.error(f"AI translation error: {str(e)}")
@@ -273,29 +326,106 @@ class AITranslator:
         
         return explanations.get(cmd, f'Executes the {cmd} command')
     
+    @property
+    def persistent_context(self) -> Optional[Dict]:
+        """Context from the ShellAdapter, collected on first use"""
+        self._ensure_context()
+        return self._persistent_context
+    
+    @persistent_context.setter
+    def persistent_context(self, value: Optional[Dict]):
+        self._persistent_context = value
+        self._context_directory = self._working_directory()
+    
+    @property
+    def persistent_system_prompt(self) -> Optional[str]:
+        """Full-mode system prompt built from the persistent context"""
+        self._ensure_context()
+        return self._persistent_system_prompt
+    
+    @persistent_system_prompt.setter
+    def persistent_system_prompt(self, value: Optional[str]):
+        self._persistent_system_prompt = value
+        self._context_directory = self._working_directory()
+    
+    @property
+    def last_context_hash(self) -> Optional[str]:
+        """Hash of the persistent context, ties Level 6 cache entries to it"""
+        self._ensure_context()
+        return self._last_context_hash
+    
+    @last_context_hash.setter
+    def last_context_hash(self, value: Optional[str]):
+        self._last_context_hash = value
+        self._context_directory = self._working_directory()
+    
+    def _working_directory(self) -> str:
+        try:
+            return os.getcwd()
+        except OSError:
+            # Working directory was removed
+            return self.shell_adapter.current_directory
+    
+    def _ensure_context(self) -> bool:
+        """
+        Make the persistent context match the working directory
+        
+        Nothing is collected until Level 6 or another caller needs the
+        context; directories already seen reuse their memoized context.
+        
+        Returns:
+            True if the context was collected by this call
+        """
+        directory = self._working_directory()
+        if self._context_directory == directory:
+            return False
+        
+        with self._context_lock:
+            if self._context_directory == directory:
+                return False
+            
+            self.shell_adapter.set_current_directory(directory)
+            memo = self._context_memo.get(directory)
+            if memo is not None:
+                self._context_memo.move_to_end(directory)
+                self._persistent_context, self._last_context_hash, self._persistent_system_prompt = memo
+            else:
+                self._load_persistent_context()
+                self._remember_context(directory)
+            self._context_directory = directory
+            return memo is None
+    
+    def _remember_context(self, directory: str):
+        """Memoize the current persistent context for a working directory"""
+        self._context_memo[directory] = (self._persistent_context, self._last_context_hash,
+                                         self._persistent_system_prompt)
+        self._context_memo.move_to_end(directory)
+        while len(self._context_memo) > self.CONTEXT_MEMO_SIZE:
+            self._context_memo.popitem(last=False)
+    
     def _load_persistent_context(self):
-        """Load persistent context from ShellAdapter - called once at initialization"""
+        """Load persistent context from ShellAdapter - called on first use"""
         try:
             # Get comprehensive context from shell adapter
-            self.persistent_context = self.shell_adapter.get_enhanced_context()
+            self._persistent_context = self.shell_adapter.get_enhanced_context()
             
             # Create hash of context for change detection
             import hashlib
             # Convert any unhashable types to strings for JSON serialization
-            hashable_context = self._make_hashable(self.persistent_context)
+            hashable_context = self._make_hashable(self._persistent_context)
             context_str = json.dumps(hashable_context, sort_keys=True)
-            self.last_context_hash = hashlib.md5(context_str.encode()).hexdigest()
+            self._last_context_hash = hashlib.md5(context_str.encode()).hexdigest()
             
             # Create persistent system prompt with all context
             self._create_persistent_system_prompt()
             
-            logger.debug(f"Persistent context loaded: platform={self.persistent_context.get('platform')}, "
-                        f"git_repo={self.persistent_context.get('git', {}).get('is_git_repo')}, "
-                        f"project_type={self.persistent_context.get('environment', {}).get('project_type')}")
+            logger.debug(f"Persistent context loaded: platform={self._persistent_context.get('platform')}, "
+                        f"git_repo={self._persistent_context.get('git', {}).get('is_git_repo')}, "
+                        f"project_type={self._persistent_context.get('environment', {}).get('project_type')}")
             
         except Exception as e:
             logger.warning(f"Failed to load persistent context: {e}")
-            self.persistent_context = {}
+            self._persistent_context = {}
             self._create_persistent_system_prompt()
     
     def _make_hashable(self, obj):
@@ -314,24 +444,24 @@ class AITranslator:
     def _create_persistent_system_prompt(self):
         """Create comprehensive system prompt with all persistent context"""
         
-        if not self.persistent_context:
+        if not self._persistent_context:
             # Fallback system prompt
-            self.persistent_system_prompt = """
+            self._persistent_system_prompt = """
             You are an expert system administrator assistant that translates natural language requests into OS commands.
             Provide clear, safe, and appropriate commands for the user's system.
             """
             return
         
         # Extract context information
-        platform = self.persistent_context.get('platform', 'unknown')
-        shell = self.persistent_context.get('shell', 'unknown')
-        available_commands = self.persistent_context.get('available_commands', [])
-        git_context = self.persistent_context.get('git', {})
-        env_context = self.persistent_context.get('environment', {})
-        shell_features = self.persistent_context.get('shell_features', [])
+        platform = self._persistent_context.get('platform', 'unknown')
+        shell = self._persistent_context.get('shell', 'unknown')
+        available_commands = self._persistent_context.get('available_commands', [])
+        git_context = self._persistent_context.get('git', {})
+        env_context = self._persistent_context.get('environment', {})
+        shell_features = self._persistent_context.get('shell_features', [])
         
         # Build rich context-aware system prompt with enhanced natural language understanding
-        self.persistent_system_prompt = f"""
+        self._persistent_system_prompt = f"""
         You are an expert system administrator assistant that translates natural language requests into OS commands.
         You have persistent awareness of the user's environment and should leverage this context for intelligent command translation.
         
@@ -420,6 +550,10 @@ class AITranslator:
     def _refresh_context_if_needed(self):
         """Refresh persistent context if environment has changed"""
         try:
+            if self._ensure_context():
+                # Collected just now
+                return False
+            
             current_context = self.shell_adapter.get_enhanced_context()
             
             # Create hash of current context
@@ -429,11 +563,13 @@ class AITranslator:
             current_hash = hashlib.md5(context_str.encode()).hexdigest()
             
             # If context changed, refresh it
-            if current_hash != self.last_context_hash:
+            if current_hash != self._last_context_hash:
                 logger.debug("Context changed, refreshing persistent context")
-                self.persistent_context = current_context
-                self.last_context_hash = current_hash
-                self._create_persistent_system_prompt()
+                with self._context_lock:
+                    self._persistent_context = current_context
+                    self._last_context_hash = current_hash
+                    self._create_persistent_system_prompt()
+                    self._remember_context(self._context_directory)
                 return True
             
             return False
@@ -493,120 +629,281 @@ class AITranslator:
             console.print("[red]AI translation will be unavailable.[/red]")
             return False
     
-    def _translate_with_ai(self, natural_language: str, timeout: float, context: Optional[Dict] = None) -> Optional[Dict]:
-        """Perform AI translation with timeout using persistent context"""
+    def _translate_with_ai_coalesced(self, natural_language: str, timeout: float, context: Dict,
+                                     on_command: Optional[Callable[[str], None]] = None) -> Optional[Dict]:
+        """Level 6 with single-flight: concurrent identical requests share one API call
+        
+        Requests are identified by the same normalized hash the translation cache uses.
+        """
+        platform_key = context.get('platform', 'unknown')
+        
+        def api_call():
+            self._ai_failure.reason = None
+            api_result = self._translate_with_ai(natural_language, timeout, context, on_command)
+            
+            # Cache the result (or a lasting failure) for future use, tied to the context it was made for
+            if api_result:
+                self._store_cached_result(natural_language, platform_key, api_result,
+                                          context_hash=self.last_context_hash or '')
+            elif self.negative_cache_ttl and self._ai_failure.reason in self.NEGATIVE_CACHE_FAILURES:
+                self._store_cached_result(natural_language, platform_key, {},
+                                          context_hash=self.last_context_hash or '', negative=True)
+            return api_result
+        
+        try:
+            api_result, coalesced = self.single_flight.do(
+                get_input_hash(natural_language, platform_key), api_call, timeout=timeout
+            )
+        except TimeoutError:
+            logger.warning(f"AI translation timeout after {timeout} seconds (waiting for identical request)")
+            return None
+        
+        if coalesced and api_result:
+            logger.debug(f"Level 6 (AI Translation): Coalesced with in-flight request")
+            # Private copy so callers never share a mutable result
+            api_result = {**api_result, 'coalesced': True}
+            if on_command is not None:
+                on_command(api_result['command'])
+        return api_result
+    
+    def _get_cached_result(self, natural_language: str, platform_key: str) -> Optional[Dict]:
+        """Look up a cached Level 4-6 result valid for the current context"""
+        if not self.cache_manager:
+            return None
+        try:
+            cached = self.cache_manager.get_cached_translation(
+                # Only context dependent (Level 6) entries make the context get collected
+                natural_language, platform_key, context_hash=lambda: self.last_context_hash
+            )
+        except Exception as e:
+            logger.warning(f"Cache lookup failed: {e}")
+            return None
+        if not cached:
+            return None
+        return {**cached, 'cached': True, 'instant': True}
+    
+    def _store_cached_result(self, natural_language: str, platform_key: str, result: Dict,
+                             context_hash: str = '', negative: bool = False):
+        """Store a Level 4-6 result (or a Level 6 failure) in the translation cache
+        
+        Level 4 and 5 results only depend on the input, so they are stored without
+        a context hash; Level 6 results are invalidated when the context changes.
+        """
+        if not self.cache_manager:
+            return
+        try:
+            self.cache_manager.cache_translation(
+                natural_language, platform_key, result, context_hash=context_hash,
+                ttl=self.negative_cache_ttl if negative else self.cache_ttl, negative=negative
+            )
+        except Exception as e:
+            logger.warning(f"Cache store failed: {e}")
+    
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """How many Level 6 calls were coalesced with an identical in-flight request"""
+        return self.single_flight.get_stats()
+    
+    def _translate_with_ai(self, natural_language: str, timeout: float, context: Optional[Dict] = None,
+                           on_command: Optional[Callable[[str], None]] = None) -> Optional[Dict]:
+        """Perform AI translation with timeout using persistent context
+        
+        With on_command the response is streamed and on_command receives the
+        command as soon as it has been generated, before the explanation.
+        """
         
         # Check if we have a valid client, if not try to prompt for API key
         if not self.client:
             if not self._prompt_for_api_key():
+                self._ai_failure.reason = 'no_client'
                 return None
         
         # Refresh context if needed (lightweight check)
         self._refresh_context_if_needed()
         
-        def api_call():
-            # Use persistent system prompt with rich context
-            system_prompt = self.persistent_system_prompt or self._create_system_prompt(context)
-            
-            # Create enhanced user prompt with natural language analysis
-            user_prompt = f"""
-            Translate this natural language request to an OS command:
-            "{natural_language}"
-            
-            INTELLIGENT PATTERN RECOGNITION:
-            1. **Intent Recognition**: Identify the core intent (find, show, list, check, etc.)
-            2. **Object Identification**: What is the user looking for? (files, processes, status, etc.)
-            3. **Parameter Extraction**: Recognize file types, modifiers, scopes automatically
-            4. **Pattern Understanding**: Automatically understand common patterns like:
-               - "find [all] [type] files" → find . -name "*.EXT"
-               - "show [thing]" → appropriate display command
-               - "list [scope] [objects]" → appropriate listing command
-               - "check/show [system component]" → appropriate status command
-            
-            AUTOMATIC FILE TYPE RECOGNITION:
-            - html/HTML files → *.html
-            - css/CSS files → *.css  
-            - javascript/JS files → *.js
-            - python/py files → *.py
-            - log files → *.log (or *.log -o *.out -o *.err for comprehensive)
-            - text files → *.txt
-            - config files → *.conf -o *.config -o *.cfg
-            - Any file type mentioned → *.EXT (where EXT is the file extension)
-            
-            SMART PATTERN VARIATIONS:
-            - Recognize "all", "every", "any" as comprehensive search modifiers
-            - Understand size qualifiers: "large" → +100M, "small" → -1M
-            - Understand time qualifiers: "recent" → -7 days, "old" → +30 days
-            
-            CONTEXT-DRIVEN TRANSLATION:
-            - Leverage the rich system context provided in your system instructions
-            - Consider project type, git status, platform, and available commands
-            - Choose command variants that make sense for this specific environment
-            - Reference context factors in your reasoning
-            
-            RESPONSE REQUIREMENTS:
-            Provide JSON with this exact format:
-            {{
-                "command": "context-optimized OS command",
-                "explanation": "detailed explanation referencing environmental context",
-                "confidence": 0.95,
-                "safe": true,
-                "reasoning": "detailed reasoning using available environmental context",
-                "context_used": ["specific context factors that influenced this decision"],
-                "alternatives": "other valid approaches if applicable"
-            }}
-            
-            Remember: You have persistent awareness of this environment. Use it to provide smarter, more relevant command translations.
-            """
-            
-            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-            # do not change this unless explicitly requested by the user
-            if not self.client:
-                return None
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Using mini for faster response
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1,  # Lower temperature for faster, more deterministic responses
-                max_tokens=600   # Increased tokens for detailed context-aware explanations
-            )
-            
-            content = response.choices[0].message.content
-            if content is None:
-                return None
-            return json.loads(content)
-        
         try:
-            # Execute API call with timeout
-            future = self.executor.submit(api_call)
-            result = future.result(timeout=timeout)
-            
-            # Check if result is None
-            if result is None:
-                logger.error("AI response was None")
-                return None
+            if on_command is not None and self._get_async_client() is not None:
+                # Stream on the shared event loop, command is reported early
+                request, usage = self._build_ai_request(natural_language, context)
+                result = self._stream_loop.run(
+                    stream_json_completion(self.async_client, request, on_command,
+                                           on_usage=lambda reported: self._record_api_usage(usage, reported)),
+                    timeout=timeout
+                )
+            else:
+                # Execute blocking API call with timeout
+                future = self.executor.submit(self._complete_with_ai, natural_language, context)
+                result = future.result(timeout=timeout)
             
-            # Add performance metadata
-            result['cached'] = False
-            result['instant'] = False
-            
-            # Validate required fields
-            if not all(key in result for key in ['command', 'explanation']):
-                logger.error("AI response missing required fields")
-                return None
-                
-            return result
+            final_result = self._finalize_ai_result(result)
+            if final_result is None:
+                self._ai_failure.reason = 'invalid_response'
+            return final_result
             
         except TimeoutError:
             logger.warning(f"AI translation timeout after {timeout} seconds")
+            self._ai_failure.reason = 'timeout'
             return None
         except Exception as e:
             logger.error(f"AI translation error: {str(e)}")
+            self._ai_failure.reason = 'api_error'
             return None
     
+    def _build_ai_request(self, natural_language: str, context: Optional[Dict] = None) -> Tuple[Dict, Dict]:
+        """Build chat completion arguments for a translation request
+        
+        Returns:
+            (request kwargs, token usage entry recorded in prompt_token_log)
+        """
+        if self.prompt_mode == 'compact':
+            messages, usage = self.prompt_builder.build(natural_language, self.persistent_context or context)
+        else:
+            messages = self._build_full_messages(natural_language, context)
+            usage = {
+                'mode': 'full',
+                'estimated_prompt_tokens': self.prompt_builder.counter.count_messages(messages),
+                'token_budget': None
+            }
+        self.prompt_token_log.append(usage)
+        logger.debug(f"AI prompt: {usage['estimated_prompt_tokens']} estimated tokens ({usage['mode']} mode)")
+        
+        # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+        # do not change this unless explicitly requested by the user
+        request = {
+            'model': "gpt-4o-mini",  # Using mini for faster response
+            'messages': messages,
+            'response_format': {"type": "json_object"},
+            'temperature': 0.1,  # Lower temperature for faster, more deterministic responses
+            'max_tokens': 600   # Increased tokens for detailed context-aware explanations
+        }
+        return request, usage
+    
+    def _build_full_messages(self, natural_language: str, context: Optional[Dict] = None) -> list:
+        """Original verbose prompt with the persistent system prompt"""
+        # Use persistent system prompt with rich context
+        system_prompt = self.persistent_system_prompt or self._create_system_prompt(context)
+        
+        # Create enhanced user prompt with natural language analysis
+        user_prompt = f"""
+        Translate this natural language request to an OS command:
+        "{natural_language}"
+        
+        INTELLIGENT PATTERN RECOGNITION:
+        1. **Intent Recognition**: Identify the core intent (find, show, list, check, etc.)
+        2. **Object Identification**: What is the user looking for? (files, processes, status, etc.)
+        3. **Parameter Extraction**: Recognize file types, modifiers, scopes automatically
+        4. **Pattern Understanding**: Automatically understand common patterns like:
+           - "find [all] [type] files" → find . -name "*.EXT"
+           - "show [thing]" → appropriate display command
+           - "list [scope] [objects]" → appropriate listing command
+           - "check/show [system component]" → appropriate status command
+        
+        AUTOMATIC FILE TYPE RECOGNITION:
+        - html/HTML files → *.html
+        - css/CSS files → *.css  
+        - javascript/JS files → *.js
+        - python/py files → *.py
+        - log files → *.log (or *.log -o *.out -o *.err for comprehensive)
+        - text files → *.txt
+        - config files → *.conf -o *.config -o *.cfg
+        - Any file type mentioned → *.EXT (where EXT is the file extension)
+        
+        SMART PATTERN VARIATIONS:
+        - Recognize "all", "every", "any" as comprehensive search modifiers
+        - Understand size qualifiers: "large" → +100M, "small" → -1M
+        - Understand time qualifiers: "recent" → -7 days, "old" → +30 days
+        
+        CONTEXT-DRIVEN TRANSLATION:
+        - Leverage the rich system context provided in your system instructions
+        - Consider project type, git status, platform, and available commands
+        - Choose command variants that make sense for this specific environment
+        - Reference context factors in your reasoning
+        
+        RESPONSE REQUIREMENTS:
+        Provide JSON with this exact format:
+        {{
+            "command": "context-optimized OS command",
+            "explanation": "detailed explanation referencing environmental context",
+            "confidence": 0.95,
+            "safe": true,
+            "reasoning": "detailed reasoning using available environmental context",
+            "context_used": ["specific context factors that influenced this decision"],
+            "alternatives": "other valid approaches if applicable"
+        }}
+        
+        Remember: You have persistent awareness of this environment. Use it to provide smarter, more relevant command translations.
+        """
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _complete_with_ai(self, natural_language: str, context: Optional[Dict] = None) -> Optional[Dict]:
+        """Blocking chat completion, run on the executor"""
+        if not self.client:
+            return None
+        request, usage = self._build_ai_request(natural_language, context)
+        response = self.client.chat.completions.create(**request)
+        self._record_api_usage(usage, getattr(response, 'usage', None))
+        
+        content = response.choices[0].message.content
+        if content is None:
+            return None
+        return json.loads(content)
+    
+    def _record_api_usage(self, usage: Dict, reported: Any):
+        """Store the prompt token counts reported by the API next to the estimate"""
+        prompt_tokens = getattr(reported, 'prompt_tokens', None)
+        if not isinstance(prompt_tokens, int):
+            return
+        usage['prompt_tokens'] = prompt_tokens
+        details = getattr(reported, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', None)
+        if isinstance(cached_tokens, int):
+            usage['cached_prompt_tokens'] = cached_tokens
+    
+    def get_prompt_stats(self) -> Dict[str, Any]:
+        """Token usage of recent Level 6 prompts"""
+        entries = list(self.prompt_token_log)
+        reported = [entry for entry in entries if 'prompt_tokens' in entry]
+        return {
+            'mode': self.prompt_mode,
+            'token_budget': self.prompt_builder.token_budget,
+            'requests': len(entries),
+            'avg_estimated_prompt_tokens': round(
+                sum(entry['estimated_prompt_tokens'] for entry in entries) / len(entries), 1) if entries else 0.0,
+            'prompt_tokens': sum(entry['prompt_tokens'] for entry in reported),
+            'cached_prompt_tokens': sum(entry.get('cached_prompt_tokens', 0) for entry in reported),
+            'last': dict(entries[-1]) if entries else None
+        }
+    
+    def _get_async_client(self):
+        """Lazily create the async client used for streaming"""
+        if self.async_client is None and self.api_key:
+            try:
+                self.async_client = AsyncOpenAI(api_key=self.api_key)
+            except Exception as e:
+                logger.warning(f"Failed to initialize async OpenAI client: {e}")
+        return self.async_client
+    
+    def _finalize_ai_result(self, result: Optional[Dict]) -> Optional[Dict]:
+        """Validate an AI response and add performance metadata"""
+        # Check if result is None
+        if result is None:
+            logger.error("AI response was None")
+            return None
+        
+        # Add performance metadata
+        result['cached'] = False
+        result['instant'] = False
+        
+        # Validate required fields
+        if not all(key in result for key in ['command', 'explanation']):
+            logger.error("AI response missing required fields")
+            return None
+            
+        return result
+    
     def _create_system_prompt(self, context: Optional[Dict] = None) -> str:
         """Create system prompt based on context"""
         
@@ -6,6 +6,33 @@ Direct command execution without fuzzy matching or translation
 import platform
 from typing import Dict, List, Optional, Any
 
+from .command_index import CommandTrie, FrozenResult, KeywordMatcher, LEVEL2_RESULT_FIELDS
+
+
+# Indicator vocabularies for _is_valid_command_syntax, compiled once per process
+STRONG_NATURAL_LANGUAGE_INDICATORS = KeywordMatcher([
+    'please', 'can you', 'could you', 'would you', 'help me',
+    'show me', 'tell me', 'i want', 'i need', 'how do i'
+])
+FIND_NATURAL_LANGUAGE_WORDS = KeywordMatcher([
+    'all', 'log', 'logs', 'files', 'python', 'javascript',
+    'large', 'small', 'recent', 'old', 'config', 'text'
+])
+LS_NATURAL_LANGUAGE_WORDS = KeywordMatcher(['all', 'files', 'hidden', 'details', 'directory'])
+PS_NATURAL_LANGUAGE_WORDS = KeywordMatcher(['all', 'processes', 'running', 'memory', 'cpu'])
+GREP_NATURAL_LANGUAGE_WORDS = KeywordMatcher(['for', 'all', 'errors', 'in', 'files', 'text'])
+GENERIC_NATURAL_LANGUAGE_INDICATORS = KeywordMatcher([
+    'all', 'show', 'list', 'display', 'find', 'search', 'get', 'check', 'files',
+    'processes', 'running', 'memory', 'disk', 'space', 'status', 'history',
+    'large', 'small', 'recent', 'old', 'new', 'log', 'logs', 'config', 'text'
+])
+VALID_GIT_SUBCOMMANDS = frozenset([
+    'add', 'commit', 'push', 'pull', 'clone', 'status', 'log', 'diff',
+    'branch', 'checkout', 'merge', 'reset', 'init', 'remote', 'fetch', 'rebase'
+])
+VALID_PS_FLAGS = frozenset(['aux', 'ef', '-e', '-f', '-A', '-a', '-u', '-x'])
+
+
 class CommandFilter:
     """Level 2: Direct command recognition and execution"""
     
@@ -14,6 +41,17 @@ class CommandFilter:
         self.platform = platform.system().lower()
         self._load_direct_commands()
         self._load_intelligent_patterns()
+        self.rebuild_index()
+    
+    def rebuild_index(self):
+        """Compile the command tables into the Level 2 lookup trie
+        
+        Call again after mutating direct_commands, direct_commands_with_args
+        or intelligent_patterns at runtime.
+        """
+        self.command_index = CommandTrie.build(
+            self.direct_commands, self.direct_commands_with_args, self.intelligent_patterns
+        )
     
     def _load_direct_commands(self):
         """Load platform-specific direct command mappings"""
@@ -778,64 +816,39 @@ class CommandFilter:
         """
         user_input_lower = user_input.lower().strip()
         
-        # Check exact matches first
-        if user_input_lower in self.direct_commands:
-            result = self.direct_commands[user_input_lower].copy()
-            result['pipeline_level'] = 2
-            result['match_type'] = 'exact_command'
-            result['source'] = 'command_filter'
-            return result
-        
-        if user_input_lower in self.direct_commands_with_args:
-            result = self.direct_commands_with_args[user_input_lower].copy()
-            result['pipeline_level'] = 2
-            result['match_type'] = 'exact_command_with_args'
-            result['source'] = 'command_filter'
-            return result
-        
-        # Check basic intelligent patterns (exact command synonyms only)
-        if user_input_lower in self.intelligent_patterns:
-            mapped_command = self.intelligent_patterns[user_input_lower]
-            if mapped_command in self.direct_commands:
-                result = self.direct_commands[mapped_command].copy()
-                result['pipeline_level'] = 2
-                result['match_type'] = 'command_synonym'
-                result['source'] = 'command_filter'
-                result['explanation'] += ' (command synonym)'
-                return result
+        # Exact matches: one probe returns a shared, prebuilt read-only result
+        exact = self.command_index.get_exact(user_input_lower)
+        if exact is not None:
+            return exact
         
         # Conservative prefix matching - only for commands with valid syntax patterns
         # This prevents "find all log files" from matching "find" and blocking intent classification
         words = user_input_lower.split()
         if len(words) > 1:
-            # Try 2-word combinations first, then 1-word
-            for i in range(min(len(words), 3), 0, -1):  # Try up to 3 words, down to 1
-                base_cmd = " ".join(words[:i])
-                
+            # Single trie walk over up to 3 words, longest prefix tried first
+            for i, node in self.command_index.prefix_matches(words):
                 # Check in direct_commands
-                if base_cmd in self.direct_commands:
+                if node.direct is not None:
                     # Conservative validation: only match if arguments look like valid command syntax
-                    if self._is_valid_command_syntax(base_cmd, words[i:]):
+                    if self._is_valid_command_syntax(node.key, words[i:]):
                         # ONLY syntax validation and fixing - no semantic enhancement
                         validated_command = self._validate_and_fix_command(user_input.strip())
-                        result = self.direct_commands[base_cmd].copy()
-                        result['pipeline_level'] = 2
-                        result['match_type'] = 'prefix_command_match'
-                        result['source'] = 'command_filter'
-                        result['command'] = validated_command  # Use syntax-validated command only
-                        result['explanation'] += f' (matched base command: {base_cmd})'
-                        return result
+                        return FrozenResult(
+                            node.direct, **LEVEL2_RESULT_FIELDS,
+                            match_type='prefix_command_match',
+                            command=validated_command,  # Use syntax-validated command only
+                            explanation=node.direct['explanation'] + node.prefix_note
+                        )
                 
                 # Check in direct_commands_with_args
-                if base_cmd in self.direct_commands_with_args:
+                if node.with_args is not None:
                     # These are pre-validated patterns, so they're safer to match
-                    result = self.direct_commands_with_args[base_cmd].copy()
-                    result['pipeline_level'] = 2
-                    result['match_type'] = 'prefix_command_with_args_match'
-                    result['source'] = 'command_filter'
-                    result['command'] = user_input.strip()  # Keep original full command
-                    result['explanation'] += f' (matched base command: {base_cmd})'
-                    return result
+                    return FrozenResult(
+                        node.with_args, **LEVEL2_RESULT_FIELDS,
+                        match_type='prefix_command_with_args_match',
+                        command=user_input.strip(),  # Keep original full command
+                        explanation=node.with_args['explanation'] + node.prefix_note
+                    )
         
         # No exact match found at Level 2
         return None
@@ -884,14 +897,8 @@ class CommandFilter:
         
         args_str = " ".join(remaining_args).lower()
         
-        # Strong natural language indicators that definitely need AI translation
-        strong_natural_language_indicators = [
-            'please', 'can you', 'could you', 'would you', 'help me',
-            'show me', 'tell me', 'i want', 'i need', 'how do i'
-        ]
-        
         # Check for strong natural language indicators first
-        if any(indicator in args_str for indicator in strong_natural_language_indicators):
+        if STRONG_NATURAL_LANGUAGE_INDICATORS.search(args_str):
             return False
         
         # Command-specific conservative syntax patterns - Level 2 should only handle valid syntax
@@ -906,9 +913,7 @@ class CommandFilter:
                 return True
             
             # Block natural language patterns - these should go to semantic matcher
-            natural_language_words = ['all', 'log', 'logs', 'files', 'python', 'javascript', 
-                                    'large', 'small', 'recent', 'old', 'config', 'text']
-            if any(word in args_str for word in natural_language_words):
+            if FIND_NATURAL_LANGUAGE_WORDS.search(args_str):
                 return False  # Send to Level 5 semantic matcher
                 
             # Accept only if it looks like valid syntax
@@ -920,11 +925,7 @@ class CommandFilter:
             first_arg = remaining_args[0] if remaining_args else ""
             
             # Valid git subcommands
-            valid_git_subcommands = [
-                'add', 'commit', 'push', 'pull', 'clone', 'status', 'log', 'diff',
-                'branch', 'checkout', 'merge', 'reset', 'init', 'remote', 'fetch', 'rebase'
-            ]
-            return first_arg in valid_git_subcommands
+            return first_arg in VALID_GIT_SUBCOMMANDS
                 
         elif base_cmd == 'ls':
             # Conservative ls validation - only accept VALID ls syntax
@@ -937,7 +938,7 @@ class CommandFilter:
                 return True
                 
             # Block natural language - these should go to semantic matcher
-            if any(word in args_str for word in ['all', 'files', 'hidden', 'details', 'directory']):
+            if LS_NATURAL_LANGUAGE_WORDS.search(args_str):
                 return False  # Send to Level 5
                 
             return len(remaining_args) <= 2
@@ -948,12 +949,11 @@ class CommandFilter:
             first_arg = remaining_args[0] if remaining_args else ""
             
             # Valid ps flags
-            valid_ps_flags = ['aux', 'ef', '-e', '-f', '-A', '-a', '-u', '-x']
-            if first_arg in valid_ps_flags:
+            if first_arg in VALID_PS_FLAGS:
                 return True
                 
             # Block natural language
-            if any(word in args_str for word in ['all', 'processes', 'running', 'memory', 'cpu']):
+            if PS_NATURAL_LANGUAGE_WORDS.search(args_str):
                 return False  # Send to Level 5
                 
             return False
@@ -963,8 +963,7 @@ class CommandFilter:
             first_arg = remaining_args[0] if remaining_args else ""
             
             # Block natural language patterns
-            natural_language_words = ['for', 'all', 'errors', 'in', 'files', 'text']
-            if any(word in args_str for word in natural_language_words):
+            if GREP_NATURAL_LANGUAGE_WORDS.search(args_str):
                 return False  # Send to Level 5
             
             # Accept if first arg looks like a search pattern or flag
@@ -976,12 +975,7 @@ class CommandFilter:
             return False  # Complex commands should go to Level 5
             
         # Check for natural language indicators
-        natural_language_indicators = [
-            'all', 'show', 'list', 'display', 'find', 'search', 'get', 'check', 'files', 
-            'processes', 'running', 'memory', 'disk', 'space', 'status', 'history', 
-            'large', 'small', 'recent', 'old', 'new', 'log', 'logs', 'config', 'text'
-        ]
-        if any(word in args_str for word in natural_language_indicators):
+        if GENERIC_NATURAL_LANGUAGE_INDICATORS.search(args_str):
             return False  # Send to Level 5 semantic matcher
             
         return len(remaining_args) <= 2  # Very conservative
@@ -0,0 +1,159 @@
+"""
+Compiled lookup structures for the Level 2 Command Filter
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class FrozenResult(dict):
+    """
+    Read-only pipeline result shared between calls.
+
+    Subclasses dict so callers can keep using indexing, ``.get`` and ``**``
+    unpacking, but refuses in-place mutation because the same instance is
+    handed out for every hit. Use ``.copy()`` to get a private, mutable dict.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Level 2 results are shared and read-only; use .copy() to modify")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __reduce__(self):
+        return (FrozenResult, (dict(self),))
+
+
+# Fields every Level 2 result carries, including the flags AITranslator reports
+LEVEL2_RESULT_FIELDS = {
+    'pipeline_level': 2,
+    'source': 'command_filter',
+    'cached': False,
+    'instant': True,
+}
+
+
+class CommandTrieNode:
+    """Single token node of the command trie"""
+
+    __slots__ = ('children', 'parent', 'depth', 'key', 'direct', 'with_args', 'prefix_note')
+
+    def __init__(self, key: str = '', parent: Optional['CommandTrieNode'] = None):
+        self.children: Dict[str, 'CommandTrieNode'] = {}
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.key = key
+        self.direct: Optional[Dict[str, Any]] = None
+        self.with_args: Optional[Dict[str, Any]] = None
+        self.prefix_note = f' (matched base command: {key})'
+
+
+class CommandTrie:
+    """
+    Token trie over the Level 2 command tables.
+
+    Keys are split on whitespace so that "git   status" and "git status" walk
+    the same path. Exact lookups go through a single flat dict of prebuilt
+    FrozenResult objects that already encodes the precedence of the source
+    tables, so an exact hit allocates nothing.
+    """
+
+    EXACT_DIRECT = 'exact_command'
+    EXACT_WITH_ARGS = 'exact_command_with_args'
+    SYNONYM = 'command_synonym'
+
+    def __init__(self, max_prefix_words: int = 3):
+        self.max_prefix_words = max_prefix_words
+        self.root = CommandTrieNode()
+        self.exact: Dict[str, FrozenResult] = {}
+
+    @classmethod
+    def build(cls, direct_commands: Dict[str, Any], direct_commands_with_args: Dict[str, Any],
+              intelligent_patterns: Dict[str, str], max_prefix_words: int = 3) -> 'CommandTrie':
+        """Build a trie from the command filter tables"""
+        trie = cls(max_prefix_words)
+
+        # Insert in reverse precedence so higher priority tables win exact lookups
+        for synonym, target in intelligent_patterns.items():
+            if target in direct_commands:
+                entry = direct_commands[target]
+                trie.exact[synonym] = FrozenResult(
+                    entry, **LEVEL2_RESULT_FIELDS, match_type=cls.SYNONYM,
+                    explanation=entry['explanation'] + ' (command synonym)'
+                )
+        for key, value in direct_commands_with_args.items():
+            trie.exact[key] = FrozenResult(value, **LEVEL2_RESULT_FIELDS, match_type=cls.EXACT_WITH_ARGS)
+            trie._insert(key).with_args = value
+        for key, value in direct_commands.items():
+            trie.exact[key] = FrozenResult(value, **LEVEL2_RESULT_FIELDS, match_type=cls.EXACT_DIRECT)
+            trie._insert(key).direct = value
+
+        return trie
+
+    def _insert(self, key: str) -> CommandTrieNode:
+        node = self.root
+        path = []
+        for token in key.split():
+            path.append(token)
+            child = node.children.get(token)
+            if child is None:
+                child = node.children[token] = CommandTrieNode(' '.join(path), node)
+            node = child
+        return node
+
+    def get_exact(self, key: str) -> Optional[FrozenResult]:
+        """Return the prebuilt result for an exact key or None"""
+        return self.exact.get(key)
+
+    def prefix_matches(self, words: List[str]) -> Iterator[Tuple[int, CommandTrieNode]]:
+        """
+        Walk the trie once over the leading words.
+
+        Yields the terminal nodes passed on the way as (word_count, node),
+        longest prefix first, by following parent links back from the
+        deepest node reached, so no list is built per lookup.
+        """
+        root = node = self.root
+        for depth in range(min(len(words), self.max_prefix_words)):
+            child = node.children.get(words[depth])
+            if child is None:
+                break
+            node = child
+        while node is not root:
+            if node.direct is not None or node.with_args is not None:
+                yield node.depth, node
+            node = node.parent
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+
+class KeywordMatcher:
+    """
+    Substring matcher for a fixed set of indicator words.
+
+    Compiles the words into one alternation so a single C-level scan answers
+    "does any indicator occur in this text", the same semantics as
+    ``any(word in text for word in words)``.
+    """
+
+    __slots__ = ('words', '_pattern')
+
+    def __init__(self, words: Iterable[str]):
+        self.words = frozenset(words)
+        # Longest first so overlapping alternatives never shadow each other
+        ordered = sorted(self.words, key=len, reverse=True)
+        self._pattern = re.compile('|'.join(re.escape(word) for word in ordered)) if ordered else None
+
+    def search(self, text: str) -> bool:
+        """Return True if any indicator occurs in text"""
+        return self._pattern is not None and self._pattern.search(text) is not None
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.words
@@ -0,0 +1,253 @@
+"""
+Precomputed vocabulary index for Level 5 intent classification
+"""
+
+import difflib
+import hashlib
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+_MISSING = object()
+
+
+class SimilarityCache:
+    """
+    Bounded, thread-safe LRU cache for word similarity results.
+
+    One instance is shared by every SemanticMatcher in the process (see
+    get_similarity_cache), so the small vocabulary real users type is scored
+    once and then served from memory.
+    """
+
+    def __init__(self, max_entries: int = 8192):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        """Return the cached value and mark it most recently used"""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self._stats['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries over the limit"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        with self._lock:
+            requests = self._stats['hits'] + self._stats['misses']
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._stats['hits'],
+                'misses': self._stats['misses'],
+                'evictions': self._stats['evictions'],
+                'hit_rate': round(self._stats['hits'] / requests * 100, 1) if requests else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global similarity cache instance
+_similarity_cache_instance = None
+
+def get_similarity_cache() -> SimilarityCache:
+    """Get the process-wide similarity cache shared by all SemanticMatcher instances"""
+    global _similarity_cache_instance
+    if _similarity_cache_instance is None:
+        _similarity_cache_instance = SimilarityCache()
+    return _similarity_cache_instance
+
+
+def synonyms_signature(command_synonyms: Dict[str, List[str]]) -> str:
+    """Stable fingerprint of a synonym table, used to namespace cache keys"""
+    canonical = repr(sorted((word, sorted(synonyms)) for word, synonyms in command_synonyms.items()))
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+class IntentProfile:
+    """Intent definition compiled for set and position lookups"""
+
+    __slots__ = ('name', 'definition', 'action_words', 'target_words', 'modifier_positions')
+
+    def __init__(self, name: str, definition: Dict):
+        self.name = name
+        self.definition = definition
+        self.action_words = frozenset(definition['action_words'])
+        self.target_words = frozenset(definition['target_words'])
+
+        # (modifier_type, modifiers, {modifier: first position in list})
+        self.modifier_positions: List[Tuple[str, List[str], Dict[str, int]]] = []
+        for modifier_type, modifier_list in definition.get('modifiers', {}).items():
+            positions: Dict[str, int] = {}
+            for position, modifier in enumerate(modifier_list):
+                positions.setdefault(modifier, position)
+            self.modifier_positions.append((modifier_type, modifier_list, positions))
+
+    def vocabulary(self) -> Set[str]:
+        """All words this intent scores against"""
+        words = set(self.action_words) | set(self.target_words)
+        for _, modifier_list, _ in self.modifier_positions:
+            words.update(modifier_list)
+        return words
+
+    def best_score(self, words: Iterable[str], similarities: Dict[str, Dict[str, float]],
+                   vocabulary: frozenset) -> float:
+        """Highest similarity between any input word and any word in vocabulary"""
+        best = 0.0
+        for word in words:
+            for candidate, score in similarities[word].items():
+                if score > best and candidate in vocabulary:
+                    best = score
+        return best
+
+    def detect_modifiers(self, words: List[str], similarities: Dict[str, Dict[str, float]],
+                         threshold: float) -> Dict[str, str]:
+        """
+        Detect modifiers with the same precedence as the original nested scan:
+        the last matching input word wins, and for that word the modifier that
+        comes first in the definition list.
+        """
+        detected: Dict[str, str] = {}
+        for modifier_type, modifier_list, positions in self.modifier_positions:
+            for word in words:
+                first = None
+                for candidate, score in similarities[word].items():
+                    if score > threshold:
+                        position = positions.get(candidate)
+                        if position is not None and (first is None or position < first):
+                            first = position
+                if first is not None:
+                    detected[modifier_type] = modifier_list[first]
+        return detected
+
+
+class IntentVocabularyIndex:
+    """
+    Shared vocabulary of all intent definitions.
+
+    Word similarity follows SemanticMatcher._semantic_word_similarity exactly:
+    exact match 1.0, known synonym 0.9, otherwise SequenceMatcher ratio scaled
+    by 0.8 when the ratio exceeds 0.8. Exact and synonym hits are single hash
+    lookups; fuzzy candidates come from length buckets that can still reach the
+    ratio threshold and are pre-filtered with a character-count upper bound
+    before SequenceMatcher runs.
+    """
+
+    def __init__(self, intent_definitions: Dict[str, Dict], command_synonyms: Dict[str, List[str]],
+                 synonym_score: float = 0.9, fuzzy_threshold: float = 0.8, fuzzy_weight: float = 0.8,
+                 cache: Optional[SimilarityCache] = None):
+        self.cache = cache
+        self.synonym_score = synonym_score
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_weight = fuzzy_weight
+
+        self.profiles = [IntentProfile(name, definition) for name, definition in intent_definitions.items()]
+
+        vocabulary: Set[str] = set()
+        for profile in self.profiles:
+            vocabulary |= profile.vocabulary()
+        self.vocabulary = frozenset(vocabulary)
+
+        self.by_length: Dict[int, List[Tuple[str, Counter]]] = defaultdict(list)
+        for word in sorted(self.vocabulary):
+            self.by_length[len(word)].append((word, Counter(word)))
+
+        # Synonym relation is checked in both directions by the original scorer
+        self.synonym_neighbors: Dict[str, Set[str]] = defaultdict(set)
+        for word, synonyms in command_synonyms.items():
+            for synonym in synonyms:
+                if synonym in self.vocabulary:
+                    self.synonym_neighbors[word].add(synonym)
+                if word in self.vocabulary:
+                    self.synonym_neighbors[synonym].add(word)
+
+        self._length_windows: Dict[int, List[int]] = {}
+
+        # Indexes with identical vocabulary and scoring share cached rows
+        canonical = repr((sorted(self.vocabulary), synonyms_signature(command_synonyms),
+                          synonym_score, fuzzy_threshold, fuzzy_weight))
+        self.signature = hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+    def _candidate_lengths(self, length: int) -> List[int]:
+        """Vocabulary lengths whose best possible ratio still clears the threshold"""
+        window = self._length_windows.get(length)
+        if window is None:
+            window = [
+                other for other in self.by_length
+                if 2.0 * min(length, other) / (length + other) > self.fuzzy_threshold
+            ]
+            self._length_windows[length] = window
+        return window
+
+    def word_similarities(self, word: str) -> Dict[str, float]:
+        """Non-zero similarities between word and every vocabulary word (uncached)"""
+        similarities: Dict[str, float] = {}
+        neighbors = self.synonym_neighbors.get(word)
+        if neighbors:
+            for neighbor in neighbors:
+                similarities[neighbor] = self.synonym_score
+
+        length = len(word)
+        if length:
+            counts: Optional[Counter] = None
+            for other_length in self._candidate_lengths(length):
+                total = length + other_length
+                for candidate, candidate_counts in self.by_length[other_length]:
+                    if candidate in similarities or candidate == word:
+                        continue
+                    if counts is None:
+                        counts = Counter(word)
+                    # Upper bound on matching characters, same as SequenceMatcher.quick_ratio
+                    shared = sum(min(count, candidate_counts[char]) for char, count in counts.items())
+                    if 2.0 * shared / total <= self.fuzzy_threshold:
+                        continue
+                    ratio = difflib.SequenceMatcher(None, word, candidate).ratio()
+                    if ratio > self.fuzzy_threshold:
+                        similarities[candidate] = ratio * self.fuzzy_weight
+
+        if word in self.vocabulary:
+            similarities[word] = 1.0
+        return similarities
+
+    def similarities(self, words: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """Similarity rows for each distinct input word, served from the cache when set
+
+        Rows may be shared with other callers and must not be modified.
+        """
+        rows: Dict[str, Dict[str, float]] = {}
+        for word in words:
+            if word in rows:
+                continue
+            if self.cache is None:
+                rows[word] = self.word_similarities(word)
+                continue
+            key = ('row', self.signature, word)
+            row = self.cache.get(key)
+            if row is _MISSING:
+                row = self.word_similarities(word)
+                self.cache.put(key, row)
+            rows[word] = row
+        return rows
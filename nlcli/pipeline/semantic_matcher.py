@@ -15,6 +15,7 @@ from collections import defaultdict, Counter
 import unicodedata
 
 from .partial_match import PartialMatch, PipelineResult
+from .semantic_index import IntentProfile, IntentVocabularyIndex, get_similarity_cache, synonyms_signature
 from ..utils.command_validator import get_command_validator
 from ..utils.known_command_registry import get_known_command_registry
 
@@ -46,8 +47,30 @@ class SemanticMatcher:
         self.min_word_similarity = 0.6  # Minimum similarity for semantic matching
         self.intent_confidence_boost = 0.1  # Boost for successful intent classification
         
+        # Precomputed vocabulary index shared by all intents
+        self.rebuild_vocabulary_index()
+        
         logger.info("SemanticMatcher initialized with Intent Classification Engine and command validation")
     
+    def rebuild_vocabulary_index(self):
+        """Compile intent definitions and synonyms into the intent vocabulary index
+        
+        Call again after changing intent_definitions or command_synonyms at runtime.
+        """
+        self.similarity_cache = get_similarity_cache()
+        self.vocabulary_index = IntentVocabularyIndex(
+            self.intent_definitions, self.command_synonyms, cache=self.similarity_cache
+        )
+        self._synonyms_signature = synonyms_signature(self.command_synonyms)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters of the shared word similarity cache"""
+        return self.similarity_cache.get_stats()
+    
+    def _with_cache_stats(self, metadata: Optional[Dict]) -> Dict[str, Any]:
+        """Copy of the caller's metadata with the similarity cache counters added"""
+        return {**(metadata or {}), 'similarity_cache': self.get_cache_stats()}
+    
     def _load_comprehensive_typo_mappings(self) -> Dict[str, str]:
         """Comprehensive typo correction mappings consolidated from all levels"""
         return {
@@ -527,9 +550,15 @@ class SemanticMatcher:
         matches = []
         words = text.lower().split()
         
+        # Word similarities are computed once per distinct word and shared by every intent
+        similarities = self.vocabulary_index.similarities(words)
+        
         # Analyze each intent for semantic matches
-        for intent_name, intent_def in self.intent_definitions.items():
-            confidence, detected_modifiers = self._analyze_intent_match(words, intent_def)
+        for profile in self.vocabulary_index.profiles:
+            intent_name, intent_def = profile.name, profile.definition
+            confidence, detected_modifiers = self._analyze_intent_match(
+                words, intent_def, profile=profile, similarities=similarities
+            )
             
             if confidence >= self.min_partial_confidence:
                 # Generate platform-appropriate command
@@ -562,45 +591,35 @@ class SemanticMatcher:
         matches.sort(key=lambda m: m.confidence, reverse=True)
         return matches[:3]  # Return top 3 matches
     
-    def _analyze_intent_match(self, words: List[str], intent_def: Dict) -> Tuple[float, Dict[str, str]]:
+    def _analyze_intent_match(self, words: List[str], intent_def: Dict,
+                              profile: Optional[IntentProfile] = None,
+                              similarities: Optional[Dict[str, Dict[str, float]]] = None) -> Tuple[float, Dict[str, str]]:
         """
         Analyze how well the input words match an intent definition
         
+        Args:
+            words: Lowercased input words
+            intent_def: Intent definition
+            profile: Precompiled profile for intent_def (built on demand if omitted)
+            similarities: Per-word similarity rows from the vocabulary index
+        
         Returns:
             Tuple of (confidence_score, detected_modifiers)
         """
-        action_score = 0.0
-        target_score = 0.0
-        detected_modifiers = {}
+        if profile is None or similarities is None:
+            # Standalone call for an arbitrary definition - index just this intent
+            index = IntentVocabularyIndex({'_': intent_def}, self.command_synonyms)
+            profile = index.profiles[0]
+            similarities = index.similarities(words)
         
         # Check action words (verbs: show, list, display, etc.)
-        action_words = intent_def['action_words']
-        for word in words:
-            best_action_sim = max(
-                [self._semantic_word_similarity(word, action) for action in action_words],
-                default=0.0
-            )
-            if best_action_sim > action_score:
-                action_score = best_action_sim
+        action_score = profile.best_score(words, similarities, profile.action_words)
         
         # Check target words (nouns: process, file, network, etc.)
-        target_words = intent_def['target_words']
-        for word in words:
-            best_target_sim = max(
-                [self._semantic_word_similarity(word, target) for target in target_words],
-                default=0.0
-            )
-            if best_target_sim > target_score:
-                target_score = best_target_sim
+        target_score = profile.best_score(words, similarities, profile.target_words)
         
         # Detect modifiers (context: running, all, detailed, etc.)
-        modifiers = intent_def.get('modifiers', {})
-        for modifier_type, modifier_list in modifiers.items():
-            for word in words:
-                for modifier in modifier_list:
-                    if self._semantic_word_similarity(word, modifier) > self.min_word_similarity:
-                        detected_modifiers[modifier_type] = modifier
-                        break
+        detected_modifiers = profile.detect_modifiers(words, similarities, self.min_word_similarity)
         
         # Set default modifier if none detected
         if not detected_modifiers and 'default_modifier' in intent_def:
@@ -631,7 +650,18 @@ class SemanticMatcher:
         1. Exact match
         2. Synonym mapping
         3. String similarity (fuzzy matching)
+        
+        Results are memoized in the shared similarity cache.
         """
+        key = ('pair', self._synonyms_signature, word1, word2)
+        similarity = self.similarity_cache.get(key, None)
+        if similarity is None:
+            similarity = self._compute_word_similarity(word1, word2)
+            self.similarity_cache.put(key, similarity)
+        return similarity
+    
+    def _compute_word_similarity(self, word1: str, word2: str) -> float:
+        """Uncached implementation of _semantic_word_similarity"""
         # Exact match
         if word1 == word2:
             return 1.0
@@ -1075,7 +1105,7 @@ class SemanticMatcher:
                 'pipeline_level': 5,
                 'match_type': 'semantic_intelligence',
                 'source': 'semantic_matcher',
-                'metadata': metadata,
+                'metadata': self._with_cache_stats(metadata),
                 'pipeline_path': result.pipeline_path
             })
             return final
@@ -1092,7 +1122,7 @@ class SemanticMatcher:
                     'match_type': 'semantic_partial',
                     'source': 'semantic_matcher',
                     'corrections': [f"{t[0]} → {t[1]}" for t in best_match.corrections] if best_match.corrections else [],
-                    'metadata': metadata
+                    'metadata': self._with_cache_stats(metadata)
                 }
         
         # Check if we have suggestion-only matches (no executable command)
@@ -6,11 +6,31 @@ Centralizes ALL context gathering: platform, shell, git, environment, and system
 import os
 import platform
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from typing import Dict, List, Optional, Set
 from ..utils.utils import setup_logging
 
 logger = setup_logging()
 
+# Seconds each context collector may take before its result is left out
+COLLECTOR_TIMEOUT = 2.0
+
+_collector_pool = None
+_collector_pool_lock = threading.Lock()
+
+
+def get_collector_pool() -> ThreadPoolExecutor:
+    """Get global thread pool for context collectors"""
+    global _collector_pool
+    if _collector_pool is None:
+        with _collector_pool_lock:
+            if _collector_pool is None:
+                _collector_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='nlcli-context')
+    return _collector_pool
+
+
 class ShellAdapter:
     """Level 1: Comprehensive context provider and shell intelligence for the translation pipeline"""
     
@@ -31,6 +51,9 @@ class ShellAdapter:
     
     def _initialize_context_managers(self):
         """Initialize all context managers in Level 1 for centralized context"""
+        self._context_manager = None
+        self._context_manager_loaded = False
+        self._context_manager_lock = threading.Lock()
         try:
             # Git context for repository awareness
             from ..context.git_context import GitContextManager
@@ -40,11 +63,6 @@ class ShellAdapter:
             from ..context.environment_context import EnvironmentContextManager
             self.env_context = EnvironmentContextManager()
             
-            # Legacy context manager
-            from ..context.context_manager import ContextManager
-            config_dir = os.path.expanduser('~/.nlcli')
-            self.context_manager = ContextManager(config_dir)
-            
             logger.debug("Context managers initialized in ShellAdapter")
             
         except Exception as e:
@@ -54,6 +72,33 @@ class ShellAdapter:
             self.env_context = None 
             self.context_manager = None
     
+    @property
+    def context_manager(self):
+        """Legacy ContextManager, created on first use since it probes git and the environment"""
+        if not self._context_manager_loaded:
+            with self._context_manager_lock:
+                if not self._context_manager_loaded:
+                    try:
+                        from ..context.context_manager import ContextManager
+                        self._context_manager = ContextManager(os.path.expanduser('~/.nlcli'))
+                    except Exception as e:
+                        logger.warning(f"Failed to initialize legacy context manager: {e}")
+                        self._context_manager = None
+                    self._context_manager_loaded = True
+        return self._context_manager
+    
+    @context_manager.setter
+    def context_manager(self, value):
+        self._context_manager = value
+        self._context_manager_loaded = True
+    
+    def set_current_directory(self, directory: str):
+        """Point git and environment context at another working directory"""
+        self.current_directory = directory
+        for manager in (self.git_context, self.env_context):
+            if manager is not None:
+                manager.current_directory = directory
+    
     def _load_context_metadata(self):
         """Load system context metadata for pipeline (Level 1)"""
         # Context-only metadata - typo corrections moved to typo_corrector (Level 4)
@@ -332,16 +377,90 @@ class ShellAdapter:
                 logger.warning(f"Failed to get environment context: {e}")
         return {'project_type': 'unknown'}
     
-    def get_enhanced_context(self, command: str = "") -> Dict:
+    def get_legacy_context(self) -> Dict:
+        """Get legacy context manager information"""
+        if self.context_manager:
+            try:
+                return self.context_manager.get_context_info() or {}
+            except Exception as e:
+                logger.warning(f"Failed to get legacy context: {e}")
+        return {}
+    
+    def _merge_environment_probes(self, collected: Dict) -> Dict:
+        """Project environment from whichever environment probes returned in time"""
+        environment = dict(collected.get('environment', {'project_type': 'unknown'}))
+        
+        package = collected.get('package_json')
+        if package:
+            if package.get('name'):
+                environment['project_name'] = package['name']
+            environment['scripts'] = sorted(package.get('scripts', {}))
+        
+        if 'development_tools' in collected:
+            environment['development_tools'] = collected['development_tools']
+        
+        variables = collected.get('environment_variables')
+        if variables is not None:
+            environment['environment_type'] = self.env_context.detect_environment_type()
+            environment['has_database'] = bool(variables['database'])
+        
+        return environment
+    
+    def collect_context(self, collectors: Dict, timeout: float = COLLECTOR_TIMEOUT) -> Dict:
+        """
+        Run context collectors concurrently
+        
+        Args:
+            collectors: Mapping of name to zero-argument callable
+            timeout: Seconds each collector may take
+            
+        Returns:
+            Results by name; collectors that failed or timed out are left out
+        """
+        pool = get_collector_pool()
+        futures = {name: pool.submit(collector) for name, collector in collectors.items()}
+        deadline = time.monotonic() + timeout
+        
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                # The collector keeps running and warms its manager's cache for next time
+                logger.warning(f"Context collector '{name}' timed out after {timeout}s")
+            except Exception as e:
+                logger.warning(f"Context collector '{name}' failed: {e}")
+        return results
+    
+    def get_enhanced_context(self, command: str = "", timeout: float = COLLECTOR_TIMEOUT) -> Dict:
         """
         Get comprehensive context for AI translation (Level 5)
         
+        Git state, each project environment probe and the legacy context
+        (whose construction runs ContextManager._detect_environment) are
+        collected concurrently. One that fails or takes longer than the
+        timeout is reported as unavailable instead of holding up the rest.
+        
         Args:
             command: The command being translated (for context-specific suggestions)
+            timeout: Seconds each context collector may take
             
         Returns:
             Complete context dictionary combining all sources
         """
+        collectors = {
+            'git': self.get_git_context,
+            'environment': self.get_environment_context,
+            'legacy': self.get_legacy_context
+        }
+        if self.env_context:
+            collectors.update({
+                'package_json': self.env_context.parse_package_json,
+                'environment_variables': self.env_context.scan_environment_variables,
+                'development_tools': self.env_context.detect_development_tools
+            })
+        collected = self.collect_context(collectors, timeout)
+        
         context = {
             # System context (always available)
             'platform': self.platform,
@@ -350,10 +469,10 @@ class ShellAdapter:
             'shell_features': self._get_shell_features(),
             
             # Git context (if available)
-            'git': self.get_git_context(),
+            'git': collected.get('git', {'is_git_repo': False}),
             
             # Environment context (if available)  
-            'environment': self.get_environment_context(),
+            'environment': self._merge_environment_probes(collected),
             
             # Command-specific context
             'command_category': self._get_command_category(command),
@@ -361,12 +480,7 @@ class ShellAdapter:
         }
         
         # Legacy context (if available)
-        if self.context_manager:
-            try:
-                legacy_context = self.context_manager.get_context_info()
-                if legacy_context:
-                    context['legacy'] = legacy_context
-            except Exception as e:
-                logger.warning(f"Failed to get legacy context: {e}")
+        if collected.get('legacy'):
+            context['legacy'] = collected['legacy']
         
         return context
\ No newline at end of file
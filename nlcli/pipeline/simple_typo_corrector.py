@@ -6,11 +6,28 @@ Replaces the complex AdvancedFuzzyEngine with lightweight Levenshtein and Phonet
 import difflib
 import re
 import logging
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Iterable, Optional, Tuple, List
 from .partial_match import PartialMatch, PipelineResult
+from .typo_index import DeletionIndex
+from ..utils.known_command_registry import get_known_command_registry
 
 logger = logging.getLogger(__name__)
 
+NON_LETTER_PATTERN = re.compile(r'[^a-zA-Z\s]')
+VOWEL_PATTERN = re.compile(r'[aeiouAEIOU\s\-]')
+
+# Words typed in requests that are within a few edits of a command but are
+# not typos of it (path -> patch, name -> uname, stop -> top)
+KNOWN_WORDS = frozenset({
+    'cfg', 'cmd', 'config', 'count', 'cpp', 'cpu', 'css', 'name', 'names', 'path', 'paths',
+    'pdf', 'png', 'rpm', 'services', 'sh', 'short', 'stop', 'tcp', 'watch', 'xls'
+})
+
+
+def phonetic_key(text: str) -> str:
+    """Consonant skeleton used for phonetic comparison (vowels, spaces and hyphens removed)"""
+    return VOWEL_PATTERN.sub('', text)
+
 
 class SimpleTypoCorrector:
     """
@@ -18,8 +35,14 @@ class SimpleTypoCorrector:
     Removes the complex parallel execution and duplicate semantic logic
     """
     
-    def __init__(self):
-        self.levenshtein_matcher = LevenshteinMatcher()
+    def __init__(self, include_path_commands: bool = False):
+        """
+        Args:
+            include_path_commands: Also index every executable found on $PATH.
+                Off by default because the directory scan costs startup time.
+        """
+        extra_commands = get_known_command_registry().get_path_commands() if include_path_commands else None
+        self.levenshtein_matcher = LevenshteinMatcher(extra_commands)
         self.phonetic_matcher = PhoneticMatcher()
         self.min_confidence = 0.6
         
@@ -27,6 +50,10 @@ class SimpleTypoCorrector:
         """
         Level 4 pipeline interface - lightweight typo correction
         """
+        # Known words are not typos, neither matcher may rewrite them
+        if self.levenshtein_matcher.is_known_word(text):
+            return None
+        
         # Try Levenshtein first (fastest)
         levenshtein_result = self.levenshtein_matcher.match(text, self.min_confidence)
         if levenshtein_result and levenshtein_result[1] >= 0.8:  # High confidence threshold
@@ -93,7 +120,12 @@ class SimpleTypoCorrector:
 class LevenshteinMatcher:
     """Pure Levenshtein distance-based typo correction"""
     
-    def __init__(self):
+    def __init__(self, extra_commands: Optional[Iterable[str]] = None, max_distance: int = 2):
+        """
+        Args:
+            extra_commands: Additional command names to index (e.g. $PATH binaries)
+            max_distance: Maximum edit distance for candidate commands
+        """
         # Common command typos and corrections
         self.common_commands = {
             'ls': ['lsit', 'lits', 'lis', 'sl', 'lss'],
@@ -129,6 +161,21 @@ class LevenshteinMatcher:
         for command, typos in self.common_commands.items():
             for typo in typos:
                 self.typo_to_command[typo] = command
+        
+        # Edit-distance index over curated commands plus the known command registry
+        self.max_distance = max_distance
+        self.command_index = DeletionIndex(sorted(self.common_commands), max_distance)
+        self.command_index.update(sorted(get_known_command_registry().get_all_known_commands()))
+        if extra_commands:
+            self.add_commands(extra_commands)
+    
+    def add_commands(self, commands: Iterable[str]):
+        """Add command names to the candidate index"""
+        self.command_index.update(sorted(command.lower() for command in commands if command))
+    
+    def is_known_word(self, text: str) -> bool:
+        """True for a word that must not be corrected to a different command"""
+        return text.strip().lower() in KNOWN_WORDS
     
     def match(self, text: str, threshold: float = 0.6) -> Optional[Tuple[str, float, Dict]]:
         """Match using Levenshtein distance for typo correction"""
@@ -141,19 +188,31 @@ class LevenshteinMatcher:
                 'method': 'exact_typo_mapping'
             })
         
+        # Exact commands and known words come before any edit-distance candidate
+        if text_clean in self.command_index:
+            return (text_clean, 1.0, {
+                'algorithm': 'LevenshteinMatcher',
+                'method': 'exact_command'
+            })
+        if text_clean in KNOWN_WORDS:
+            return None
+        
         # Check single word commands with Levenshtein distance
         if len(text_clean.split()) == 1:
             best_match = None
             best_score = 0
+            best_rank = None
             
-            for command in self.common_commands.keys():
-                # Skip if length difference is too large
-                if abs(len(text_clean) - len(command)) > 2:
-                    continue
-                    
+            # Index lookup returns only commands within max_distance edits
+            for distance, command in self.command_index.search(text_clean, self.max_distance):
                 similarity = difflib.SequenceMatcher(None, text_clean, command).ratio()
+                if similarity < threshold:
+                    continue
                 
-                if similarity > best_score and similarity >= threshold:
+                # Prefer higher similarity, then curated commands, then fewer edits
+                rank = (similarity, command in self.common_commands, -distance)
+                if best_rank is None or rank > best_rank:
+                    best_rank = rank
                     best_score = similarity
                     best_match = command
             
@@ -191,25 +250,64 @@ class PhoneticMatcher:
             'tar': ['tape archive', 'tar'],
             'zip': ['zip', 'zyp']
         }
+        
+        self.rebuild_phonetic_index()
+    
+    def rebuild_phonetic_index(self):
+        """Precompute consonant skeletons of all variations
+        
+        Call again after changing phonetic_mappings at runtime.
+        """
+        # (command, key) pairs in mapping order - order decides ties like the original scan
+        self.phonetic_keys: List[Tuple[str, str]] = []
+        # Exact skeleton -> first command that produces it
+        self.key_to_command: Dict[str, str] = {}
+        
+        seen = set()
+        for command, variations in self.phonetic_mappings.items():
+            for variation in variations:
+                key = phonetic_key(variation)
+                if not key or (command, key) in seen:
+                    continue
+                seen.add((command, key))
+                self.phonetic_keys.append((command, key))
+                self.key_to_command.setdefault(key, command)
     
     def match(self, text: str, threshold: float = 0.6) -> Optional[Tuple[str, float, Dict]]:
         """Match using phonetic similarity for sound-based errors"""
-        text_clean = re.sub(r'[^a-zA-Z\s]', '', text.lower().strip())
+        text_clean = NON_LETTER_PATTERN.sub('', text.lower().strip())
         
         if not text_clean:
             return None
         
+        key = phonetic_key(text_clean)
+        if not key:
+            return None
+        
+        # Identical skeleton is a perfect score, nothing can beat it
+        command = self.key_to_command.get(key)
+        if command is not None and threshold <= 1.0:
+            return (command, 1.0, {
+                'algorithm': 'PhoneticMatcher',
+                'method': 'consonant_matching'
+            })
+        
         best_match = None
         best_score = 0
         
-        for command, variations in self.phonetic_mappings.items():
-            for variation in variations:
-                # Calculate phonetic similarity
-                score = self._phonetic_similarity(text_clean, variation)
-                
-                if score > best_score and score >= threshold:
-                    best_score = score
-                    best_match = command
+        # Fuzzy fallback over precomputed skeletons
+        key_length = len(key)
+        for command, candidate in self.phonetic_keys:
+            # Upper bound of the ratio from lengths alone
+            candidate_length = len(candidate)
+            bound = 2.0 * min(key_length, candidate_length) / (key_length + candidate_length)
+            if bound < threshold or bound <= best_score:
+                continue
+            
+            score = difflib.SequenceMatcher(None, key, candidate).ratio()
+            if score > best_score and score >= threshold:
+                best_score = score
+                best_match = command
         
         if best_match:
             return (best_match, best_score, {
@@ -222,8 +320,8 @@ class PhoneticMatcher:
     def _phonetic_similarity(self, text1: str, text2: str) -> float:
         """Calculate phonetic similarity based on consonant patterns"""
         # Extract consonants (remove vowels and spaces)
-        consonants1 = re.sub(r'[aeiouAEIOU\s\-]', '', text1)
-        consonants2 = re.sub(r'[aeiouAEIOU\s\-]', '', text2)
+        consonants1 = phonetic_key(text1)
+        consonants2 = phonetic_key(text2)
         
         if not consonants1 or not consonants2:
             return 0.0
@@ -0,0 +1,78 @@
+"""
+Request coalescing for concurrent identical Level 6 translations
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+
+    The first caller for a key executes the function; callers arriving with
+    the same key while it is in flight wait on the same future and receive
+    its result (or exception) instead of starting their own call. Once the
+    call finishes the key is released, so later calls run again - results
+    are not cached here.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._stats = {'calls': 0, 'executions': 0, 'coalesced': 0}
+
+    def do(self, key: Hashable, function: Callable[[], Any],
+           timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Run function for key, or wait for the identical call already running.
+
+        Args:
+            key: Identity of the call
+            function: Zero-argument callable to execute
+            timeout: Maximum seconds a coalesced caller waits for the shared result
+
+        Returns:
+            (result, coalesced) where coalesced is True if another caller ran the function
+
+        Raises:
+            concurrent.futures.TimeoutError if a coalesced caller times out
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                future = self._in_flight[key] = Future()
+                self._stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            return future.result(timeout=timeout), True
+
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing counters"""
+        with self._lock:
+            calls = self._stats['calls']
+            return {
+                'calls': calls,
+                'executions': self._stats['executions'],
+                'coalesced': self._stats['coalesced'],
+                'in_flight': len(self._in_flight),
+                'coalesce_rate': round(self._stats['coalesced'] / calls * 100, 1) if calls else 0.0
+            }
@@ -0,0 +1,110 @@
+"""
+Edit-distance index for Level 4 typo correction
+"""
+
+from itertools import combinations
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def levenshtein_distance(source: str, target: str, max_distance: int = -1) -> int:
+    """
+    Levenshtein distance (insert, delete, substitute).
+
+    With max_distance >= 0 the computation stops as soon as the distance is
+    known to exceed it and returns max_distance + 1.
+    """
+    if source == target:
+        return 0
+    if len(source) < len(target):
+        source, target = target, source
+    if max_distance >= 0 and len(source) - len(target) > max_distance:
+        return max_distance + 1
+    if not target:
+        return len(source)
+
+    previous = list(range(len(target) + 1))
+    for i, source_char in enumerate(source, 1):
+        current = [i]
+        row_min = i
+        for j, target_char in enumerate(target, 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (source_char != target_char)
+            )
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if 0 <= max_distance < row_min:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """All strings reachable from word by deleting up to max_distance characters"""
+    variants = {word}
+    length = len(word)
+    for count in range(1, min(max_distance, length) + 1):
+        for positions in combinations(range(length), count):
+            skip = set(positions)
+            variants.add(''.join(char for index, char in enumerate(word) if index not in skip))
+    return variants
+
+
+class DeletionIndex:
+    """
+    SymSpell-style symmetric delete index.
+
+    Every word is stored under all of its deletion variants up to
+    max_distance. A query generates the deletion variants of the input,
+    collects the words sharing any of them and verifies each with a bounded
+    Levenshtein distance. Query cost depends on the length of the input, not
+    on the number of indexed commands, so thousands of $PATH binaries keep
+    lookups well under a millisecond.
+    """
+
+    def __init__(self, words: Iterable[str] = (), max_distance: int = 2):
+        self.max_distance = max_distance
+        self._variants: Dict[str, List[str]] = {}
+        self._words: Set[str] = set()
+        self.update(words)
+
+    def add(self, word: str) -> bool:
+        """Insert word, returns False if it was already present"""
+        if not word or word in self._words:
+            return False
+        self._words.add(word)
+        for variant in _deletes(word, self.max_distance):
+            self._variants.setdefault(variant, []).append(word)
+        return True
+
+    def update(self, words: Iterable[str]):
+        """Insert several words"""
+        for word in words:
+            self.add(word)
+
+    def search(self, word: str, max_distance: int = -1) -> List[Tuple[int, str]]:
+        """Return (distance, word) pairs within max_distance, nearest first"""
+        if max_distance < 0 or max_distance > self.max_distance:
+            max_distance = self.max_distance
+
+        candidates: Set[str] = set()
+        for variant in _deletes(word, max_distance):
+            matches = self._variants.get(variant)
+            if matches:
+                candidates.update(matches)
+
+        results = []
+        for candidate in candidates:
+            distance = levenshtein_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                results.append((distance, candidate))
+        results.sort()
+        return results
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._words
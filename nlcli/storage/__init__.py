@@ -12,6 +12,7 @@ from .cache_manager import CacheManager
 from .file_cache import FileCacheManager
 from .cache_migrator import CacheMigrator
 from .file_history import FileHistoryManager
+from .sqlite_history import SQLiteHistoryManager
 from .history_manager import HistoryManager
 from .config_manager import ConfigManager
 
@@ -20,6 +21,7 @@ __all__ = [
     'FileCacheManager',
     'CacheMigrator', 
     'FileHistoryManager',
+    'SQLiteHistoryManager',
     'HistoryManager',
     'ConfigManager'
 ]
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Memory-mapped hash index for the translation cache log
+"""
+
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from ..utils.utils import setup_logging
+
+logger = setup_logging()
+
+INDEX_MAGIC = b'NLCIDX\x01\n'
+
+# Header: magic, capacity, used slots, live keys, reserved, log inode, indexed log end, live payload bytes
+INDEX_HEADER = struct.Struct('<8sIIIIQQQ')
+
+# Slot: 32-byte SHA-256 key digest, payload offset in the log, payload length
+INDEX_SLOT = struct.Struct('<32sQI')
+
+EMPTY_DIGEST = bytes(32)
+TOMBSTONE = 0xFFFFFFFF
+MAX_LOAD = 0.7
+
+
+class CacheIndex:
+    """
+    Open-addressing hash table stored in a file and shared through mmap.
+
+    Each slot maps a SHA-256 key digest to the offset and length of its
+    latest payload in the cache log. Every process maps the same file, so a
+    lookup is a few probes in shared memory instead of a per-process parse
+    of the whole cache at startup. Deleted keys keep their slot with a
+    tombstone length; tombstones are dropped when the table is rebuilt.
+
+    The header records the inode of the log it describes and how far into
+    the log it has been built, so a stale index (after a log compaction or
+    a crash) is detected and only the unindexed tail of the log needs to be
+    applied.
+    """
+
+    def __init__(self, path: Path, log_inode: int, min_capacity: int = 1024):
+        self.path = Path(path)
+        self.min_capacity = min_capacity
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._inode = None
+        self.open(log_inode)
+
+    # File handling
+
+    def open(self, log_inode: int):
+        """Map the index file, recreating it if it belongs to another log"""
+        self.close()
+        try:
+            self._map_file()
+            if self._header()[5] == log_inode:
+                return
+            logger.debug(f"Cache index {self.path} is stale, rebuilding")
+        except (OSError, ValueError, struct.error):
+            pass
+        self.close()
+        self.create(self.path, log_inode, self._capacity_for(0), [], 0, 0)
+        self._map_file()
+
+    def _map_file(self):
+        self._file = open(self.path, 'r+b')
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        if self._map[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError(f"{self.path} is not a cache index")
+        capacity = self._header()[1]
+        if len(self._map) != INDEX_HEADER.size + capacity * INDEX_SLOT.size:
+            raise ValueError(f"{self.path} has an unexpected size")
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def replaced(self) -> bool:
+        """True if another process swapped in a new index file"""
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except FileNotFoundError:
+            return True
+
+    @classmethod
+    def create(cls, path: Path, log_inode: int, capacity: int,
+               entries, indexed_end: int, live_bytes: int):
+        """Write a new index file for (digest, offset, length) entries and atomically install it"""
+        table = bytearray(capacity * INDEX_SLOT.size)
+        mask = capacity - 1
+        count = 0
+        for digest, offset, length in entries:
+            slot = int.from_bytes(digest[:8], 'little') & mask
+            while table[slot * INDEX_SLOT.size:slot * INDEX_SLOT.size + 32] != EMPTY_DIGEST:
+                slot = (slot + 1) & mask
+            INDEX_SLOT.pack_into(table, slot * INDEX_SLOT.size, digest, offset, length)
+            count += 1
+
+        temp_path = Path(path).with_suffix('.idx-new')
+        with open(temp_path, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, capacity, count, count, 0, log_inode, indexed_end, live_bytes))
+            f.write(table)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def _capacity_for(self, live: int) -> int:
+        capacity = self.min_capacity
+        while live >= capacity * MAX_LOAD / 2:
+            capacity *= 2
+        return capacity
+
+    # Header fields
+
+    def _header(self) -> tuple:
+        return INDEX_HEADER.unpack_from(self._map, 0)
+
+    def _set_header(self, used: int, live: int, indexed_end: int, live_bytes: int):
+        magic, capacity, _, _, reserved, log_inode, _, _ = self._header()
+        INDEX_HEADER.pack_into(self._map, 0, magic, capacity, used, live, reserved,
+                               log_inode, indexed_end, live_bytes)
+
+    @property
+    def live(self) -> int:
+        return self._header()[3]
+
+    @property
+    def indexed_end(self) -> int:
+        return self._header()[6]
+
+    @property
+    def live_bytes(self) -> int:
+        return self._header()[7]
+
+    # Slots
+
+    def _probe(self, digest: bytes) -> Tuple[int, bytes, int, int]:
+        """Find the slot holding digest, or the empty slot where it would go"""
+        capacity = self._header()[1]
+        mask = capacity - 1
+        slot = int.from_bytes(digest[:8], 'little') & mask
+        while True:
+            position = INDEX_HEADER.size + slot * INDEX_SLOT.size
+            stored, offset, length = INDEX_SLOT.unpack_from(self._map, position)
+            if stored == digest or stored == EMPTY_DIGEST:
+                return position, stored, offset, length
+            slot = (slot + 1) & mask
+
+    def lookup(self, digest: bytes) -> Optional[Tuple[int, int]]:
+        """(offset, length) of the live payload for digest"""
+        _, stored, offset, length = self._probe(digest)
+        if stored == EMPTY_DIGEST or length == TOMBSTONE:
+            return None
+        return offset, length
+
+    def apply(self, digest: bytes, offset: int, length: Optional[int], indexed_end: int):
+        """Index one log record (length None for a delete) and advance the indexed end"""
+        _, capacity, used, live, _, log_inode, _, live_bytes = self._header()
+        if length is not None and used + 1 > capacity * MAX_LOAD:
+            self._rebuild(log_inode)
+            _, capacity, used, live, _, log_inode, _, live_bytes = self._header()
+
+        position, stored, _, previous = self._probe(digest)
+        if stored != EMPTY_DIGEST and previous != TOMBSTONE:
+            live -= 1
+            live_bytes -= previous
+        if length is not None:
+            if stored == EMPTY_DIGEST:
+                used += 1
+            live += 1
+            live_bytes += length
+            INDEX_SLOT.pack_into(self._map, position, digest, offset, length)
+        elif stored != EMPTY_DIGEST:
+            INDEX_SLOT.pack_into(self._map, position, digest, 0, TOMBSTONE)
+        self._set_header(used, live, indexed_end, max(live_bytes, 0))
+
+    def _rebuild(self, log_inode: int):
+        """Grow the table (or just drop tombstones) into a new file"""
+        live, indexed_end, live_bytes = self.live, self.indexed_end, self.live_bytes
+        entries = list(self.entries())
+        self.close()
+        self.create(self.path, log_inode, self._capacity_for(live), entries, indexed_end, live_bytes)
+        self._map_file()
+
+    def entries(self) -> Iterator[Tuple[bytes, int, int]]:
+        """Live (digest, offset, length) slots in table order"""
+        capacity = self._header()[1]
+        for slot in range(capacity):
+            digest, offset, length = INDEX_SLOT.unpack_from(self._map, INDEX_HEADER.size + slot * INDEX_SLOT.size)
+            if digest != EMPTY_DIGEST and length != TOMBSTONE:
+                yield digest, offset, length
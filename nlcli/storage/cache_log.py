@@ -0,0 +1,366 @@
+"""
+Append-only record log for the file-based translation cache
+"""
+
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    fcntl = None
+    HAS_FCNTL = False
+from ..utils.utils import setup_logging
+from .cache_index import CacheIndex
+from .serialization import JSONSerializer
+
+logger = setup_logging()
+
+# File header: the format byte is the payload serializer's format_id (1 is JSON)
+LOG_MAGIC_PREFIX = b'NLCLOG'
+LOG_MAGIC = LOG_MAGIC_PREFIX + bytes([JSONSerializer.format_id]) + b'\n'
+
+# Record header: payload length, flags, 32-byte SHA-256 key digest
+RECORD_HEADER = struct.Struct('<IB32s')
+FLAG_PUT = 0
+FLAG_DELETE = 1
+
+# Windows has no positioned reads
+HAS_PREAD = hasattr(os, 'pread')
+
+
+def log_magic(serializer) -> bytes:
+    """File header for a log whose payloads use serializer"""
+    return LOG_MAGIC_PREFIX + bytes([serializer.format_id]) + b'\n'
+
+
+def read_log_format(path: Path) -> Optional[int]:
+    """Payload format_id of an existing log, None if missing or not a log"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(len(LOG_MAGIC))
+    except OSError:
+        return None
+    if len(header) != len(LOG_MAGIC) or not header.startswith(LOG_MAGIC_PREFIX):
+        return None
+    return header[len(LOG_MAGIC_PREFIX)]
+
+
+class CacheLog:
+    """
+    Append-only key/value log with a shared memory-mapped index.
+
+    Every put or delete appends one record, so writes cost O(1) regardless
+    of the number of entries. A CacheIndex file next to the log maps each
+    key to the offset and length of its latest payload, so a read is a hash
+    probe in shared memory plus a single positioned read, and opening the
+    log only has to index records appended since the index was last
+    updated. Superseded records are dropped by compaction, which rewrites
+    the live records to a new file and atomically replaces the old one once
+    the log has grown to compact_ratio times its live size.
+
+    Several processes can share the log. Appends, index updates and
+    compaction hold an exclusive ``flock`` on lock_path, lookups a shared
+    one, so a reader never sees a half-written index slot and writers never
+    interleave. ``refresh`` indexes records written by others and reopens
+    the files after a compaction. Without fcntl (Windows) only the
+    in-process lock is taken.
+    """
+
+    def __init__(self, path: Path, compact_ratio: float = 2.0, compact_min_bytes: int = 64 * 1024,
+                 lock_path: Optional[Path] = None, serializer=None):
+        self.path = Path(path)
+        self.serializer = serializer or JSONSerializer()
+        self.magic = log_magic(self.serializer)
+        self.index_path = self.path.with_suffix('.idx')
+        self.lock_path = Path(lock_path) if lock_path is not None else self.path.with_suffix('.lock')
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+
+        self._lock = threading.RLock()
+        self._lock_file = open(self.lock_path, 'a+b') if HAS_FCNTL else None
+        self._lock_depth = 0
+        self._file = None
+        self._inode = None
+        self._torn = False
+        self._index: Optional[CacheIndex] = None
+        try:
+            with self.locked():
+                self._open()
+        except Exception:
+            self.close()
+            raise
+
+    @contextmanager
+    def locked(self, exclusive: bool = True):
+        """Hold the cross-process lock, re-entrant within this instance
+
+        A nested acquisition keeps the outer mode, so an exclusive section
+        may read but a shared section must not write.
+        """
+        with self._lock:
+            if self._lock_depth == 0 and self._lock_file is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    # File handling
+
+    def _open(self):
+        """Open (creating if needed) the log and its index, then index the tail"""
+        self._file = open(self.path, 'a+b', buffering=0)
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.write(self.magic)
+        elif self._pread(len(self.magic), 0) != self.magic:
+            self._file.close()
+            raise ValueError(f"{self.path} is not a {self.serializer.name} cache log")
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        if self._index is None:
+            self._index = CacheIndex(self.index_path, self._inode)
+        else:
+            self._index.open(self._inode)
+        self._scan()
+
+    def _pread(self, length: int, offset: int) -> bytes:
+        """Read length bytes at offset without moving a shared file position"""
+        if HAS_PREAD:
+            return os.pread(self._file.fileno(), length, offset)
+        # Appends ignore the position, so only readers need the lock
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    @property
+    def _end(self) -> int:
+        """End of the indexed part of the log"""
+        return max(self._index.indexed_end, len(self.magic))
+
+    def _scan(self):
+        """Index records from the end of the indexed region to the end of file"""
+        start = self._end
+        data = self._pread(max(os.fstat(self._file.fileno()).st_size - start, 0), start)
+
+        position = 0
+        header_size = RECORD_HEADER.size
+        while position + header_size <= len(data):
+            length, flags, digest = RECORD_HEADER.unpack_from(data, position)
+            payload_start = position + header_size
+            if payload_start + length > len(data):
+                break
+            position = payload_start + length
+            self._index.apply(digest, start + payload_start, length if flags == FLAG_PUT else None,
+                              start + position)
+
+        # Incomplete tail: a write in progress or one interrupted by a crash
+        self._torn = position < len(data)
+
+    def refresh(self):
+        """Pick up records appended by other processes, reopen after an external compaction"""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                stat = None
+            if stat is None or stat.st_ino != self._inode:
+                with self.locked():
+                    self._file.close()
+                    self._open()
+            elif self._index.replaced():
+                with self.locked():
+                    self._index.open(self._inode)
+                    self._scan()
+            elif stat.st_size > self._end:
+                with self.locked():
+                    self._scan()
+
+    def close(self):
+        """Close the underlying files"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._index is not None:
+                self._index.close()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    # Records
+
+    def _encode(self, key: str, flags: int, value: Optional[Dict]) -> bytes:
+        payload = self.serializer.dumps(value) if value is not None else b''
+        return RECORD_HEADER.pack(len(payload), flags, bytes.fromhex(key)) + payload
+
+    def _encode_put(self, key: str, value: Dict) -> Optional[bytes]:
+        """Encode one stored value, None (logged) if it can never be encoded"""
+        try:
+            return self._encode(key, FLAG_PUT, value)
+        except (TypeError, ValueError, struct.error) as e:
+            logger.error(f"Dropping cache record {key[:12]} that cannot be encoded: {e}")
+            return None
+
+    def _append(self, records: List[bytes]):
+        """Append encoded records in one write and index them (with the exclusive lock held)"""
+        self.refresh()
+        if self._torn:
+            # Writers hold the lock, so an incomplete tail is left over from a crash
+            logger.warning(f"Truncating incomplete record at the end of {self.path}")
+            os.truncate(self.path, self._end)
+            self._torn = False
+        self._file.write(b''.join(records))
+        self._scan()
+
+    def put(self, key: str, value: Dict):
+        """Store value under key (a hex SHA-256 digest)"""
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict]]):
+        """Store several values with a single append, dropping values that cannot be encoded
+
+        Returns:
+            Number of records written
+        """
+        records = [record for record in (self._encode_put(key, value) for key, value in items)
+                   if record is not None]
+        if not records:
+            return 0
+        with self.locked():
+            self._append(records)
+            self._maybe_compact()
+        return len(records)
+
+    def update_many(self, keys: Iterable[str], merge: Callable[[str, Optional[Dict]], Optional[Dict]]) -> int:
+        """
+        Read-modify-write several keys without losing concurrent updates.
+
+        merge is called with each key and its current value (None if absent)
+        and returns the value to store, or None to leave the key unchanged.
+        The whole batch runs under the exclusive lock and is appended at once.
+        """
+        with self.locked():
+            self.refresh()
+            records = []
+            for key in keys:
+                value = merge(key, self.get(key))
+                record = self._encode_put(key, value) if value is not None else None
+                if record is not None:
+                    records.append(record)
+            if records:
+                self._append(records)
+                self._maybe_compact()
+            return len(records)
+
+    def delete(self, key: str) -> bool:
+        """Remove key, returns False if it was not present"""
+        return self.delete_many([key]) == 1
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Remove several keys with a single append"""
+        with self.locked():
+            records = [self._encode(key, FLAG_DELETE, None) for key in keys if key in self]
+            if records:
+                self._append(records)
+                self._maybe_compact()
+            return len(records)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Read the latest value for key"""
+        with self.locked(exclusive=False):
+            location = self._index.lookup(bytes.fromhex(key))
+            if location is None:
+                return None
+            return self._read(*location)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Read several keys under one lock, in file order"""
+        with self.locked(exclusive=False):
+            locations = []
+            results = {}
+            for key in keys:
+                results[key] = None
+                location = self._index.lookup(bytes.fromhex(key))
+                if location is not None:
+                    locations.append((location, key))
+            for (offset, length), key in sorted(locations):
+                results[key] = self._read(offset, length)
+            return results
+
+    def _read(self, offset: int, length: int) -> Dict:
+        return self.serializer.loads(self._pread(length, offset))
+
+    def _locations(self) -> List[Tuple[bytes, int, int]]:
+        return sorted(self._index.entries(), key=lambda entry: entry[1])
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        """All live entries in file order"""
+        with self.locked(exclusive=False):
+            return [(digest.hex(), self._read(offset, length)) for digest, offset, length in self._locations()]
+
+    def keys(self) -> List[str]:
+        with self.locked(exclusive=False):
+            return [digest.hex() for digest, _, _ in self._index.entries()]
+
+    def __contains__(self, key: str) -> bool:
+        with self.locked(exclusive=False):
+            return self._index.lookup(bytes.fromhex(key)) is not None
+
+    def __len__(self) -> int:
+        return self._index.live
+
+    # Compaction
+
+    @property
+    def size_bytes(self) -> int:
+        return self._end
+
+    def _maybe_compact(self):
+        live = len(self.magic) + self._index.live_bytes + self._index.live * RECORD_HEADER.size
+        if self._end > self.compact_min_bytes and self._end > self.compact_ratio * live:
+            self.compact()
+
+    def compact(self):
+        """Rewrite only the live records, build their index and atomically replace both"""
+        with self.locked():
+            self.refresh()
+            temp_path = self.path.with_suffix('.compact')
+            entries = []
+            live_bytes = 0
+            with open(temp_path, 'wb') as f:
+                f.write(self.magic)
+                position = len(self.magic)
+                for digest, offset, length in self._locations():
+                    f.write(RECORD_HEADER.pack(length, FLAG_PUT, digest))
+                    f.write(self._pread(length, offset))
+                    entries.append((digest, position + RECORD_HEADER.size, length))
+                    position += RECORD_HEADER.size + length
+                    live_bytes += length
+                f.flush()
+                os.fsync(f.fileno())
+                inode = os.fstat(f.fileno()).st_ino
+
+            # An index never describes the wrong log: both carry the new inode
+            self._index.close()
+            CacheIndex.create(self.index_path, inode, self._index._capacity_for(len(entries)),
+                              entries, position, live_bytes)
+            # Windows cannot replace a file that is still open
+            self._file.close()
+            try:
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                # The new index names the compacted log's inode, so it is rebuilt on reopen
+                logger.warning(f"Could not replace {self.path} with its compacted copy: {e}")
+                temp_path.unlink(missing_ok=True)
+                self._open()
+                return
+            self._open()
+            logger.debug(f"Compacted cache log to {len(entries)} entries ({position} bytes)")
@@ -5,12 +5,11 @@ Now uses high-performance file-based cache with automatic SQLite migration
 
 import json
 import sqlite3
-import hashlib
 import time
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List, Tuple, Union
 from ..utils.utils import setup_logging
-from .file_cache import FileCacheManager
+from .file_cache import CacheEntry, FileCacheManager, get_input_hash
 from .cache_migrator import CacheMigrator
 
 logger = setup_logging()
@@ -18,13 +17,16 @@ logger = setup_logging()
 class CacheManager:
     """Manages local cache for command translations with high-performance file-based backend"""
     
-    def __init__(self, cache_path: Optional[str] = None, use_file_cache: bool = True):
+    def __init__(self, cache_path: Optional[str] = None, use_file_cache: bool = True,
+                 flush_interval: float = 1.0, flush_batch_size: int = 64):
         """
         Initialize cache manager with file-based cache and automatic SQLite migration
         
         Args:
             cache_path: Directory for cache files
             use_file_cache: Whether to use new file-based cache (default: True)
+            flush_interval: Seconds file cache writes are buffered (0 writes through)
+            flush_batch_size: Buffered file cache writes that trigger an early flush
         """
         
         # Setup cache directory
@@ -58,7 +60,8 @@ class CacheManager:
                     use_file_cache = False
             
             if use_file_cache:
-                self.cache_backend = FileCacheManager(str(cache_dir))
+                self.cache_backend = FileCacheManager(str(cache_dir), flush_interval=flush_interval,
+                                                      flush_batch_size=flush_batch_size)
                 self._using_file_cache = True
                 logger.debug("Using high-performance file-based cache")
             else:
@@ -88,10 +91,19 @@ class CacheManager:
                         platform TEXT,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        use_count INTEGER DEFAULT 1
+                        use_count INTEGER DEFAULT 1,
+                        context_hash TEXT DEFAULT '',
+                        expires_at REAL DEFAULT 0
                     )
                 ''')
                 
+                # Databases created before context and expiry were stored
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(translation_cache)')}
+                if 'context_hash' not in columns:
+                    conn.execute("ALTER TABLE translation_cache ADD COLUMN context_hash TEXT DEFAULT ''")
+                if 'expires_at' not in columns:
+                    conn.execute('ALTER TABLE translation_cache ADD COLUMN expires_at REAL DEFAULT 0')
+                
                 # Create index for faster lookups
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_input_hash ON translation_cache(input_hash)')
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_platform ON translation_cache(platform)')
@@ -109,28 +121,30 @@ class CacheManager:
     
     def _get_input_hash(self, natural_language: str, platform: str) -> str:
         """Generate hash for natural language input with platform"""
-        normalized = natural_language.lower().strip()
-        combined = f"{normalized}:{platform}"
-        return hashlib.sha256(combined.encode()).hexdigest()
+        return get_input_hash(natural_language, platform)
     
-    def get_cached_translation(self, natural_language: str, platform: str) -> Optional[Dict]:
+    def get_cached_translation(self, natural_language: str, platform: str,
+                               context_hash: Union[str, Callable[[], str], None] = None) -> Optional[Dict]:
         """
         Retrieve cached translation using the appropriate backend
         
         Args:
             natural_language: User's natural language input
             platform: Operating system platform
+            context_hash: Current context hash or a callable returning it, stale entries
+                are ignored
             
         Returns:
             Cached translation result or None if not found
         """
         
         if self._using_file_cache and self.cache_backend:
-            return self.cache_backend.get_cached_translation(natural_language, platform)
+            return self.cache_backend.get_cached_translation(natural_language, platform, context_hash)
         else:
-            return self._get_sqlite_cached_translation(natural_language, platform)
+            return self._get_sqlite_cached_translation(natural_language, platform, context_hash)
     
-    def cache_translation(self, natural_language: str, platform: str, translation_result: Dict):
+    def cache_translation(self, natural_language: str, platform: str, translation_result: Dict,
+                          context_hash: str = "", ttl: Optional[float] = None, negative: bool = False):
         """
         Store translation result using the appropriate backend
         
@@ -138,12 +152,52 @@ class CacheManager:
             natural_language: User's natural language input
             platform: Operating system platform
             translation_result: AI translation result
+            context_hash: Context the result depends on
+            ttl: Seconds until the entry expires
+            negative: Remember a failed translation (file cache only, ignored by SQLite)
+        """
+        
+        if self._using_file_cache and self.cache_backend:
+            self.cache_backend.cache_translation(natural_language, platform, translation_result,
+                                                 context_hash=context_hash, ttl=ttl, negative=negative)
+        elif not negative:
+            self._cache_sqlite_translation(natural_language, platform, translation_result, context_hash, ttl)
+    
+    def get_many(self, natural_languages: List[str], platform: str,
+                 context_hash: Optional[str] = None) -> List[Optional[Dict]]:
+        """
+        Retrieve several cached translations in one pass
+        
+        Args:
+            natural_languages: Natural language inputs
+            platform: Operating system platform
+            context_hash: Current context hash, stale entries are ignored
+            
+        Returns:
+            Cached results in input order, None for misses
+        """
+        
+        if self._using_file_cache and self.cache_backend:
+            return self.cache_backend.get_many(natural_languages, platform, context_hash)
+        else:
+            return self._get_many_sqlite(natural_languages, platform, context_hash)
+    
+    def put_many(self, items: List[Tuple[str, Dict]], platform: str,
+                 context_hash: str = "", ttl: Optional[float] = None):
+        """
+        Store several translations in one pass, e.g. to pre-warm the cache
+        
+        Args:
+            items: (natural language, translation result) pairs
+            platform: Operating system platform
+            context_hash: Context the results depend on
+            ttl: Seconds until the entries expire
         """
         
         if self._using_file_cache and self.cache_backend:
-            self.cache_backend.cache_translation(natural_language, platform, translation_result)
+            self.cache_backend.put_many(items, platform, context_hash=context_hash, ttl=ttl)
         else:
-            self._cache_sqlite_translation(natural_language, platform, translation_result)
+            self._put_many_sqlite(items, platform, context_hash, ttl)
     
     # Backward compatibility aliases
     def store_translation(self, input_hash: str, natural_language: str, command: str, 
@@ -178,6 +232,12 @@ class CacheManager:
         else:
             return self._cleanup_sqlite_old_entries(days)
     
+    def prefetch(self):
+        """Start loading the file cache in the background (no-op for SQLite)"""
+        
+        if self._using_file_cache and self.cache_backend:
+            self.cache_backend.prefetch()
+    
     def get_cache_stats(self) -> Dict:
         """Get cache statistics"""
         
@@ -190,7 +250,20 @@ class CacheManager:
             return self._get_sqlite_cache_stats()
     
     # SQLite backend methods for fallback compatibility
-    def _get_sqlite_cached_translation(self, natural_language: str, platform: str) -> Optional[Dict]:
+    @staticmethod
+    def _sqlite_row_valid(row: sqlite3.Row, current_time: float,
+                          context_hash: Union[str, Callable[[], str], None]) -> bool:
+        """Apply the file cache's expiry and context rules to a SQLite row"""
+        entry = CacheEntry(command=row['command'], context_hash=row['context_hash'] or '',
+                           expires_at=row['expires_at'] or 0.0)
+        return entry.is_valid(current_time, context_hash)
+    
+    @staticmethod
+    def _sqlite_expires_at(ttl: Optional[float]) -> float:
+        return time.time() + ttl if ttl else 0.0
+    
+    def _get_sqlite_cached_translation(self, natural_language: str, platform: str,
+                                       context_hash: Union[str, Callable[[], str], None] = None) -> Optional[Dict]:
         """SQLite implementation of get_cached_translation"""
         input_hash = self._get_input_hash(natural_language, platform)
         
@@ -198,7 +271,7 @@ class CacheManager:
             with sqlite3.connect(self.cache_path) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.execute('''
-                    SELECT command, explanation, confidence, use_count
+                    SELECT command, explanation, confidence, use_count, context_hash, expires_at
                     FROM translation_cache 
                     WHERE input_hash = ? AND platform = ?
                     ORDER BY last_used DESC
@@ -206,6 +279,9 @@ class CacheManager:
                 ''', (input_hash, platform))
                 
                 row = cursor.fetchone()
+                if row and not self._sqlite_row_valid(row, time.time(), context_hash):
+                    logger.debug(f"Stale SQLite cache entry for: {natural_language}")
+                    row = None
                 if row:
                     # Update usage statistics
                     conn.execute('''
@@ -232,7 +308,8 @@ class CacheManager:
             
         return None
     
-    def _cache_sqlite_translation(self, natural_language: str, platform: str, translation_result: Dict):
+    def _cache_sqlite_translation(self, natural_language: str, platform: str, translation_result: Dict,
+                                  context_hash: str = "", ttl: Optional[float] = None):
         """SQLite implementation of cache_translation"""
         input_hash = self._get_input_hash(natural_language, platform)
         
@@ -240,15 +317,18 @@ class CacheManager:
             with sqlite3.connect(self.cache_path) as conn:
                 conn.execute('''
                     INSERT OR REPLACE INTO translation_cache 
-                    (input_hash, natural_language, command, explanation, confidence, platform)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    (input_hash, natural_language, command, explanation, confidence, platform,
+                     context_hash, expires_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     input_hash,
                     natural_language,
                     translation_result.get('command', ''),
                     translation_result.get('explanation', ''),
                     translation_result.get('confidence', 0.0),
-                    platform
+                    platform,
+                    context_hash or '',
+                    self._sqlite_expires_at(ttl)
                 ))
                 conn.commit()
                 logger.debug(f"Cached translation to SQLite for: {natural_language}")
@@ -256,6 +336,90 @@ class CacheManager:
         except Exception as e:
             logger.error(f"Error caching to SQLite: {str(e)}")
     
+    def _get_many_sqlite(self, natural_languages: List[str], platform: str,
+                         context_hash: Optional[str] = None) -> List[Optional[Dict]]:
+        """SQLite implementation of get_many: chunked IN queries and one usage update transaction"""
+        hashes = [self._get_input_hash(text, platform) for text in natural_languages]
+        unique_hashes = list(dict.fromkeys(hashes))
+        rows = {}
+        
+        try:
+            with sqlite3.connect(self.cache_path) as conn:
+                conn.row_factory = sqlite3.Row
+                # Stay below SQLite's default limit of 999 bound parameters
+                for start in range(0, len(unique_hashes), 500):
+                    chunk = unique_hashes[start:start + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor = conn.execute(f'''
+                        SELECT input_hash, command, explanation, confidence, use_count, context_hash, expires_at
+                        FROM translation_cache
+                        WHERE platform = ? AND input_hash IN ({placeholders})
+                    ''', [platform] + chunk)
+                    current_time = time.time()
+                    for row in cursor.fetchall():
+                        if self._sqlite_row_valid(row, current_time, context_hash):
+                            rows[row['input_hash']] = row
+                
+                if rows:
+                    conn.executemany('''
+                        UPDATE translation_cache
+                        SET last_used = CURRENT_TIMESTAMP, use_count = use_count + 1
+                        WHERE input_hash = ? AND platform = ?
+                    ''', [(input_hash, platform) for input_hash in hashes if input_hash in rows])
+                    conn.commit()
+                    
+        except Exception as e:
+            logger.error(f"Error retrieving from SQLite cache: {str(e)}")
+            return [None] * len(hashes)
+        
+        results = []
+        uses = {}
+        for input_hash in hashes:
+            row = rows.get(input_hash)
+            if row is None:
+                results.append(None)
+                continue
+            uses[input_hash] = uses.get(input_hash, row['use_count']) + 1
+            results.append({
+                'command': row['command'],
+                'explanation': row['explanation'],
+                'confidence': row['confidence'],
+                'cached': True,
+                'use_count': uses[input_hash],
+                'cache_source': 'sqlite'
+            })
+        return results
+    
+    def _put_many_sqlite(self, items: List[Tuple[str, Dict]], platform: str,
+                         context_hash: str = "", ttl: Optional[float] = None):
+        """SQLite implementation of put_many: one executemany in one transaction"""
+        expires_at = self._sqlite_expires_at(ttl)
+        try:
+            with sqlite3.connect(self.cache_path) as conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO translation_cache 
+                    (input_hash, natural_language, command, explanation, confidence, platform,
+                     context_hash, expires_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (
+                        self._get_input_hash(natural_language, platform),
+                        natural_language,
+                        translation_result.get('command', ''),
+                        translation_result.get('explanation', ''),
+                        translation_result.get('confidence', 0.0),
+                        platform,
+                        context_hash or '',
+                        expires_at
+                    )
+                    for natural_language, translation_result in items
+                ])
+                conn.commit()
+                logger.debug(f"Cached {len(items)} translations to SQLite")
+                
+        except Exception as e:
+            logger.error(f"Error caching to SQLite: {str(e)}")
+    
     def _get_sqlite_popular_commands(self, limit: int = 10) -> List[Dict]:
         """SQLite implementation of get_popular_commands"""
         try:
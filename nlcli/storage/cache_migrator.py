@@ -4,10 +4,15 @@ Cache migration utility to convert SQLite cache to file-based cache
 
 import sqlite3
 import json
+import os
+import struct
 import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Any
 from ..utils.utils import setup_logging
+from .cache_log import CacheLog, HAS_FCNTL, fcntl, read_log_format
+from .serialization import SERIALIZERS, get_serializer_for_format
 
 logger = setup_logging()
 
@@ -19,6 +24,8 @@ class CacheMigrator:
         self.cache_dir = cache_dir
         self.sqlite_path = cache_dir / 'translation_cache.db'
         self.json_path = cache_dir / 'translation_cache.json'
+        self.log_path = cache_dir / 'translation_cache.log'
+        self.lock_path = cache_dir / 'cache.lock'
         self.migration_flag = cache_dir / '.migrated'
     
     def needs_migration(self) -> bool:
@@ -26,7 +33,8 @@ class CacheMigrator:
         return (
             self.sqlite_path.exists() and 
             not self.migration_flag.exists() and
-            not self.json_path.exists()
+            not self.json_path.exists() and
+            not self.log_path.exists()
         )
     
     def migrate(self) -> bool:
@@ -97,6 +105,120 @@ class CacheMigrator:
             
             return False
     
+    @contextmanager
+    def _locked(self):
+        """Exclusive cache directory lock, so only one process converts files"""
+        if not HAS_FCNTL:
+            yield
+            return
+        with open(self.lock_path, 'a+b') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def migrate_cache_log(self, serializer) -> bool:
+        """
+        Rewrite the translation cache log if its records use another serializer
+        
+        Args:
+            serializer: Serializer the cache will use from now on
+            
+        Returns:
+            True if the log is (now) in the serializer's format or does not exist
+        """
+        
+        if read_log_format(self.log_path) in (None, serializer.format_id):
+            return True
+        
+        temp_path = self.cache_dir / 'translation_cache_migrating.log'
+        private_lock = self.cache_dir / 'translation_cache_migrating.lock'
+        try:
+            with self._locked():
+                current = read_log_format(self.log_path)
+                if current in (None, serializer.format_id):
+                    return True
+                
+                source = CacheLog(self.log_path, lock_path=private_lock,
+                                  serializer=get_serializer_for_format(current, serializer.record_class))
+                items = source.items()
+                source.close()
+                
+                target = CacheLog(temp_path, lock_path=private_lock, serializer=serializer)
+                target.put_many(items)
+                target.close()
+                os.replace(temp_path, self.log_path)
+            
+            logger.info(f"Converted {len(items)} cache entries to {serializer.name} records")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Cache log conversion failed: {str(e)}")
+            return False
+        finally:
+            for path in (temp_path, temp_path.with_suffix('.idx'), private_lock):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+    
+    def migrate_history(self, serializer, history_stem: str = 'command_history') -> bool:
+        """
+        Convert a history file written by another serializer
+        
+        Args:
+            serializer: Serializer the history will use from now on
+            history_stem: History file name without suffix
+            
+        Returns:
+            True if nothing needed converting or the conversion succeeded
+        """
+        
+        target_path = self.cache_dir / f'{history_stem}{serializer.file_suffix}'
+        if target_path.exists():
+            return True
+        
+        for serializer_class in SERIALIZERS.values():
+            source_path = self.cache_dir / f'{history_stem}{serializer_class.file_suffix}'
+            if serializer_class.name == serializer.name or not source_path.exists():
+                continue
+            
+            temp_path = target_path.with_suffix('.tmp')
+            try:
+                with self._locked():
+                    if target_path.exists() or not source_path.exists():
+                        return True
+                    source = serializer_class(serializer.record_class)
+                    records, metadata = source.load_table(source_path.read_bytes())
+                    records = [serializer.record_class.from_dict(record).to_dict() for record in records]
+                    
+                    temp_path.write_bytes(serializer.dump_table(records, metadata))
+                    temp_path.replace(target_path)
+                    source_path.replace(source_path.with_name(source_path.name + '.migrated'))
+                
+                logger.info(f"Converted {len(records)} history entries to {serializer.name} format")
+                return True
+                
+            except OSError as e:
+                # Keep the history for the next start, like the cache log conversions
+                logger.error(f"History conversion failed, will retry: {str(e)}")
+                try:
+                    temp_path.unlink()
+                except OSError:
+                    pass
+                return False
+                
+            except (ValueError, KeyError, TypeError, struct.error) as e:
+                logger.error(f"History file is unreadable, starting fresh: {str(e)}")
+                try:
+                    source_path.replace(source_path.with_name(source_path.name + '.corrupt'))
+                except OSError:
+                    pass
+                return False
+        
+        return True
+    
     def _parse_timestamp(self, timestamp_str: str) -> float:
         """Convert SQLite timestamp to Unix timestamp"""
         if not timestamp_str:
@@ -36,16 +36,25 @@ class ConfigManager:
                 'model': 'gpt-4o-mini',
                 'temperature': '0.1',
                 'max_tokens': '300',
-                'timeout': '10'
+                'timeout': '10',
+                'prompt_mode': 'compact',
+                'prompt_token_budget': '800'
             },
             'performance': {
                 'enable_cache': 'true',
                 'enable_instant_patterns': 'true',
                 'api_timeout': '8.0',
+                'stream_ai': 'true',
+                'cache_ttl_seconds': '604800',
+                'negative_cache_ttl_seconds': '60',
+                'cache_flush_interval': '1.0',
+                'cache_flush_batch_size': '64',
+                'prefetch_storage': 'false',
                 'cache_cleanup_days': '30'
             },
             'storage': {
                 'db_name': 'nlcli_history.db',
+                'history_backend': 'file',
                 'backup_enabled': 'true',
                 'backup_interval_days': '7'
             }
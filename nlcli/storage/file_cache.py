@@ -4,48 +4,132 @@ Replaces SQLite with optimized file operations and in-memory caching
 """
 
 import json
+import os
 import hashlib
 import time
 import threading
-import mmap
+import weakref
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List, Tuple, Union
 from collections import OrderedDict
-from dataclasses import dataclass, asdict
 from ..utils.utils import setup_logging
+from .cache_log import CacheLog
+from .cache_migrator import CacheMigrator
+from .serialization import SlotRecord, get_serializer
+from .write_behind import get_write_behind_flusher
 
 logger = setup_logging()
 
-@dataclass
-class CacheEntry:
+
+def get_input_hash(natural_language: str, platform: str) -> str:
+    """Cache key for natural language input with platform (case and surrounding whitespace ignored)"""
+    normalized = natural_language.lower().strip()
+    combined = f"{normalized}:{platform}"
+    return hashlib.sha256(combined.encode()).hexdigest()
+
+
+def _as_float(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class CacheEntry(SlotRecord):
     """Data structure for cache entries"""
-    command: str
-    explanation: str = ""
-    confidence: float = 0.0
-    created_at: float = 0.0
-    last_used: float = 0.0
-    use_count: int = 1
-    platform: str = ""
-    
-    def to_dict(self) -> Dict:
-        """Convert to dictionary for JSON serialization"""
-        return asdict(self)
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'CacheEntry':
-        """Create from dictionary"""
-        return cls(**data)
+    __slots__ = ('command', 'explanation', 'confidence', 'created_at', 'last_used', 'use_count',
+                 'platform', 'source', 'context_hash', 'expires_at', 'negative')
+    
+    def __init__(self, command: str, explanation: str = "", confidence: float = 0.0,
+                 created_at: float = 0.0, last_used: float = 0.0, use_count: int = 1,
+                 platform: str = "", source: str = "",
+                 context_hash: str = "",   # Context the result was computed for, "" if context independent
+                 expires_at: float = 0.0,  # 0 means no expiry
+                 negative: bool = False):  # Remembered failure, no command
+        self.command = command
+        self.explanation = explanation
+        self.confidence = confidence
+        self.created_at = created_at
+        self.last_used = last_used
+        self.use_count = use_count
+        self.platform = platform
+        self.source = source
+        self.context_hash = context_hash
+        self.expires_at = expires_at
+        self.negative = negative
+    
+    def is_valid(self, current_time: float, context_hash: Union[str, Callable[[], str], None] = None) -> bool:
+        """Check expiry and whether the entry still matches the current context
+        
+        context_hash may be a callable, so computing the current context is
+        skipped for context independent entries.
+        """
+        if self.expires_at and current_time >= self.expires_at:
+            return False
+        if context_hash and self.context_hash:
+            if callable(context_hash):
+                context_hash = context_hash()
+            if context_hash and self.context_hash != context_hash:
+                return False
+        return True
+
+
+def _merge_uses(stored: Optional[Dict], count: int, last_used: float) -> Optional[Dict]:
+    """Add buffered uses to a stored record; entries removed by another instance stay removed"""
+    if stored is None:
+        return None
+    stored['use_count'] = stored.get('use_count', 1) + count
+    stored['last_used'] = max(stored.get('last_used', 0), last_used)
+    return stored
+
+
+class _WriteBuffers:
+    """Write-behind buffers of one cache, held apart from it so they can
+    still be written when the cache is collected without close()"""
+    
+    __slots__ = ('pending', 'dirty', 'log')
+    
+    def __init__(self):
+        # New entries, and uses of stored entries as (use count delta, last used)
+        self.pending: Dict[str, CacheEntry] = {}
+        self.dirty: Dict[str, Tuple[int, float]] = {}
+        self.log: Optional[CacheLog] = None
+    
+    def flush_abandoned(self):
+        """Write what a collected cache left buffered and release its log"""
+        log, self.log = self.log, None
+        if log is None:
+            return
+        try:
+            if not log.path.parent.is_dir():
+                return
+            if self.pending:
+                log.put_many((key, entry.to_dict()) for key, entry in self.pending.items())
+            if self.dirty:
+                uses = self.dirty
+                log.update_many(uses, lambda key, stored: _merge_uses(stored, *uses[key]))
+        except Exception as e:
+            logger.error(f"Error saving buffered writes of a discarded cache: {str(e)}")
+        finally:
+            self.pending.clear()
+            self.dirty.clear()
+            log.close()
+
 
 class FileCacheManager:
     """High-performance file-based cache with in-memory layer and cross-instance sharing"""
     
-    def __init__(self, cache_path: Optional[str] = None, max_memory_entries: int = 1000):
+    def __init__(self, cache_path: Optional[str] = None, max_memory_entries: int = 1000,
+                 flush_interval: float = 1.0, flush_batch_size: int = 64, serializer: str = 'binary'):
         """
         Initialize file cache manager
         
         Args:
             cache_path: Directory for cache files
             max_memory_entries: Maximum entries to keep in memory
+            flush_interval: Seconds buffered writes may wait for the background flush (0 writes through)
+            flush_batch_size: Buffered keys that trigger an early flush; four times this blocks the writer
+            serializer: Record format of the log, 'binary' or 'json' (existing logs are converted)
         """
         
         # Setup cache directory
@@ -56,14 +140,36 @@ class FileCacheManager:
         
         cache_dir.mkdir(exist_ok=True)
         self.cache_dir = cache_dir
-        self.cache_file = cache_dir / 'translation_cache.json'
+        self.cache_file = cache_dir / 'translation_cache.log'
+        self.legacy_cache_file = cache_dir / 'translation_cache.json'
         self.lock_file = cache_dir / 'cache.lock'
         self.stats_file = cache_dir / 'cache_stats.json'
+        self.serializer = get_serializer(serializer, CacheEntry)
         
         # In-memory LRU cache for fastest access
         self.memory_cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self.max_memory_entries = max_memory_entries
         
+        # Write-behind buffers, coalesced per key until the next flush:
+        # new entries, and uses of stored entries as (use count delta, last used).
+        # The background flusher holds caches weakly, so whatever is still
+        # buffered when this cache is collected without close() is written
+        # by a finalizer that does not reference it
+        self._buffers = _WriteBuffers()
+        self._pending = self._buffers.pending
+        self._dirty = self._buffers.dirty
+        self._finalizer = weakref.finalize(self, self._buffers.flush_abandoned)
+        # The flusher writes live caches at exit, before their logs may close
+        self._finalizer.atexit = False
+        self.flush_interval = flush_interval
+        self.flush_batch_size = max(1, flush_batch_size)
+        self.max_pending = self.flush_batch_size * 4
+        self._last_flush = time.time()
+        # Failed flushes are retried with backoff, then the buffered writes are dropped
+        self.max_flush_attempts = 3
+        self._failed_flushes = 0
+        self._retry_at = 0.0
+        
         # Thread safety
         self._lock = threading.RLock()
         
@@ -72,82 +178,172 @@ class FileCacheManager:
             'memory_hits': 0,
             'file_hits': 0,
             'misses': 0,
+            'stale': 0,
+            'negative_hits': 0,
             'writes': 0,
             'total_entries': 0,
             'total_hits': 0,
             'total_requests': 0
         }
         
-        # Initialize cache
-        self._load_from_file()
-        self._load_stats()
+        # Files are opened on first access, so commands answered before the
+        # cache is consulted (Levels 1-2) never touch them
+        self._log: Optional[CacheLog] = None
+        self._loaded = False
         
         logger.debug(f"File cache initialized at {self.cache_dir}")
     
+    @property
+    def log(self) -> Optional[CacheLog]:
+        """Record log, opened on first access"""
+        if not self._loaded:
+            self._ensure_loaded()
+        return self._log
+    
+    def _ensure_loaded(self):
+        """Open the log and load statistics once"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            self._load_from_file()
+            self._load_stats()
+            
+            if self.flush_interval > 0:
+                get_write_behind_flusher().register(self)
+    
+    def prefetch(self) -> threading.Thread:
+        """Open the cache files in a background thread ahead of the first lookup"""
+        thread = threading.Thread(target=self._ensure_loaded, name='nlcli-cache-prefetch', daemon=True)
+        thread.start()
+        return thread
+    
     def _get_input_hash(self, natural_language: str, platform: str) -> str:
         """Generate hash for natural language input with platform"""
-        normalized = natural_language.lower().strip()
-        combined = f"{normalized}:{platform}"
-        return hashlib.sha256(combined.encode()).hexdigest()
+        return get_input_hash(natural_language, platform)
     
     def _load_from_file(self):
-        """Load cache data from file into memory"""
-        if not self.cache_file.exists():
-            return
-        
+        """Open the record log, importing a legacy JSON cache file once"""
+        with self._lock:
+            CacheMigrator(self.cache_dir).migrate_cache_log(self.serializer)
+            try:
+                self._log = CacheLog(self.cache_file, lock_path=self.lock_file, serializer=self.serializer)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error opening cache log, starting empty: {str(e)}")
+                try:
+                    self.cache_file.replace(self.cache_file.with_suffix('.corrupt'))
+                    self._log = CacheLog(self.cache_file, lock_path=self.lock_file, serializer=self.serializer)
+                except OSError:
+                    self._log = None
+                    return
+            self._buffers.log = self._log
+            
+            if self.legacy_cache_file.exists():
+                self._import_legacy_json()
+            
+            self._stats['total_entries'] = len(self.log)
+            logger.debug(f"Indexed {len(self.log)} cache entries")
+    
+    def _import_legacy_json(self):
+        """Move entries from the old whole-file JSON cache into the log"""
         try:
-            with self._lock:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Load entries into memory cache (most recent first)
-                entries = [(k, CacheEntry.from_dict(v)) for k, v in data.items()]
-                
-                # Sort by last_used descending and take the most recent ones
-                entries.sort(key=lambda x: x[1].last_used, reverse=True)
-                
-                self.memory_cache.clear()
-                for key, entry in entries[:self.max_memory_entries]:
-                    self.memory_cache[key] = entry
-                
-                self._stats['total_entries'] = len(data)
-                logger.debug(f"Loaded {len(self.memory_cache)} entries into memory cache")
-                
+            with open(self.legacy_cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.log.put_many(
+                (key, CacheEntry.from_dict(value).to_dict()) for key, value in data.items() if key not in self.log
+            )
+            self.legacy_cache_file.replace(self.legacy_cache_file.with_suffix('.json.imported'))
+            logger.info(f"Imported {len(data)} entries from {self.legacy_cache_file}")
         except Exception as e:
-            logger.error(f"Error loading cache from file: {str(e)}")
-            self.memory_cache.clear()
+            logger.error(f"Error importing legacy cache file: {str(e)}")
     
     def _save_to_file(self):
-        """Save memory cache to file for persistence"""
+        """Append buffered entries and merge buffered use counts into the log"""
         try:
             with self._lock:
-                # Load existing file data
-                existing_data = {}
-                if self.cache_file.exists():
-                    try:
-                        with open(self.cache_file, 'r', encoding='utf-8') as f:
-                            existing_data = json.load(f)
-                    except (json.JSONDecodeError, FileNotFoundError, IOError):
-                        existing_data = {}
+                self._last_flush = time.time()
+                if not (self._pending or self._dirty) or self.log is None:
+                    return
+                if not self.cache_dir.is_dir():
+                    logger.debug(f"Cache directory {self.cache_dir} was removed, discarding buffered writes")
+                    self._pending.clear()
+                    self._dirty.clear()
+                    return
+                # The buffers are shared with the finalizer, so they are emptied rather than replaced
+                pending, uses = dict(self._pending), dict(self._dirty)
+                self._pending.clear()
+                self._dirty.clear()
                 
-                # Merge memory cache with existing data
-                for key, entry in self.memory_cache.items():
-                    existing_data[key] = entry.to_dict()
+                def merge(key: str, stored: Optional[Dict]) -> Optional[Dict]:
+                    stored = _merge_uses(stored, *uses[key])
+                    if stored is not None and key in self.memory_cache:
+                        self.memory_cache[key].use_count = stored['use_count']
+                    return stored
                 
-                # Write atomically using temporary file
-                temp_file = self.cache_file.with_suffix('.tmp')
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    json.dump(existing_data, f, separators=(',', ':'))
-                
-                # Atomic rename
-                temp_file.replace(self.cache_file)
-                
-                self._stats['total_entries'] = len(existing_data)
+                try:
+                    self.log.put_many((key, entry.to_dict()) for key, entry in pending.items())
+                    pending = {}
+                    self.log.update_many(uses, merge)
+                except Exception:
+                    self._failed_flushes += 1
+                    if self._failed_flushes >= self.max_flush_attempts:
+                        logger.error(f"Dropping {len(pending) + len(uses)} buffered cache writes "
+                                     f"after {self._failed_flushes} failed flushes")
+                        self._failed_flushes = 0
+                        self._retry_at = 0.0
+                        raise
+                    # Keep what was not written for the next flush, which waits
+                    # longer after each failure
+                    for key, entry in pending.items():
+                        self._pending.setdefault(key, entry)
+                    for key, (count, last_used) in uses.items():
+                        if key not in self._pending:
+                            previous, _ = self._dirty.get(key, (0, 0.0))
+                            self._dirty[key] = (previous + count, last_used)
+                    self._retry_at = time.time() + max(self.flush_interval, 1.0) * 2 ** self._failed_flushes
+                    raise
+                self._failed_flushes = 0
+                self._retry_at = 0.0
+                self._stats['total_entries'] = len(self.log)
                 self._save_stats()
                 
         except Exception as e:
             logger.error(f"Error saving cache to file: {str(e)}")
     
+    def _buffered(self):
+        """Flush in this thread when there is no background flush or the buffer is full, else wake the flusher"""
+        if self._retry_at and time.time() < self._retry_at:
+            return
+        buffered = len(self._pending) + len(self._dirty)
+        if self.flush_interval <= 0 or buffered >= self.max_pending:
+            self._save_to_file()
+        elif buffered >= self.flush_batch_size:
+            get_write_behind_flusher().notify()
+    
+    def _mark_dirty(self, key: str, entry: CacheEntry):
+        """Count a use to merge into the log with the next flush"""
+        self._count_use(key, entry)
+        self._buffered()
+    
+    def _count_use(self, key: str, entry: CacheEntry):
+        if key not in self._pending:
+            # A buffered new entry already carries its use count
+            count, _ = self._dirty.get(key, (0, 0.0))
+            self._dirty[key] = (count + 1, entry.last_used)
+    
+    def flush_due(self, now: float) -> bool:
+        """Whether the background flusher should flush this cache now"""
+        buffered = len(self._pending) + len(self._dirty)
+        if buffered == 0 or now < self._retry_at:
+            return False
+        return buffered >= self.flush_batch_size or now - self._last_flush >= self.flush_interval
+    
+    def flush(self):
+        """Write buffered changes to the log"""
+        self._save_to_file()
+    
     def _load_stats(self):
         """Load performance statistics"""
         if self.stats_file.exists():
@@ -161,8 +357,10 @@ class FileCacheManager:
     def _save_stats(self):
         """Save performance statistics"""
         try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
+            temp_file = self.stats_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
                 json.dump(self._stats, f)
+            os.replace(temp_file, self.stats_file)
         except (OSError, PermissionError, ValueError):
             pass
     
@@ -176,21 +374,43 @@ class FileCacheManager:
             # Add to end (most recent)
             self.memory_cache[key] = entry
             
-            # Evict oldest if over limit
+            # Evict oldest if over limit (pending uses are kept in _dirty)
             while len(self.memory_cache) > self.max_memory_entries:
                 self.memory_cache.popitem(last=False)
     
-    def get_cached_translation(self, natural_language: str, platform: str) -> Optional[Dict]:
+    def _entry_result(self, entry: CacheEntry, cache_source: str) -> Dict:
+        """Build the result dict returned for a cache hit"""
+        result = {
+            'command': entry.command,
+            'explanation': entry.explanation,
+            'confidence': entry.confidence,
+            'cached': True,
+            'use_count': entry.use_count,
+            'cache_source': cache_source
+        }
+        if entry.source:
+            result['source'] = entry.source
+        if entry.negative:
+            result['negative'] = True
+            self._stats['negative_hits'] += 1
+        return result
+    
+    def get_cached_translation(self, natural_language: str, platform: str,
+                               context_hash: Union[str, Callable[[], str], None] = None) -> Optional[Dict]:
         """
         Retrieve cached translation with memory-first lookup
         
         Args:
             natural_language: User's natural language input
             platform: Operating system platform
+            context_hash: Current context hash, or a callable returning it that is only
+                called for context dependent entries; entries stored for another context are stale
             
         Returns:
-            Cached translation result or None if not found
+            Cached translation result or None if not found. Remembered failures
+            are returned with 'negative': True.
         """
+        self._ensure_loaded()
         
         input_hash = self._get_input_hash(natural_language, platform)
         current_time = time.time()
@@ -199,67 +419,61 @@ class FileCacheManager:
         with self._lock:
             self._stats['total_requests'] += 1
             
-            if input_hash in self.memory_cache:
-                entry = self.memory_cache[input_hash]
+            # Entries evicted from memory before their flush are still buffered
+            entry = self.memory_cache.get(input_hash) or self._pending.get(input_hash)
+            if entry is not None:
+                
+                if not entry.is_valid(current_time, context_hash):
+                    # Expired or computed for another context
+                    self.memory_cache.pop(input_hash, None)
+                    self._stats['stale'] += 1
+                    self._stats['misses'] += 1
+                    return None
                 
                 # Update usage statistics
                 entry.last_used = current_time
                 entry.use_count += 1
                 
                 # Move to end (most recent)
-                self.memory_cache.move_to_end(input_hash)
+                self._update_memory_cache(input_hash, entry)
+                self._mark_dirty(input_hash, entry)
                 
                 self._stats['memory_hits'] += 1
                 self._stats['total_hits'] += 1
                 
-                result = {
-                    'command': entry.command,
-                    'explanation': entry.explanation,
-                    'confidence': entry.confidence,
-                    'cached': True,
-                    'use_count': entry.use_count,
-                    'cache_source': 'memory'
-                }
+                result = self._entry_result(entry, 'memory')
                 
                 logger.debug(f"Memory cache hit for: {natural_language}")
                 return result
         
-        # Try file cache (slower but still fast)
+        # Try the record log (single seek), picking up writes from other instances
         try:
-            if self.cache_file.exists():
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+            with self._lock:
+                entry_data = None
+                if self.log is not None:
+                    self.log.refresh()
+                    entry_data = self.log.get(input_hash)
                 
-                if input_hash in data:
-                    entry_data = data[input_hash]
+                if entry_data is not None:
                     entry = CacheEntry.from_dict(entry_data)
                     
+                    if not entry.is_valid(current_time, context_hash):
+                        self._stats['stale'] += 1
+                        self._stats['misses'] += 1
+                        return None
+                    
                     # Update usage statistics
                     entry.last_used = current_time
                     entry.use_count += 1
                     
-                    # Add to memory cache for future access
+                    # Add to memory cache for future access, usage is persisted with the next flush
                     self._update_memory_cache(input_hash, entry)
-                    
-                    # Update file asynchronously to avoid blocking
-                    data[input_hash] = entry.to_dict()
-                    try:
-                        with open(self.cache_file, 'w', encoding='utf-8') as f:
-                            json.dump(data, f, separators=(',', ':'))
-                    except (OSError, PermissionError, ValueError):
-                        pass  # Don't block on file write errors
+                    self._mark_dirty(input_hash, entry)
                     
                     self._stats['file_hits'] += 1
                     self._stats['total_hits'] += 1
                     
-                    result = {
-                        'command': entry.command,
-                        'explanation': entry.explanation,
-                        'confidence': entry.confidence,
-                        'cached': True,
-                        'use_count': entry.use_count,
-                        'cache_source': 'file'
-                    }
+                    result = self._entry_result(entry, 'file')
                     
                     logger.debug(f"File cache hit for: {natural_language}")
                     return result
@@ -271,7 +485,8 @@ class FileCacheManager:
         self._stats['misses'] += 1
         return None
     
-    def cache_translation(self, natural_language: str, platform: str, translation_result: Dict):
+    def cache_translation(self, natural_language: str, platform: str, translation_result: Dict,
+                          context_hash: str = "", ttl: Optional[float] = None, negative: bool = False):
         """
         Store translation result in cache
         
@@ -279,46 +494,156 @@ class FileCacheManager:
             natural_language: User's natural language input
             platform: Operating system platform
             translation_result: AI translation result
+            context_hash: Context the result depends on ("" if context independent)
+            ttl: Seconds until the entry expires (None keeps it until cleanup)
+            negative: Remember a failed translation instead of a command
         """
+        self._ensure_loaded()
         
         input_hash = self._get_input_hash(natural_language, platform)
-        current_time = time.time()
+        entry = self._make_entry(platform, translation_result, time.time(), context_hash, ttl, negative)
         
-        # Create cache entry
-        entry = CacheEntry(
-            command=translation_result.get('command', ''),
-            explanation=translation_result.get('explanation', ''),
-            confidence=translation_result.get('confidence', 0.0),
+        # Update memory cache and buffer the append for the background flush
+        with self._lock:
+            self._update_memory_cache(input_hash, entry)
+            self._pending[input_hash] = entry
+            self._dirty.pop(input_hash, None)
+            self._stats['writes'] += 1
+            self._buffered()
+        
+        logger.debug(f"Cached translation for: {natural_language}")
+    
+    def _make_entry(self, platform: str, translation_result: Dict, current_time: float,
+                    context_hash: str = "", ttl: Optional[float] = None, negative: bool = False) -> CacheEntry:
+        """Create a cache entry for a translation result, converting fields to their stored types"""
+        return CacheEntry(
+            command=str(translation_result.get('command') or ''),
+            explanation=str(translation_result.get('explanation') or ''),
+            confidence=_as_float(translation_result.get('confidence'), 0.0),
             created_at=current_time,
             last_used=current_time,
             use_count=1,
-            platform=platform
+            platform=str(platform or ''),
+            source=str(translation_result.get('source') or ''),
+            context_hash=str(context_hash or ''),
+            expires_at=current_time + _as_float(ttl) if ttl else 0.0,
+            negative=bool(negative)
         )
+    
+    def get_many(self, natural_languages: List[str], platform: str,
+                 context_hash: Optional[str] = None) -> List[Optional[Dict]]:
+        """
+        Look up several translations with one lock and one pass over the log
         
-        # Update memory cache
-        self._update_memory_cache(input_hash, entry)
+        Args:
+            natural_languages: Natural language inputs
+            platform: Operating system platform
+            context_hash: Current context hash, entries cached for another context are stale
+            
+        Returns:
+            Results in input order, None for misses
+        """
+        self._ensure_loaded()
         
-        # Save to file asynchronously every few writes to avoid blocking
-        self._stats['writes'] += 1
-        if self._stats['writes'] % 5 == 0:  # Batch writes
-            threading.Thread(target=self._save_to_file, daemon=True).start()
+        current_time = time.time()
+        hashes = [self._get_input_hash(text, platform) for text in natural_languages]
+        results: List[Optional[Dict]] = [None] * len(hashes)
         
-        logger.debug(f"Cached translation for: {natural_language}")
+        with self._lock:
+            self._stats['total_requests'] += len(hashes)
+            
+            # Memory and write buffer first, the rest from the log in file order
+            found = {}
+            for input_hash in hashes:
+                entry = self.memory_cache.get(input_hash) or self._pending.get(input_hash)
+                if entry is not None:
+                    found[input_hash] = (entry, 'memory')
+            missing = [input_hash for input_hash in dict.fromkeys(hashes) if input_hash not in found]
+            if missing and self.log is not None:
+                try:
+                    self.log.refresh()
+                    for input_hash, entry_data in self.log.get_many(missing).items():
+                        if entry_data is not None:
+                            found[input_hash] = (CacheEntry.from_dict(entry_data), 'file')
+                except Exception as e:
+                    logger.error(f"Error reading from file cache: {str(e)}")
+            
+            for position, input_hash in enumerate(hashes):
+                entry, source = found.get(input_hash, (None, None))
+                if entry is None:
+                    self._stats['misses'] += 1
+                    continue
+                if not entry.is_valid(current_time, context_hash):
+                    self._stats['stale'] += 1
+                    self._stats['misses'] += 1
+                    continue
+                
+                entry.last_used = current_time
+                entry.use_count += 1
+                self._update_memory_cache(input_hash, entry)
+                self._count_use(input_hash, entry)
+                
+                self._stats['memory_hits' if source == 'memory' else 'file_hits'] += 1
+                self._stats['total_hits'] += 1
+                results[position] = self._entry_result(entry, source)
+            
+            self._buffered()
+        
+        return results
     
-    def get_popular_commands(self, limit: int = 10) -> List[Dict]:
-        """Get most frequently used commands from memory and file"""
+    def put_many(self, items: List[Tuple[str, Dict]], platform: str,
+                 context_hash: str = "", ttl: Optional[float] = None):
+        """
+        Store several translations with one lock and a single append
         
-        all_entries = []
+        Args:
+            items: (natural language, translation result) pairs
+            platform: Operating system platform
+            context_hash: Context the results depend on ("" if context independent)
+            ttl: Seconds until the entries expire (None keeps them until cleanup)
+        """
+        self._ensure_loaded()
         
-        # Get from memory cache
+        current_time = time.time()
         with self._lock:
-            for entry in self.memory_cache.values():
-                all_entries.append({
-                    'natural_language': '',  # Not stored in current implementation
-                    'command': entry.command,
-                    'use_count': entry.use_count,
-                    'last_used': entry.last_used
-                })
+            for natural_language, translation_result in items:
+                input_hash = self._get_input_hash(natural_language, platform)
+                entry = self._make_entry(platform, translation_result, current_time, context_hash, ttl)
+                self._update_memory_cache(input_hash, entry)
+                self._pending[input_hash] = entry
+                self._dirty.pop(input_hash, None)
+                self._stats['writes'] += 1
+            self._save_to_file()
+        
+        logger.debug(f"Cached {len(items)} translations")
+    
+    def get_popular_commands(self, limit: int = 10) -> List[Dict]:
+        """Get most frequently used commands from the log, including buffered writes and uses"""
+        self._ensure_loaded()
+        
+        with self._lock:
+            entries: Dict[str, Dict] = {}
+            try:
+                if self.log is not None:
+                    entries = dict(self.log.items())
+            except Exception as e:
+                logger.error(f"Error reading cache log for popular commands: {str(e)}")
+            
+            for key, (count, last_used) in self._dirty.items():
+                if key in entries:
+                    entries[key]['use_count'] = entries[key].get('use_count', 1) + count
+                    entries[key]['last_used'] = max(entries[key].get('last_used', 0.0), last_used)
+            for key, entry in self._pending.items():
+                entries[key] = entry.to_dict()
+            for key, entry in self.memory_cache.items():
+                entries.setdefault(key, entry.to_dict())
+        
+        all_entries = [{
+            'natural_language': '',  # Not stored in current implementation
+            'command': entry.get('command', ''),
+            'use_count': entry.get('use_count', 1),
+            'last_used': entry.get('last_used', 0.0)
+        } for entry in entries.values() if not entry.get('negative')]
         
         # Sort by use count and last used
         all_entries.sort(key=lambda x: (x['use_count'], x['last_used']), reverse=True)
@@ -327,42 +652,38 @@ class FileCacheManager:
     
     def cleanup_old_entries(self, days: int = 30) -> int:
         """Remove cache entries older than specified days"""
+        self._ensure_loaded()
         
         cutoff_time = time.time() - (days * 24 * 60 * 60)
-        deleted_count = 0
         
         try:
-            # Clean memory cache
             with self._lock:
-                to_remove = [
+                # Persist recent use first so it counts towards last_used
+                self._save_to_file()
+                
+                # Expired entries in memory only (not yet written)
+                to_remove = {
                     key for key, entry in self.memory_cache.items()
                     if entry.last_used < cutoff_time
-                ]
-                
-                for key in to_remove:
-                    del self.memory_cache[key]
-                    deleted_count += 1
-            
-            # Clean file cache
-            if self.cache_file.exists():
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                original_count = len(data)
-                
-                # Remove old entries
-                data = {
-                    k: v for k, v in data.items()
-                    if v.get('last_used', 0) >= cutoff_time
                 }
                 
-                deleted_count += original_count - len(data)
+                # Decide on the log's latest values, delete and compact under one
+                # exclusive lock so no other instance writes in between
+                if self.log is not None:
+                    with self.log.locked():
+                        expired = {
+                            key for key, value in self.log.items()
+                            if value.get('last_used', 0) < cutoff_time
+                        }
+                        to_remove = {key for key in to_remove if key not in self.log} | expired
+                        self.log.delete_many(expired)
+                        self.log.compact()
+                    self._stats['total_entries'] = len(self.log)
                 
-                # Save updated data
-                with open(self.cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, separators=(',', ':'))
+                for key in to_remove:
+                    self.memory_cache.pop(key, None)
                 
-                self._stats['total_entries'] = len(data)
+                deleted_count = len(to_remove)
             
             if deleted_count > 0:
                 logger.info(f"Cleaned up {deleted_count} old cache entries")
@@ -376,6 +697,7 @@ class FileCacheManager:
     
     def get_cache_stats(self) -> Dict:
         """Get cache performance statistics"""
+        self._ensure_loaded()
         
         with self._lock:
             total_requests = self._stats.get('total_requests', 0)
@@ -389,6 +711,10 @@ class FileCacheManager:
             if total_requests > 0:
                 memory_hit_rate = (self._stats['memory_hits'] / total_requests) * 100
             
+            if self.log is not None:
+                unflushed = sum(1 for key in self._pending if key not in self.log)
+                self._stats['total_entries'] = len(self.log) + unflushed
+            
             return {
                 'total_entries': self._stats['total_entries'],
                 'memory_entries': len(self.memory_cache),
@@ -397,21 +723,35 @@ class FileCacheManager:
                 'memory_hits': self._stats['memory_hits'],
                 'file_hits': self._stats['file_hits'],
                 'misses': self._stats['misses'],
+                'stale': self._stats['stale'],
+                'negative_hits': self._stats['negative_hits'],
                 'hit_rate': round(hit_rate, 1),
                 'memory_hit_rate': round(memory_hit_rate, 1),
-                'writes': self._stats['writes']
+                'writes': self._stats['writes'],
+                'pending_writes': len(self._pending) + len(self._dirty)
             }
     
     def force_save(self):
         """Force save memory cache to file"""
         self._save_to_file()
+        self._save_stats()
+    
+    def close(self):
+        """Flush buffered writes and release the log"""
+        get_write_behind_flusher().unregister(self)
+        self._save_to_file()
+        with self._lock:
+            self._buffers.log = None
+            if self._log is not None:
+                self._log.close()
+                self._log = None
     
     def get_cache_size_info(self) -> Dict:
         """Get cache size information"""
+        self._ensure_loaded()
+        
         try:
-            file_size = 0
-            if self.cache_file.exists():
-                file_size = self.cache_file.stat().st_size
+            file_size = self.log.size_bytes if self.log is not None else 0
             
             return {
                 'file_size_bytes': file_size,
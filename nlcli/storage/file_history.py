@@ -1,53 +1,67 @@
 """
-File-based history manager using JSON storage
+File-based history manager with a snapshot file and an append-only journal
 Replaces SQLite with high-performance file operations
 """
 
 import json
+import os
+import struct
 import time
 import threading
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+from typing import Deque, List, Dict, Optional, Tuple
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    fcntl = None
+    HAS_FCNTL = False
 from ..utils.utils import setup_logging
+from .cache_migrator import CacheMigrator
+from .history_index import HistorySearchIndex
+from .serialization import SlotRecord, get_serializer, get_serializer_for_format
+from .write_behind import get_write_behind_flusher
 
 logger = setup_logging()
 
-@dataclass
-class HistoryEntry:
+# Journal: magic with the record format_id, then length-prefixed records
+JOURNAL_MAGIC_PREFIX = b'NLCJRN'
+JOURNAL_HEADER_SIZE = len(JOURNAL_MAGIC_PREFIX) + 2
+JOURNAL_RECORD = struct.Struct('<I')
+
+class HistoryEntry(SlotRecord):
     """Data structure for history entries"""
-    id: int
-    natural_language: str
-    command: str
-    explanation: str = ""
-    success: bool = True
-    timestamp: float = 0.0
-    platform: str = ""
-    session_id: str = ""
-    
-    def __post_init__(self):
-        if self.timestamp == 0.0:
-            self.timestamp = time.time()
-    
-    def to_dict(self) -> Dict:
-        """Convert to dictionary for JSON serialization"""
-        return asdict(self)
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'HistoryEntry':
-        """Create from dictionary"""
-        return cls(**data)
+    __slots__ = ('id', 'natural_language', 'command', 'explanation', 'success',
+                 'timestamp', 'platform', 'session_id')
+    
+    def __init__(self, id: int, natural_language: str, command: str, explanation: str = "",
+                 success: bool = True, timestamp: float = 0.0, platform: str = "", session_id: str = ""):
+        self.id = id
+        self.natural_language = natural_language
+        self.command = command
+        self.explanation = explanation
+        self.success = success
+        self.timestamp = timestamp or time.time()
+        self.platform = platform
+        self.session_id = session_id
 
 class FileHistoryManager:
-    """High-performance file-based history manager with JSON storage"""
+    """High-performance file-based history manager with pluggable (binary or JSON) storage"""
     
-    def __init__(self, cache_path: Optional[str] = None, max_entries: int = 1000):
+    def __init__(self, cache_path: Optional[str] = None, max_entries: int = 1000,
+                 serializer: str = 'binary', trigram_search: bool = True):
         """
         Initialize file history manager
         
         Args:
             cache_path: Directory for history files
             max_entries: Maximum number of entries to keep
+            serializer: History file format, 'binary' or 'json' (existing files are converted)
+            trigram_search: Index trigrams so searches match any substring (word matches otherwise)
         """
         
         # Setup history directory
@@ -58,78 +72,265 @@ class FileHistoryManager:
         
         cache_dir.mkdir(exist_ok=True)
         self.cache_dir = cache_dir
-        self.history_file = cache_dir / 'command_history.json'
+        self.serializer = get_serializer(serializer, HistoryEntry)
+        self.history_file = cache_dir / f'command_history{self.serializer.file_suffix}'
+        self.journal_file = cache_dir / 'command_history.journal'
         self.stats_file = cache_dir / 'history_stats.json'
+        self.lock_file = cache_dir / 'history.lock'
         
         # Configuration
         self.max_entries = max_entries
         
-        # In-memory storage for fast access
-        self.entries: List[HistoryEntry] = []
-        self.next_id = 1
+        # In-memory storage for fast access, filled on first access
+        self._entries: Deque[HistoryEntry] = deque(maxlen=max_entries)
+        self._index = HistorySearchIndex(use_trigrams=trigram_search)
+        self._next_id = 1
+        self._loaded = False
         
-        # Thread safety
+        # Commands are appended to the journal; the snapshot is rewritten in
+        # the background once the journal outgrows max_entries. The position
+        # and snapshot inode tell which changes of other processes are applied.
+        self._journal_records = 0
+        self._journal_position = 0
+        self._snapshot_inode: Optional[int] = None
+        self._compactor: Optional[threading.Thread] = None
+        
+        # Thread safety; appends and compaction also hold an exclusive flock
+        # on lock_file so processes sharing the history lose no commands
         self._lock = threading.RLock()
+        self._lock_handle = None
+        self._lock_depth = 0
         
-        # Performance counters
+        # Performance counters, written by the write-behind flusher when changed
         self._stats = {
             'total_commands': 0,
             'successful_commands': 0,
             'failed_commands': 0,
             'searches_performed': 0
         }
-        
-        # Initialize
-        self._load_from_file()
-        self._load_stats()
+        self._counted_next_id: Optional[int] = None  # First command id not yet in the counters
+        self._stats_dirty = False
+        self._stats_saved_at = 0.0
+        self.flush_interval = 1.0
         
         logger.debug(f"File history manager initialized at {self.cache_dir}")
     
-    def _load_from_file(self):
-        """Load history data from file into memory"""
-        if not self.history_file.exists():
+    @property
+    def entries(self) -> Deque[HistoryEntry]:
+        """History entries, newest first, loaded on first access"""
+        if not self._loaded:
+            self._ensure_loaded()
+        return self._entries
+    
+    @entries.setter
+    def entries(self, value: List[HistoryEntry]):
+        self._ensure_loaded()
+        with self._lock:
+            self._set_entries(value)
+    
+    @property
+    def next_id(self) -> int:
+        if not self._loaded:
+            self._ensure_loaded()
+        return self._next_id
+    
+    @next_id.setter
+    def next_id(self, value: int):
+        self._ensure_loaded()
+        self._next_id = value
+    
+    def _set_entries(self, entries: List[HistoryEntry]):
+        """Replace all entries (newest first) and rebuild the search index"""
+        self._entries = deque(entries, maxlen=self.max_entries)
+        self._index.clear()
+        self._index.add_all(reversed(self._entries))
+    
+    def _push(self, entry: HistoryEntry):
+        """Add the newest entry, evicting the oldest once max_entries is reached"""
+        if len(self._entries) == self.max_entries:
+            self._index.remove(self._entries[-1])
+        self._entries.appendleft(entry)
+        self._index.add(entry)
+    
+    def _ensure_loaded(self):
+        """Read the history file and statistics once"""
+        if self._loaded:
             return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            self._load_stats()
+            self._load_from_file()
+            get_write_behind_flusher().register(self)
+    
+    @contextmanager
+    def _locked(self):
+        """Hold the in-process lock and the exclusive cross-process lock, re-entrant"""
+        with self._lock:
+            if self._lock_depth == 0 and HAS_FCNTL:
+                if self._lock_handle is None:
+                    self._lock_handle = open(self.lock_file, 'a+b')
+                fcntl.flock(self._lock_handle.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_handle is not None:
+                    fcntl.flock(self._lock_handle.fileno(), fcntl.LOCK_UN)
+    
+    def prefetch(self) -> threading.Thread:
+        """Read the history file in a background thread ahead of the first access"""
+        thread = threading.Thread(target=self._ensure_loaded, name='nlcli-history-prefetch', daemon=True)
+        thread.start()
+        return thread
+    
+    def _load_from_file(self):
+        """Load the history snapshot and replay the journal into memory"""
+        CacheMigrator(self.cache_dir).migrate_history(self.serializer)
         
         try:
-            with self._lock:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Load entries
-                self.entries = [HistoryEntry.from_dict(entry) for entry in data.get('entries', [])]
-                self.next_id = data.get('next_id', 1)
-                
-                # Ensure chronological order (newest first)
-                self.entries.sort(key=lambda x: x.timestamp, reverse=True)
-                
-                logger.debug(f"Loaded {len(self.entries)} history entries")
+            with self._locked():
+                self._reload()
+                logger.debug(f"Loaded {len(self._entries)} history entries")
                 
         except Exception as e:
             logger.error(f"Error loading history from file: {str(e)}")
-            self.entries = []
-            self.next_id = 1
+            self._set_entries([])
+            self._next_id = 1
+    
+    def _reload(self):
+        """Read the snapshot and replay the whole journal (with the lock held)"""
+        records, metadata = [], {}
+        self._snapshot_inode = _inode(self.history_file)
+        if self._snapshot_inode is not None:
+            with open(self.history_file, 'rb') as f:
+                records, metadata = self.serializer.load_table(f.read())
+        
+        # Load entries in chronological order (newest first)
+        entries = [HistoryEntry.from_dict(entry) for entry in records]
+        entries.sort(key=lambda x: x.timestamp, reverse=True)
+        self._set_entries(entries)
+        self._next_id = metadata.get('next_id', 1)
+        if self._counted_next_id is None:
+            # Counters were saved together with this snapshot
+            self._counted_next_id = self._next_id
+        
+        self._journal_records = 0
+        self._journal_position = 0
+        self._replay_journal()
+    
+    def _refresh(self):
+        """Apply commands other processes journaled, reload after they compacted (with the lock held)"""
+        if _inode(self.history_file) != self._snapshot_inode:
+            self._reload()
+            return
+        try:
+            size = os.stat(self.journal_file).st_size
+        except FileNotFoundError:
+            size = 0
+        if size < self._journal_position:
+            self._reload()
+        elif size > self._journal_position:
+            self._replay_journal()
+    
+    def _replay_journal(self):
+        """Apply journaled commands after the applied position that are newer than what is loaded"""
+        records, format_id, self._journal_position = self._read_journal(self._journal_position)
+        for record in records:
+            entry = HistoryEntry.from_dict(record)
+            if entry.id < self._next_id:
+                # Already in the snapshot, the journal outlived a compaction
+                continue
+            self._push(entry)
+            self._next_id = entry.id + 1
+            if entry.id >= self._counted_next_id:
+                self._count_command(entry.id, entry.success)
+        self._journal_records += len(records)
+        
+        if format_id is not None and format_id != self.serializer.format_id:
+            # Written with another serializer, fold it into the snapshot
+            self._save_to_file()
+    
+    def _read_journal(self, start: int = 0) -> Tuple[List[Dict], Optional[int], int]:
+        """Records in the journal after byte offset start, their format_id and the end offset
+
+        A torn tail left by an interrupted append is cut off.
+        """
+        try:
+            with open(self.journal_file, 'rb') as f:
+                header = f.read(JOURNAL_HEADER_SIZE)
+                start = max(start, JOURNAL_HEADER_SIZE)
+                f.seek(start)
+                data = f.read()
+        except FileNotFoundError:
+            return [], None, 0
+        
+        if len(header) < JOURNAL_HEADER_SIZE or not header.startswith(JOURNAL_MAGIC_PREFIX):
+            logger.warning(f"Ignoring unreadable history journal {self.journal_file}")
+            self.journal_file.replace(self.journal_file.with_suffix('.corrupt'))
+            return [], None, 0
+        
+        format_id = header[len(JOURNAL_MAGIC_PREFIX)]
+        serializer = get_serializer_for_format(format_id, HistoryEntry)
+        records = []
+        position = 0
+        while position + JOURNAL_RECORD.size <= len(data):
+            length, = JOURNAL_RECORD.unpack_from(data, position)
+            end = position + JOURNAL_RECORD.size + length
+            if end > len(data):
+                break
+            records.append(serializer.loads(data[position + JOURNAL_RECORD.size:end]))
+            position = end
+        
+        if position != len(data):
+            # Interrupted append (writers hold the lock), cut it off so later records stay readable
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(start + position)
+        return records, format_id, start + position
+    
+    def _append_to_journal(self, entry: HistoryEntry):
+        """Append one command to the journal (with the lock held)"""
+        payload = self.serializer.dumps(entry.to_dict())
+        with open(self.journal_file, 'ab') as f:
+            header = b''
+            if f.tell() == 0:
+                header = JOURNAL_MAGIC_PREFIX + bytes([self.serializer.format_id]) + b'\n'
+            f.write(header + JOURNAL_RECORD.pack(len(payload)) + payload)
+            self._journal_position = f.tell()
+        
+        self._journal_records += 1
+        if self._journal_records > self.max_entries:
+            self._compact_in_background()
+    
+    def _compact_in_background(self):
+        """Rewrite the snapshot and drop the journal without blocking the caller"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._save_to_file, name='nlcli-history-compact', daemon=True)
+        self._compactor.start()
     
     def _save_to_file(self):
-        """Save history data to file for persistence"""
+        """Write all entries to the snapshot file and empty the journal"""
         try:
-            with self._lock:
-                # Limit entries to max_entries
-                if len(self.entries) > self.max_entries:
-                    self.entries = self.entries[:self.max_entries]
-                
-                data = {
-                    'entries': [entry.to_dict() for entry in self.entries],
-                    'next_id': self.next_id,
-                    'saved_at': time.time()
-                }
+            with self._locked():
+                # Fold in what other processes journaled before the journal goes
+                self._refresh()
+                data = self.serializer.dump_table(
+                    [entry.to_dict() for entry in self.entries],
+                    {'next_id': self.next_id, 'saved_at': time.time()}
+                )
                 
                 # Write atomically using temporary file
                 temp_file = self.history_file.with_suffix('.tmp')
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, separators=(',', ':'))
+                with open(temp_file, 'wb') as f:
+                    f.write(data)
                 
-                # Atomic rename
+                # Atomic rename; journal records are skipped by id if we stop here
                 temp_file.replace(self.history_file)
+                self._snapshot_inode = _inode(self.history_file)
+                self._remove_journal()
                 
                 self._save_stats()
                 logger.debug(f"Saved {len(self.entries)} history entries")
@@ -137,24 +338,56 @@ class FileHistoryManager:
         except Exception as e:
             logger.error(f"Error saving history to file: {str(e)}")
     
+    def _remove_journal(self):
+        try:
+            self.journal_file.unlink()
+        except FileNotFoundError:
+            pass
+        self._journal_records = 0
+        self._journal_position = 0
+    
+    def _count_command(self, command_id: int, success: bool):
+        self._stats['total_commands'] += 1
+        if success:
+            self._stats['successful_commands'] += 1
+        else:
+            self._stats['failed_commands'] += 1
+        self._counted_next_id = command_id + 1
+        self._stats_dirty = True
+    
     def _load_stats(self):
         """Load performance statistics"""
         if self.stats_file.exists():
             try:
                 with open(self.stats_file, 'r', encoding='utf-8') as f:
                     saved_stats = json.load(f)
+                    self._counted_next_id = saved_stats.pop('counted_next_id', None)
                     self._stats.update(saved_stats)
             except (json.JSONDecodeError, FileNotFoundError, IOError):
                 pass
     
     def _save_stats(self):
-        """Save performance statistics"""
+        """Save performance statistics with the first command id they do not include"""
         try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self._stats, f)
+            temp_file = self.stats_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(dict(self._stats, counted_next_id=self._counted_next_id), f)
+            os.replace(temp_file, self.stats_file)
+            self._stats_dirty = False
+            self._stats_saved_at = time.time()
         except (OSError, PermissionError, ValueError):
             pass
     
+    def flush_due(self, now: float) -> bool:
+        """Whether the background flusher should save changed statistics now"""
+        return self._stats_dirty and now - self._stats_saved_at >= self.flush_interval
+    
+    def flush(self):
+        """Save statistics changed since the last save"""
+        with self._lock:
+            if self._stats_dirty:
+                self._save_stats()
+    
     def add_command(self, natural_language: str, command: str, 
                    explanation: str, success: bool, session_id: Optional[str] = None) -> Optional[int]:
         """
@@ -171,11 +404,16 @@ class FileHistoryManager:
             ID of the inserted record
         """
         
+        self._ensure_loaded()
+        
         try:
             import platform
             platform_info = platform.system()
             
-            with self._lock:
+            with self._locked():
+                # Commands journaled by other processes come first and take their ids
+                self._refresh()
+                
                 # Create new entry
                 entry = HistoryEntry(
                     id=self.next_id,
@@ -188,19 +426,15 @@ class FileHistoryManager:
                 )
                 
                 # Add to beginning (most recent first)
-                self.entries.insert(0, entry)
+                self._push(entry)
                 command_id = self.next_id
                 self.next_id += 1
                 
                 # Update statistics
-                self._stats['total_commands'] += 1
-                if success:
-                    self._stats['successful_commands'] += 1
-                else:
-                    self._stats['failed_commands'] += 1
+                self._count_command(command_id, success)
                 
-                # Save to file
-                self._save_to_file()
+                # Persist just this command
+                self._append_to_journal(entry)
                 
                 logger.debug(f"Added command to history: ID {command_id}")
                 return command_id
@@ -223,7 +457,7 @@ class FileHistoryManager:
         try:
             with self._lock:
                 # Return most recent entries
-                recent_entries = self.entries[:limit]
+                recent_entries = islice(self.entries, limit)
                 return [entry.to_dict() for entry in recent_entries]
                 
         except Exception as e:
@@ -233,10 +467,17 @@ class FileHistoryManager:
     def clear_command_history(self):
         """Clear all command history"""
         
+        self._ensure_loaded()
+        
         try:
-            with self._lock:
+            with self._locked():
+                # Clears what other processes journaled as well
+                self._refresh()
+                self._remove_journal()
                 self.entries.clear()
+                self._index.clear()
                 self.next_id = 1
+                self._counted_next_id = 1
                 
                 # Reset statistics
                 self._stats = {
@@ -292,24 +533,16 @@ class FileHistoryManager:
             limit: Maximum number of results
             
         Returns:
-            List of matching command dictionaries
+            List of matching command dictionaries, recent successful commands first
         """
         
+        self._ensure_loaded()
+        
         try:
             with self._lock:
                 self._stats['searches_performed'] += 1
-                query_lower = query.lower()
-                
-                matching_entries = []
-                for entry in self.entries:
-                    if (query_lower in entry.natural_language.lower() or 
-                        query_lower in entry.command.lower()):
-                        matching_entries.append(entry)
-                        
-                        if len(matching_entries) >= limit:
-                            break
-                
-                return [entry.to_dict() for entry in matching_entries]
+                self._stats_dirty = True
+                return [entry.to_dict() for entry in self._index.search(query, limit)]
                 
         except Exception as e:
             logger.error(f"Error searching commands: {str(e)}")
@@ -346,6 +579,8 @@ class FileHistoryManager:
             Dictionary with statistics
         """
         
+        self._ensure_loaded()
+        
         try:
             with self._lock:
                 total = self._stats['total_commands']
@@ -363,15 +598,16 @@ class FileHistoryManager:
             return {}
     
     def force_save(self):
-        """Force save history to file"""
+        """Force save history and statistics to file"""
         self._save_to_file()
     
     def get_history_size_info(self) -> Dict:
         """Get history size information"""
         try:
             file_size = 0
-            if self.history_file.exists():
-                file_size = self.history_file.stat().st_size
+            for path in (self.history_file, self.journal_file):
+                if path.exists():
+                    file_size += path.stat().st_size
             
             return {
                 'file_size_bytes': file_size,
@@ -385,4 +621,11 @@ class FileHistoryManager:
                 'file_size_kb': 0,
                 'total_entries': 0,
                 'max_entries': self.max_entries
-            }
\ No newline at end of file
+            }
+
+
+def _inode(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
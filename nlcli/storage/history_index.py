@@ -0,0 +1,149 @@
+"""
+Incremental search index for command history
+"""
+
+import heapq
+import re
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# A failed command ranks like a successful one run this many seconds earlier
+FAILURE_PENALTY = 7 * 24 * 60 * 60
+
+
+def tokenize(text: str) -> Set[str]:
+    """Lowercase word tokens of text"""
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+def trigrams(text: str) -> Set[str]:
+    """All three-character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class HistorySearchIndex:
+    """
+    Inverted index over the natural language and command of history entries.
+
+    Every entry gets an increasing document number when it is added, and
+    posting lists keep document numbers in that order, so they can be walked
+    newest first and the walk can stop as soon as no older entry can beat
+    the results already found. With trigrams enabled a query matches any
+    substring, as a plain scan would, and the rarest trigram of the query
+    picks the candidates; otherwise every query word must appear as a word.
+    Queries shorter than three characters walk all entries newest first.
+
+    Not thread-safe; FileHistoryManager calls it with its lock held.
+    """
+
+    def __init__(self, use_trigrams: bool = True):
+        self.use_trigrams = use_trigrams
+        self._postings: Dict[str, Deque[int]] = {}
+        self._docs: Dict[int, Tuple[object, str, str]] = {}
+        self._doc_of: Dict[int, int] = {}
+        self._next_doc = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _keys(self, natural_language: str, command: str) -> Set[str]:
+        if self.use_trigrams:
+            return trigrams(natural_language) | trigrams(command)
+        return tokenize(natural_language) | tokenize(command)
+
+    def add(self, entry):
+        """Index an entry as the newest one"""
+        natural_language = (entry.natural_language or '').lower()
+        command = (entry.command or '').lower()
+        doc = self._next_doc
+        self._next_doc += 1
+        self._docs[doc] = (entry, natural_language, command)
+        self._doc_of[id(entry)] = doc
+        for key in self._keys(natural_language, command):
+            posting = self._postings.get(key)
+            if posting is None:
+                posting = self._postings[key] = deque()
+            posting.append(doc)
+
+    def add_all(self, entries: Iterable):
+        """Index entries given oldest first"""
+        for entry in entries:
+            self.add(entry)
+
+    def remove(self, entry):
+        """Drop an entry, cheapest for the oldest one"""
+        doc = self._doc_of.pop(id(entry), None)
+        if doc is None:
+            return
+        _, natural_language, command = self._docs.pop(doc)
+        for key in self._keys(natural_language, command):
+            posting = self._postings[key]
+            if posting[0] == doc:
+                posting.popleft()
+            else:
+                posting.remove(doc)
+            if not posting:
+                del self._postings[key]
+
+    def clear(self):
+        self._postings.clear()
+        self._docs.clear()
+        self._doc_of.clear()
+
+    def _candidates(self, query: str) -> Tuple[Iterable[int], Callable[[str, str], bool]]:
+        """Document numbers newest first and a predicate confirming a match"""
+        def substring(natural_language, command):
+            return query in natural_language or query in command
+
+        if self.use_trigrams:
+            keys, matches = trigrams(query), substring
+        else:
+            keys = tokenize(query)
+
+            def matches(natural_language, command):
+                # Cheap substring test first, tokenize only likely matches
+                if not all(key in natural_language or key in command for key in keys):
+                    return False
+                return keys <= tokenize(natural_language) | tokenize(command)
+
+        if not keys:
+            return reversed(self._docs), substring
+
+        postings = [self._postings.get(key) for key in keys]
+        if not all(postings):
+            return (), matches
+        return reversed(min(postings, key=len)), matches
+
+    def search(self, query: str, limit: int = 10) -> List:
+        """
+        Best matching entries, ranked by recency with failed commands pushed back
+
+        Args:
+            query: Text to look for in the natural language or command
+            limit: Maximum number of results
+
+        Returns:
+            Entries, best first
+        """
+        query = query.lower().strip()
+        if not query or limit <= 0:
+            return []
+
+        docs, matches = self._candidates(query)
+        best: List[Tuple[float, int]] = []
+        for doc in docs:
+            entry, natural_language, command = self._docs[doc]
+            # Older entries can only score lower than their timestamp
+            if len(best) == limit and entry.timestamp <= best[0][0]:
+                break
+            if not matches(natural_language, command):
+                continue
+            score = entry.timestamp - (0 if entry.success else FAILURE_PENALTY)
+            if len(best) < limit:
+                heapq.heappush(best, (score, doc))
+            elif score > best[0][0]:
+                heapq.heapreplace(best, (score, doc))
+
+        return [self._docs[doc][0] for _, doc in sorted(best, reverse=True)]
@@ -7,23 +7,42 @@ import os
 from typing import List, Dict, Optional
 from ..utils.utils import setup_logging, get_config_dir
 from .file_history import FileHistoryManager
+from .sqlite_history import SQLiteHistoryManager
 
 logger = setup_logging()
 
 class HistoryManager:
-    """Manages command history storage and retrieval using file-based cache"""
+    """Manages command history storage and retrieval using a file-based or SQLite backend"""
     
-    def __init__(self, db_path: str):
-        """Initialize history manager with file-based storage"""
+    def __init__(self, db_path: str, backend: str = 'file'):
+        """
+        Initialize history manager
+        
+        Args:
+            db_path: SQLite database path; its directory holds the file-based history
+            backend: 'file' (default) or 'sqlite' (WAL database with full-text search,
+                importing an existing file-based history on first use)
+        """
         
         # Extract directory from db_path for consistency
         cache_dir = os.path.dirname(db_path) if db_path else None
-        self.file_history = FileHistoryManager(cache_dir)
+        if backend == 'sqlite' and db_path:
+            self.backend = SQLiteHistoryManager(db_path, import_dir=cache_dir)
+        else:
+            if backend != 'file':
+                logger.warning(f"Unknown history backend '{backend}', using file storage")
+            self.backend = FileHistoryManager(cache_dir)
         
-        # Keep db_path for backward compatibility
         self.db_path = db_path
     
-    # File-based storage - no database initialization needed
+    @property
+    def file_history(self):
+        """Former name of backend, kept for existing callers"""
+        return self.backend
+    
+    @file_history.setter
+    def file_history(self, value):
+        self.backend = value
     
     def add_command(self, natural_language: str, command: str, 
                    explanation: str, success: bool, session_id: Optional[str] = None) -> Optional[int]:
@@ -41,7 +60,7 @@ class HistoryManager:
             ID of the inserted record
         """
         
-        return self.file_history.add_command(
+        return self.backend.add_command(
             natural_language=natural_language,
             command=command,
             explanation=explanation,
@@ -60,12 +79,12 @@ class HistoryManager:
             List of command dictionaries
         """
         
-        return self.file_history.get_recent_commands(limit)
+        return self.backend.get_recent_commands(limit)
     
     def clear_command_history(self):
         """Clear all command history"""
         
-        self.file_history.clear_command_history()
+        self.backend.clear_command_history()
     
     def get_recent_natural_language_commands(self, limit: int = 50) -> List[str]:
         """
@@ -78,7 +97,7 @@ class HistoryManager:
             List of natural language commands
         """
         
-        return self.file_history.get_recent_natural_language_commands(limit)
+        return self.backend.get_recent_natural_language_commands(limit)
     
     def search_commands(self, query: str, limit: int = 10) -> List[Dict]:
         """
@@ -92,7 +111,7 @@ class HistoryManager:
             List of matching command dictionaries
         """
         
-        return self.file_history.search_commands(query, limit)
+        return self.backend.search_commands(query, limit)
     
     def get_command_by_id(self, command_id: int) -> Optional[Dict]:
         """
@@ -105,21 +124,23 @@ class HistoryManager:
             Command dictionary or None if not found
         """
         
-        return self.file_history.get_command_by_id(command_id)
+        return self.backend.get_command_by_id(command_id)
     
     def delete_command(self, command_id: int) -> bool:
         """
-        Delete a command from history (not implemented in file-based storage)
+        Delete a command from history (SQLite backend only)
         
         Args:
             command_id: Command ID to delete
             
         Returns:
-            False - deletion not supported in current implementation
+            True if the command was deleted, False otherwise
         """
         
-        logger.warning("Command deletion not implemented in file-based storage")
-        return False
+        if not isinstance(self.backend, SQLiteHistoryManager):
+            logger.warning("Command deletion not implemented in file-based storage")
+            return False
+        return self.backend.delete_command(command_id)
     
     def clear_history(self) -> bool:
         """
@@ -130,7 +151,7 @@ class HistoryManager:
         """
         
         try:
-            self.file_history.clear_command_history()
+            self.backend.clear_command_history()
             return True
         except Exception as e:
             logger.error(f"Error clearing history: {str(e)}")
@@ -144,4 +165,9 @@ class HistoryManager:
             Dictionary with usage statistics
         """
         
-        return self.file_history.get_statistics()
+        return self.backend.get_statistics()
+    
+    def prefetch(self):
+        """Start loading the history file in the background"""
+        
+        self.backend.prefetch()
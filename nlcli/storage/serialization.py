@@ -0,0 +1,223 @@
+"""
+Serializers for cache and history records
+"""
+
+import json
+import operator
+import struct
+from typing import Any, Dict, List, Optional, Tuple, Type, get_type_hints
+
+# Record field types and their fixed-size struct codes; strings are stored as
+# a length (single records) or a string table index (tables)
+TYPE_CODES = {float: 'd', int: 'q', bool: '?', str: 'I'}
+
+TABLE_MAGIC = b'NLCTAB\x01\n'
+TABLE_HEADER = struct.Struct('<III')  # records, strings, metadata bytes
+
+
+class SlotRecord:
+    """
+    Base for small record classes stored in large numbers.
+
+    Subclasses declare ``__slots__`` and a typed ``__init__`` taking every
+    slot as a keyword argument. Slots avoid a per-instance ``__dict__``,
+    and the annotations describe the fixed binary layout.
+    """
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SlotRecord':
+        """Create from dictionary"""
+        return cls(**data)
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({fields})"
+
+
+class RecordCodec:
+    """Fixed struct layout for one record class: numbers inline, strings after the header"""
+
+    def __init__(self, fields: List[Tuple[str, type]]):
+        self.names = [name for name, _ in fields]
+        self.kinds = [kind for _, kind in fields]
+        self.defaults = [kind() for _, kind in fields]
+        self._getter = operator.itemgetter(*self.names)
+        self.string_positions = [i for i, (_, kind) in enumerate(fields) if kind is str]
+        self.record = struct.Struct('<' + ''.join(TYPE_CODES[kind] for _, kind in fields))
+
+    @classmethod
+    def for_class(cls, record_class: Type[SlotRecord]) -> 'RecordCodec':
+        hints = get_type_hints(record_class.__init__)
+        return cls([(name, hints[name]) for name in record_class.__slots__])
+
+    def _values(self, record: Dict) -> List[Any]:
+        """Field values in layout order converted to the field types, type defaults for missing or None values"""
+        try:
+            values = list(self._getter(record))
+        except KeyError:
+            values = [record.get(name) for name in self.names]
+        for position, (value, kind) in enumerate(zip(values, self.kinds)):
+            if value.__class__ is not kind:
+                values[position] = self._convert(position, value)
+        return values
+
+    def _convert(self, position: int, value: Any) -> Any:
+        if value is None:
+            return self.defaults[position]
+        kind = self.kinds[position]
+        try:
+            return kind(value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Field {self.names[position]} cannot store {value!r} as {kind.__name__}")
+
+    def encode(self, record: Dict) -> bytes:
+        values = self._values(record)
+        strings = []
+        for position in self.string_positions:
+            data = values[position].encode('utf-8')
+            values[position] = len(data)
+            strings.append(data)
+        return self.record.pack(*values) + b''.join(strings)
+
+    def decode(self, data: bytes) -> Dict:
+        values = list(self.record.unpack_from(data, 0))
+        position = self.record.size
+        for index in self.string_positions:
+            length = values[index]
+            values[index] = data[position:position + length].decode('utf-8')
+            position += length
+        return dict(zip(self.names, values))
+
+    def encode_table(self, records: List[Dict], metadata: Dict) -> bytes:
+        """Encode records with an interned string table"""
+        table: Dict[str, int] = {}
+        packed = []
+        for record in records:
+            values = self._values(record)
+            for position in self.string_positions:
+                values[position] = table.setdefault(values[position], len(table))
+            packed.append(self.record.pack(*values))
+
+        strings = [text.encode('utf-8') for text in table]
+        meta = json.dumps(metadata, separators=(',', ':')).encode('utf-8')
+        return b''.join([
+            TABLE_MAGIC,
+            TABLE_HEADER.pack(len(records), len(strings), len(meta)),
+            meta,
+            struct.pack(f'<{len(strings)}I', *map(len, strings)),
+            b''.join(strings),
+            b''.join(packed)
+        ])
+
+    def decode_table(self, data: bytes) -> Tuple[List[Dict], Dict]:
+        if data[:len(TABLE_MAGIC)] != TABLE_MAGIC:
+            raise ValueError("Not a record table")
+        position = len(TABLE_MAGIC)
+        count, string_count, meta_length = TABLE_HEADER.unpack_from(data, position)
+        position += TABLE_HEADER.size
+        metadata = json.loads(data[position:position + meta_length])
+        position += meta_length
+
+        lengths = struct.unpack_from(f'<{string_count}I', data, position)
+        position += 4 * string_count
+        strings = []
+        for length in lengths:
+            strings.append(data[position:position + length].decode('utf-8'))
+            position += length
+
+        end = position + count * self.record.size
+        if end != len(data):
+            raise ValueError("Truncated record table")
+        names, string_positions = self.names, self.string_positions
+        records = []
+        for values in self.record.iter_unpack(data[position:end]):
+            values = list(values)
+            for index in string_positions:
+                values[index] = strings[values[index]]
+            records.append(dict(zip(names, values)))
+        return records, metadata
+
+
+class JSONSerializer:
+    """Records as compact JSON, tables as {'entries': [...], **metadata}"""
+
+    name = 'json'
+    format_id = 1
+    file_suffix = '.json'
+
+    def __init__(self, record_class: Optional[Type[SlotRecord]] = None):
+        self.record_class = record_class
+
+    def dumps(self, record: Dict) -> bytes:
+        return json.dumps(record, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data: bytes) -> Dict:
+        return json.loads(data)
+
+    def dump_table(self, records: List[Dict], metadata: Dict) -> bytes:
+        return self.dumps(dict(metadata, entries=records))
+
+    def load_table(self, data: bytes) -> Tuple[List[Dict], Dict]:
+        content = self.loads(data)
+        if isinstance(content, list):
+            # Oldest format: a bare list of entries
+            return content, {}
+        records = content.pop('entries', [])
+        return records, content
+
+
+class BinarySerializer:
+    """Struct-packed records; tables share one interned string table"""
+
+    name = 'binary'
+    format_id = 2
+    file_suffix = '.bin'
+
+    def __init__(self, record_class: Type[SlotRecord]):
+        self.record_class = record_class
+        self.codec = RecordCodec.for_class(record_class)
+
+    def dumps(self, record: Dict) -> bytes:
+        return self.codec.encode(record)
+
+    def loads(self, data: bytes) -> Dict:
+        return self.codec.decode(data)
+
+    def dump_table(self, records: List[Dict], metadata: Dict) -> bytes:
+        return self.codec.encode_table(records, metadata)
+
+    def load_table(self, data: bytes) -> Tuple[List[Dict], Dict]:
+        return self.codec.decode_table(data)
+
+
+SERIALIZERS = {
+    JSONSerializer.name: JSONSerializer,
+    BinarySerializer.name: BinarySerializer,
+}
+
+
+def get_serializer(name: str, record_class: Type[SlotRecord]) -> Any:
+    """Serializer by name ('json' or 'binary') for a record class"""
+    try:
+        return SERIALIZERS[name](record_class)
+    except KeyError:
+        raise ValueError(f"Unknown serializer: {name}")
+
+
+def get_serializer_for_format(format_id: int, record_class: Type[SlotRecord]) -> Any:
+    """Serializer that wrote data with the given format_id"""
+    for serializer_class in SERIALIZERS.values():
+        if serializer_class.format_id == format_id:
+            return serializer_class(record_class)
+    raise ValueError(f"Unknown serializer format: {format_id}")
@@ -0,0 +1,409 @@
+"""
+SQLite history backend in WAL mode, for large or shared histories
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from ..utils.utils import setup_logging
+from .file_history import FileHistoryManager
+from .history_index import FAILURE_PENALTY
+
+logger = setup_logging()
+
+SCHEMA_VERSION = 1
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS command_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        natural_language TEXT NOT NULL,
+        command TEXT NOT NULL,
+        explanation TEXT NOT NULL DEFAULT '',
+        success INTEGER NOT NULL,
+        timestamp REAL NOT NULL,
+        platform TEXT NOT NULL DEFAULT '',
+        session_id TEXT NOT NULL DEFAULT ''
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_history_timestamp ON command_history(timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_history_success ON command_history(success, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_history_session ON command_history(session_id, timestamp)',
+    'CREATE TABLE IF NOT EXISTS history_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)',
+]
+
+# Trigram full-text index kept in sync by triggers (SQLite 3.34+)
+FTS_SCHEMA = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS command_history_fts USING fts5(
+        natural_language, command, content='command_history', content_rowid='id', tokenize='trigram'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS command_history_fts_insert AFTER INSERT ON command_history BEGIN
+        INSERT INTO command_history_fts(rowid, natural_language, command)
+        VALUES (new.id, new.natural_language, new.command);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS command_history_fts_delete AFTER DELETE ON command_history BEGIN
+        INSERT INTO command_history_fts(command_history_fts, rowid, natural_language, command)
+        VALUES ('delete', old.id, old.natural_language, old.command);
+    END
+    ''',
+]
+
+# Statements are module constants so each pooled connection compiles them
+# once and then reuses them from its statement cache
+INSERT_COMMAND = '''
+    INSERT INTO command_history (natural_language, command, explanation, success, timestamp, platform, session_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+SELECT_COLUMNS = 'id, natural_language, command, explanation, success, timestamp, platform, session_id'
+SELECT_RECENT = f'SELECT {SELECT_COLUMNS} FROM command_history ORDER BY timestamp DESC LIMIT ?'
+SELECT_RECENT_NATURAL_LANGUAGE = '''
+    SELECT natural_language FROM command_history WHERE natural_language != '' ORDER BY timestamp DESC
+'''
+SELECT_BY_ID = f'SELECT {SELECT_COLUMNS} FROM command_history WHERE id = ?'
+RANK = f'timestamp - CASE WHEN success THEN 0 ELSE {FAILURE_PENALTY} END DESC'
+COUNT_FTS_MATCHES = '''
+    SELECT COUNT(*) FROM (SELECT rowid FROM command_history_fts WHERE command_history_fts MATCH ? LIMIT ?)
+'''
+SEARCH_FTS = f'''
+    SELECT {SELECT_COLUMNS} FROM command_history
+    WHERE id IN (SELECT rowid FROM command_history_fts WHERE command_history_fts MATCH ?)
+    ORDER BY {RANK} LIMIT ?
+'''
+SEARCH_RECENT_LIKE = f'''
+    SELECT {SELECT_COLUMNS} FROM command_history INDEXED BY idx_history_success
+    WHERE success = ? AND (natural_language LIKE ? ESCAPE '\\' OR command LIKE ? ESCAPE '\\')
+    ORDER BY timestamp DESC LIMIT ?
+'''
+
+# Full-text matches up to which ranking every match beats walking the timestamp index
+SELECTIVE_MATCHES = 1000
+COUNT_COMMANDS = 'SELECT COUNT(*), COALESCE(SUM(success), 0) FROM command_history'
+GET_META = 'SELECT value FROM history_meta WHERE key = ?'
+INCREMENT_META = '''
+    INSERT INTO history_meta (key, value) VALUES (?, 1)
+    ON CONFLICT(key) DO UPDATE SET value = value + 1
+'''
+
+
+class ConnectionPool:
+    """
+    One SQLite connection per thread, opened on first use and reused.
+
+    WAL mode lets every connection read while one of them writes, so
+    threads never share a connection or wait on each other's reads.
+    """
+
+    def __init__(self, path: Path, timeout: float = 5.0):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=self.timeout, cached_statements=64,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+class SQLiteHistoryManager:
+    """History manager backed by an indexed SQLite database with trigram full-text search"""
+
+    def __init__(self, db_path: str, import_dir: Optional[str] = None):
+        """
+        Initialize SQLite history manager
+
+        Args:
+            db_path: Database file path
+            import_dir: Directory of a file-based history to import into a new database
+        """
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.import_dir = import_dir
+        self.max_entries = None
+        self.has_fts = False
+
+        self._pool = ConnectionPool(self.db_path)
+        self._lock = threading.Lock()
+        self._ready = False
+
+        logger.debug(f"SQLite history manager initialized at {self.db_path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        """Pooled connection for the calling thread, creating the schema once"""
+        conn = self._pool.get()
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._create_schema(conn)
+                    self._ready = True
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        with conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            try:
+                for statement in FTS_SCHEMA:
+                    conn.execute(statement)
+                self.has_fts = True
+            except sqlite3.OperationalError as e:
+                # No FTS5 or no trigram tokenizer, searches fall back to LIKE
+                logger.debug(f"History full-text search unavailable: {str(e)}")
+
+        # Another process may be creating the same database
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                self._import_file_history(conn)
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _import_file_history(self, conn: sqlite3.Connection):
+        """Copy an existing file-based history into a new database (inside its transaction)"""
+        if self.import_dir is None:
+            return
+        entries = list(reversed(FileHistoryManager(self.import_dir).entries))
+        if not entries:
+            return
+        conn.executemany(INSERT_COMMAND, [
+            (e.natural_language, e.command, e.explanation, int(e.success), e.timestamp,
+             e.platform, e.session_id)
+            for e in entries
+        ])
+        logger.info(f"Imported {len(entries)} history entries into {self.db_path}")
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        entry = dict(row)
+        entry['success'] = bool(entry['success'])
+        return entry
+
+    def prefetch(self) -> threading.Thread:
+        """Open the database in a background thread ahead of the first access"""
+        thread = threading.Thread(target=self._conn, name='nlcli-history-prefetch', daemon=True)
+        thread.start()
+        return thread
+
+    def add_command(self, natural_language: str, command: str,
+                   explanation: str, success: bool, session_id: Optional[str] = None) -> Optional[int]:
+        """
+        Add a command to history
+
+        Args:
+            natural_language: Original natural language input
+            command: Translated OS command
+            explanation: Command explanation
+            success: Whether command executed successfully
+            session_id: Optional session identifier
+
+        Returns:
+            ID of the inserted record
+        """
+
+        try:
+            import platform
+            conn = self._conn()
+            with conn:
+                cursor = conn.execute(INSERT_COMMAND, (
+                    natural_language, command, explanation or '', int(bool(success)), time.time(),
+                    platform.system(), session_id or ''
+                ))
+            logger.debug(f"Added command to history: ID {cursor.lastrowid}")
+            return cursor.lastrowid
+
+        except Exception as e:
+            logger.error(f"Error adding command to history: {str(e)}")
+            return None
+
+    def get_recent_commands(self, limit: int = 20) -> List[Dict]:
+        """Get recent commands from history, newest first"""
+
+        try:
+            rows = self._conn().execute(SELECT_RECENT, (limit,)).fetchall()
+            return [self._row_to_dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Error retrieving recent commands: {str(e)}")
+            return []
+
+    def clear_command_history(self):
+        """Clear all command history"""
+
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute('DELETE FROM command_history')
+                conn.execute("DELETE FROM sqlite_sequence WHERE name = 'command_history'")
+                conn.execute('DELETE FROM history_meta')
+            logger.info("Command history cleared")
+        except Exception as e:
+            logger.error(f"Error clearing history: {str(e)}")
+
+    def delete_command(self, command_id: int) -> bool:
+        """Delete one command, True if it existed"""
+
+        try:
+            conn = self._conn()
+            with conn:
+                cursor = conn.execute('DELETE FROM command_history WHERE id = ?', (command_id,))
+            return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error deleting command: {str(e)}")
+            return False
+
+    def get_recent_natural_language_commands(self, limit: int = 50) -> List[str]:
+        """Get unique recent natural language commands, newest first"""
+
+        try:
+            # Walk the timestamp index newest first and stop once enough are found
+            seen = set()
+            commands = []
+            for row in self._conn().execute(SELECT_RECENT_NATURAL_LANGUAGE):
+                text = row['natural_language']
+                if text not in seen:
+                    seen.add(text)
+                    commands.append(text)
+                    if len(commands) >= limit:
+                        break
+            return commands
+        except Exception as e:
+            logger.error(f"Error retrieving natural language commands: {str(e)}")
+            return []
+
+    def search_commands(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Search commands by natural language or command text
+
+        Args:
+            query: Search query
+            limit: Maximum number of results
+
+        Returns:
+            List of matching command dictionaries, recent successful commands first
+        """
+
+        query = query.strip()
+        if not query:
+            return []
+
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(INCREMENT_META, ('searches_performed',))
+
+            if self.has_fts and len(query) >= 3:
+                phrase = '"' + query.replace('"', '""') + '"'
+                matches = conn.execute(COUNT_FTS_MATCHES, (phrase, SELECTIVE_MATCHES + 1)).fetchone()[0]
+                if matches <= SELECTIVE_MATCHES:
+                    rows = conn.execute(SEARCH_FTS, (phrase, limit)).fetchall()
+                    return [self._row_to_dict(row) for row in rows]
+
+            return self._search_recent(conn, query, limit)
+
+        except Exception as e:
+            logger.error(f"Error searching commands: {str(e)}")
+            return []
+
+    def _search_recent(self, conn: sqlite3.Connection, query: str, limit: int) -> List[Dict]:
+        """
+        Walk successes and failures newest first until each has limit matches
+
+        Cheap when matches are common, because the walk stops early; the
+        best results overall are among the newest of each kind.
+        """
+        pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        rows = []
+        for success in (1, 0):
+            rows.extend(conn.execute(SEARCH_RECENT_LIKE, (success, pattern, pattern, limit)).fetchall())
+        rows.sort(key=lambda row: row['timestamp'] - (0 if row['success'] else FAILURE_PENALTY), reverse=True)
+        return [self._row_to_dict(row) for row in rows[:limit]]
+
+    def get_command_by_id(self, command_id: int) -> Optional[Dict]:
+        """Get a specific command by ID"""
+
+        try:
+            row = self._conn().execute(SELECT_BY_ID, (command_id,)).fetchone()
+            return self._row_to_dict(row) if row else None
+        except Exception as e:
+            logger.error(f"Error retrieving command by ID: {str(e)}")
+            return None
+
+    def get_statistics(self) -> Dict:
+        """Get history statistics"""
+
+        try:
+            conn = self._conn()
+            total, successful = conn.execute(COUNT_COMMANDS).fetchone()
+            searches = conn.execute(GET_META, ('searches_performed',)).fetchone()
+            return {
+                'total_commands': total,
+                'successful_commands': successful,
+                'success_rate': round((successful / total) if total > 0 else 0.0, 4),
+                'searches_performed': searches[0] if searches else 0
+            }
+        except Exception as e:
+            logger.error(f"Error getting statistics: {str(e)}")
+            return {}
+
+    def force_save(self):
+        """Checkpoint the write-ahead log into the database file"""
+        try:
+            self._conn().execute('PRAGMA wal_checkpoint(PASSIVE)')
+        except Exception as e:
+            logger.error(f"Error checkpointing history database: {str(e)}")
+
+    def get_history_size_info(self) -> Dict:
+        """Get history size information"""
+        try:
+            total = self._conn().execute('SELECT COUNT(*) FROM command_history').fetchone()[0]
+            file_size = 0
+            for path in (self.db_path, self.db_path.with_name(self.db_path.name + '-wal')):
+                if path.exists():
+                    file_size += path.stat().st_size
+
+            return {
+                'file_size_bytes': file_size,
+                'file_size_kb': round(file_size / 1024, 2),
+                'total_entries': total,
+                'max_entries': self.max_entries
+            }
+        except Exception:
+            return {
+                'file_size_bytes': 0,
+                'file_size_kb': 0,
+                'total_entries': 0,
+                'max_entries': self.max_entries
+            }
+
+    def close(self):
+        """Close every pooled connection"""
+        self._pool.close_all()
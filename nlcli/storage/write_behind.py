@@ -0,0 +1,108 @@
+"""
+Write-behind flushing for the file-based translation cache
+"""
+
+import atexit
+import threading
+import time
+import weakref
+from typing import Optional
+from ..utils.utils import setup_logging
+
+logger = setup_logging()
+
+
+class WriteBehindFlusher:
+    """
+    One long-lived background thread that flushes buffered cache writes.
+
+    Caches register themselves and expose ``flush_interval``,
+    ``flush_due(now)`` and ``flush()``. The worker wakes up at the shortest
+    registered interval, or immediately when a cache calls ``notify`` because
+    its buffer reached the batch size, and flushes every cache that is due.
+    Registered caches are flushed once more at interpreter exit, so buffered
+    writes are not lost on a normal shutdown. Caches are held weakly; one
+    collected without ``close()`` writes its buffers from its own finalizer.
+    """
+
+    def __init__(self, name: str = 'nlcli-cache-flush'):
+        self.name = name
+        self._condition = threading.Condition()
+        self._caches = weakref.WeakSet()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        atexit.register(self.stop)
+
+    def register(self, cache):
+        """Flush cache in the background, starting the worker on first use"""
+        with self._condition:
+            self._caches.add(cache)
+            self._stopping = False
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def unregister(self, cache):
+        with self._condition:
+            self._caches.discard(cache)
+
+    def notify(self):
+        """Wake the worker early, a cache has a full batch"""
+        with self._condition:
+            self._condition.notify()
+
+    def _interval(self) -> float:
+        intervals = [cache.flush_interval for cache in self._caches if cache.flush_interval > 0]
+        return min(intervals) if intervals else 1.0
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                self._condition.wait(timeout=self._interval())
+                if self._stopping:
+                    return
+                caches = list(self._caches)
+
+            now = time.time()
+            for cache in caches:
+                try:
+                    if cache.flush_due(now):
+                        cache.flush()
+                except Exception as e:
+                    logger.error(f"Background cache flush failed: {str(e)}")
+
+    def flush_all(self):
+        """Flush every registered cache in the calling thread"""
+        with self._condition:
+            caches = list(self._caches)
+        for cache in caches:
+            try:
+                cache.flush()
+            except Exception as e:
+                logger.error(f"Cache flush failed: {str(e)}")
+
+    def stop(self):
+        """Stop the worker and flush what is still buffered"""
+        with self._condition:
+            self._stopping = True
+            thread = self._thread
+            self._thread = None
+            self._condition.notify()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+        self.flush_all()
+
+
+# Global instance shared by all caches in the process
+_write_behind_flusher = None
+
+
+def get_write_behind_flusher() -> WriteBehindFlusher:
+    """Get global write-behind flusher instance"""
+    global _write_behind_flusher
+    if _write_behind_flusher is None:
+        _write_behind_flusher = WriteBehindFlusher()
+    return _write_behind_flusher
@@ -4,6 +4,7 @@ Maintains a comprehensive list of commands commonly available across systems
 """
 
 from typing import Dict, Set, List, Optional
+import os
 import platform
 
 class KnownCommandRegistry:
@@ -13,6 +14,7 @@ class KnownCommandRegistry:
     
     def __init__(self):
         self.platform = platform.system().lower()
+        self._path_commands: Optional[Set[str]] = None
         self._load_command_registry()
     
     def _load_command_registry(self):
@@ -95,6 +97,32 @@ class KnownCommandRegistry:
         
         return all_commands
     
+    def get_path_commands(self, refresh: bool = False) -> Set[str]:
+        """Get executable names found on $PATH (scanned once, then cached)"""
+        if self._path_commands is not None and not refresh:
+            return self._path_commands
+        
+        commands = set()
+        for directory in os.environ.get('PATH', '').split(os.pathsep):
+            if not directory:
+                continue
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_file() and os.access(entry.path, os.X_OK):
+                                name = entry.name
+                                if self.platform == 'windows':
+                                    name = os.path.splitext(name)[0]
+                                commands.add(name.lower())
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        
+        self._path_commands = commands
+        return commands
+    
     def get_commands_by_category(self, category: str, platform: Optional[str] = None) -> List[str]:
         """Get commands for a specific category and platform"""
         target_platform = platform if platform is not None else self.platform
@@ -0,0 +1,194 @@
+"""
+Tests for file change detection used by the context caches
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from nlcli.context.environment_context import EnvironmentContextManager
+from nlcli.context.file_watch import HAS_INOTIFY, ChangeWatcher, stat_signature
+from nlcli.context.git_context import GitContextManager
+
+
+@pytest.fixture(params=[False, True], ids=['stat', 'inotify'])
+def use_inotify(request):
+    if request.param and not HAS_INOTIFY:
+        pytest.skip("inotify not available")
+    return request.param
+
+
+class TestChangeWatcher:
+    """Test ChangeWatcher in stat and inotify modes"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.temp_dir, 'watched.txt')
+        Path(self.file).write_text('one')
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_changed_before_reset(self, use_inotify):
+        watcher = ChangeWatcher([self.file], use_inotify=use_inotify)
+        assert watcher.changed() is True
+        watcher.close()
+
+    def test_unchanged_after_reset(self, use_inotify):
+        watcher = ChangeWatcher([self.file], use_inotify=use_inotify)
+        watcher.reset()
+        assert watcher.changed() is False
+        Path(self.temp_dir, 'unrelated.txt').write_text('x')
+        assert watcher.changed() is False
+        watcher.close()
+
+    def test_modify_replace_and_delete(self, use_inotify):
+        watcher = ChangeWatcher([self.file], use_inotify=use_inotify)
+        watcher.reset()
+        Path(self.file).write_text('longer content')
+        assert watcher.changed() is True
+        # Stays changed until the next reset
+        assert watcher.changed() is True
+
+        watcher.reset()
+        replacement = os.path.join(self.temp_dir, 'watched.tmp')
+        Path(replacement).write_text('two')
+        os.replace(replacement, self.file)
+        assert watcher.changed() is True
+
+        watcher.reset()
+        os.remove(self.file)
+        assert watcher.changed() is True
+        watcher.close()
+
+    def test_missing_file_created(self, use_inotify):
+        missing = os.path.join(self.temp_dir, 'later.txt')
+        watcher = ChangeWatcher([missing], use_inotify=use_inotify)
+        watcher.reset()
+        assert watcher.changed() is False
+        Path(missing).write_text('now')
+        assert watcher.changed() is True
+        watcher.close()
+
+    def test_directory_entries(self, use_inotify):
+        watcher = ChangeWatcher([self.temp_dir], use_inotify=use_inotify)
+        watcher.reset()
+        Path(self.temp_dir, 'new.txt').write_text('x')
+        assert watcher.changed() is True
+        watcher.close()
+
+    def test_missing_parent_falls_back_to_stat(self):
+        watcher = ChangeWatcher([os.path.join(self.temp_dir, 'no', 'such', 'file')])
+        assert watcher._inotify is None
+        watcher.reset()
+        assert watcher.changed() is False
+
+    def test_stat_signature(self):
+        signature = stat_signature([self.file, os.path.join(self.temp_dir, 'missing')])
+        assert signature[0][1] == 3
+        assert signature[1] is None
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason="git not installed")
+class TestGitStateInvalidation:
+    """Cached git state is reused until git metadata changes"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.git('init', '-q', '-b', 'main')
+        self.git('config', 'user.email', 'test@example.com')
+        self.git('config', 'user.name', 'test')
+        Path(self.temp_dir, 'a.txt').write_text('a')
+        self.git('add', 'a.txt')
+        self.git('commit', '-q', '-m', 'initial')
+        self.manager = GitContextManager()
+        self.manager.current_directory = self.temp_dir
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def git(self, *args):
+        subprocess.run(['git', *args], cwd=self.temp_dir, check=True, capture_output=True)
+
+    def test_unchanged_repository_uses_cache(self):
+        state1 = self.manager.get_repository_state()
+        with patch.object(GitContextManager, 'get_status_snapshot') as mock_snapshot:
+            state2 = self.manager.get_repository_state()
+        mock_snapshot.assert_not_called()
+        assert state1 is state2
+
+    def test_checkout_invalidates(self):
+        assert self.manager.get_repository_state().current_branch == 'main'
+        self.git('checkout', '-q', '-b', 'feature')
+        assert self.manager.get_repository_state().current_branch == 'feature'
+
+    def test_staging_invalidates(self):
+        Path(self.temp_dir, 'a.txt').write_text('changed')
+        assert self.manager.get_repository_state().unstaged_files == ['a.txt']
+        self.git('add', 'a.txt')
+        state = self.manager.get_repository_state()
+        assert state.staged_files == ['a.txt']
+        assert state.unstaged_files == []
+
+    def test_new_top_level_file_invalidates(self):
+        assert self.manager.get_repository_state().untracked_files == []
+        Path(self.temp_dir, 'b.txt').write_text('b')
+        assert self.manager.get_repository_state().untracked_files == ['b.txt']
+
+    def test_directory_change_invalidates(self):
+        self.manager.get_repository_state()
+        self.manager.current_directory = tempfile.gettempdir()
+        with patch.object(GitContextManager, 'find_git_repository', return_value=None):
+            assert self.manager.get_repository_state().is_git_repo is False
+
+    def test_worktree_git_file(self):
+        git_dir, common_dir = self.manager.resolve_git_dirs(self.temp_dir)
+        assert git_dir == common_dir == os.path.join(self.temp_dir, '.git')
+
+        worktree = os.path.join(self.temp_dir, 'wt')
+        self.git('worktree', 'add', '-q', worktree, '-b', 'other')
+        git_dir, common_dir = self.manager.resolve_git_dirs(worktree)
+        assert git_dir == os.path.join(self.temp_dir, '.git', 'worktrees', 'wt')
+        assert common_dir == os.path.join(self.temp_dir, '.git')
+
+
+class TestEnvironmentInvalidation:
+    """Cached project environment is reused until its inputs change"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        Path(self.temp_dir, 'package.json').write_text('{"name": "first"}')
+        with patch('os.getcwd', return_value=self.temp_dir):
+            self.manager = EnvironmentContextManager()
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_manifest_edit_invalidates(self):
+        assert self.manager.get_project_environment().project_name == 'first'
+        Path(self.temp_dir, 'package.json').write_text('{"name": "second app"}')
+        assert self.manager.get_project_environment().project_name == 'second app'
+
+    def test_new_file_invalidates(self):
+        assert self.manager.get_project_environment().has_docker is False
+        Path(self.temp_dir, 'Dockerfile').write_text('FROM scratch')
+        assert self.manager.get_project_environment().has_docker is True
+
+    def test_environment_variable_invalidates(self):
+        env1 = self.manager.get_project_environment()
+        with patch.dict(os.environ, {'NODE_ENV': 'production'}):
+            env2 = self.manager.get_project_environment()
+        assert env1 is not env2
+        assert env2.environment_type == 'production'
+
+    def test_unchanged_inputs_use_cache(self):
+        env1 = self.manager.get_project_environment()
+        with patch.object(EnvironmentContextManager, 'detect_project_type') as mock_detect:
+            env2 = self.manager.get_project_environment()
+        mock_detect.assert_not_called()
+        assert env1 is env2
@@ -205,6 +205,7 @@ class TestGitCommandExecution:
         assert output == 'test output'
         mock_run.assert_called_once_with(
             ['git', 'status'],
+            cwd=None,
             capture_output=True,
             text=True,
             timeout=10
@@ -232,13 +233,12 @@ class TestGitCommandExecution:
         mock_result.stdout = 'test output'
         mock_run.return_value = mock_result
         
-        with patch('os.getcwd') as mock_getcwd, patch('os.chdir') as mock_chdir:
-            mock_getcwd.return_value = '/original/dir'
-            
+        with patch('os.chdir') as mock_chdir:
             success, output = self.manager._run_git_command(['status'], self.temp_dir)
             
             assert success is True
-            mock_chdir.assert_has_calls([call(self.temp_dir), call('/original/dir')])
+            assert mock_run.call_args.kwargs['cwd'] == self.temp_dir
+            mock_chdir.assert_not_called()
     
     @patch('subprocess.run')
     def test_run_git_command_timeout(self, mock_run):
@@ -512,32 +512,26 @@ class TestGitRepositoryStateGeneration:
         assert state.repository_root == ""
     
     @patch.object(GitContextManager, 'check_merge_conflict')
-    @patch.object(GitContextManager, 'get_repository_status')
-    @patch.object(GitContextManager, 'get_ahead_behind_count')
-    @patch.object(GitContextManager, 'get_remote_tracking_branch')
-    @patch.object(GitContextManager, 'get_current_branch')
+    @patch.object(GitContextManager, '_run_git_command')
     @patch.object(GitContextManager, 'find_git_repository')
-    def test_get_repository_state_complete(self, mock_find_git, mock_get_branch, 
-                                         mock_get_remote, mock_get_ahead_behind,
-                                         mock_get_status, mock_check_conflict):
-        """Test complete repository state generation"""
-        # Setup mocks
+    def test_get_repository_state_complete(self, mock_find_git, mock_run_git, mock_check_conflict):
+        """Test complete repository state generation from one git status call"""
         mock_find_git.return_value = '/repo'
-        mock_get_branch.return_value = 'feature/test'
-        mock_get_remote.return_value = 'main'
-        mock_get_ahead_behind.return_value = (2, 1)
-        mock_get_status.return_value = {
-            'staged_files': ['file1.py'],
-            'unstaged_files': ['file2.py'],
-            'untracked_files': ['file3.py'],
-            'has_staged_changes': True,
-            'has_unstaged_changes': True,
-            'has_untracked_files': True
-        }
+        mock_run_git.return_value = (True, '\0'.join([
+            '# branch.oid 1234567890abcdef1234567890abcdef12345678',
+            '# branch.head feature/test',
+            '# branch.upstream origin/main',
+            '# branch.ab +2 -1',
+            '1 M. N... 100644 100644 100644 aaaaaaa bbbbbbb file1.py',
+            '1 .M N... 100644 100644 100644 aaaaaaa aaaaaaa file2.py',
+            '? file3.py'
+        ]))
         mock_check_conflict.return_value = False
         
         state = self.manager.get_repository_state()
         
+        assert mock_run_git.call_count == 1
+        assert mock_run_git.call_args[0][0][-4:] == ['status', '--porcelain=v2', '--branch', '-z']
         assert state.is_git_repo is True
         assert state.current_branch == 'feature/test'
         assert state.remote_branch == 'main'
@@ -552,6 +546,40 @@ class TestGitRepositoryStateGeneration:
         assert state.untracked_files == ['file3.py']
         assert state.repository_root == '/repo'
     
+    def test_parse_porcelain_v2_renames_and_detached(self):
+        """Renames report the new path, paths keep spaces, detached HEAD has no branch"""
+        output = '\0'.join([
+            '# branch.oid 1234567890abcdef1234567890abcdef12345678',
+            '# branch.head (detached)',
+            '2 R. N... 100644 100644 100644 aaaaaaa aaaaaaa R100 new name.py',
+            'old name.py',
+            '1 AM N... 000000 100644 100644 0000000 bbbbbbb added.py',
+            'u UU N... 100644 100644 100644 100644 aaaaaaa bbbbbbb ccccccc conflict.py',
+            '? dir/untracked file.txt',
+            ''
+        ])
+        
+        snapshot = GitContextManager.parse_porcelain_v2(output)
+        
+        assert snapshot['current_branch'] == ''
+        assert snapshot['remote_branch'] == ''
+        assert snapshot['staged_files'] == ['new name.py', 'added.py']
+        assert snapshot['unstaged_files'] == ['added.py']
+        assert snapshot['untracked_files'] == ['dir/untracked file.txt']
+    
+    @patch.object(GitContextManager, '_run_git_command')
+    @patch.object(GitContextManager, 'find_git_repository')
+    def test_get_repository_state_git_failure(self, mock_find_git, mock_run_git):
+        """A failing git status leaves the branch and file fields empty"""
+        mock_find_git.return_value = self.temp_dir
+        mock_run_git.return_value = (False, 'fatal: not a git repository')
+        
+        state = self.manager.get_repository_state()
+        
+        assert state.is_git_repo is True
+        assert state.current_branch == ''
+        assert state.staged_files == []
+    
     @patch.object(GitContextManager, 'find_git_repository')
     def test_get_repository_state_caching(self, mock_find_git):
         """Test repository state caching mechanism"""
@@ -591,6 +619,35 @@ class TestGitRepositoryStateGeneration:
         # Should be different objects due to cache expiry
         assert state1 is not state2
 
+    
+    def test_get_repository_state_refreshes_serialized(self):
+        """A refresh still running on a timed-out collector does not overlap the next one"""
+        import threading
+        started = threading.Event()
+        release = threading.Event()
+        active = []
+        overlapped = []
+        
+        def find_git_repository(*args):
+            overlapped.append(bool(active))
+            active.append(True)
+            started.set()
+            release.wait(5)
+            active.pop()
+            return None
+        
+        with patch.object(GitContextManager, 'find_git_repository', side_effect=find_git_repository):
+            first = threading.Thread(target=self.manager.get_repository_state)
+            first.start()
+            started.wait(5)
+            second = threading.Thread(target=self.manager.get_repository_state, kwargs={'force_refresh': True})
+            second.start()
+            time.sleep(0.1)
+            release.set()
+            first.join(5)
+            second.join(5)
+        
+        assert overlapped == [False, False]
 
 class TestGitCommandSuggestions:
     """Test Git command suggestions"""
@@ -0,0 +1,133 @@
+"""
+Tests for reading git metadata without running git
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from nlcli.context.git_context import GitContextManager
+from nlcli.context.git_metadata import GitMetadataReader
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="git not installed")
+
+
+class TestGitMetadataReader:
+    """Compare the reader with what git itself reports"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = os.path.join(self.temp_dir, 'repo')
+        os.mkdir(self.repo)
+        self.git('init', '-q', '-b', 'main')
+        self.git('config', 'user.email', 'test@example.com')
+        self.git('config', 'user.name', 'test')
+        Path(self.repo, 'a.txt').write_text('a')
+        self.git('add', 'a.txt')
+        self.git('commit', '-q', '-m', 'initial')
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def git(self, *args, cwd=None) -> str:
+        result = subprocess.run(['git', *args], cwd=cwd or self.repo, check=True, capture_output=True, text=True)
+        return result.stdout.strip()
+
+    def test_branch_and_head(self):
+        reader = GitMetadataReader(self.repo)
+        assert reader.read_head() == ('main', self.git('rev-parse', 'HEAD'))
+
+    def test_nested_branch_name(self):
+        self.git('checkout', '-q', '-b', 'feature/x')
+        assert GitMetadataReader(self.repo).read_head()[0] == 'feature/x'
+
+    def test_packed_refs(self):
+        self.git('pack-refs', '--all')
+        assert not os.path.exists(os.path.join(self.repo, '.git', 'refs', 'heads', 'main'))
+        assert GitMetadataReader(self.repo).read_head() == ('main', self.git('rev-parse', 'HEAD'))
+
+    def test_detached_head(self):
+        head = self.git('rev-parse', 'HEAD')
+        self.git('checkout', '-q', '--detach')
+        assert GitMetadataReader(self.repo).read_head() == ('', head)
+
+    def test_unborn_branch(self):
+        empty = os.path.join(self.temp_dir, 'empty')
+        os.mkdir(empty)
+        self.git('init', '-q', '-b', 'trunk', cwd=empty)
+        assert GitMetadataReader(empty).read_head() == ('trunk', '')
+
+    def test_upstream(self):
+        self.git('config', 'branch.main.remote', 'origin')
+        self.git('config', 'branch.main.merge', 'refs/heads/develop')
+        reader = GitMetadataReader(self.repo)
+        assert reader.read_upstream('main') == ('origin', 'develop')
+        assert reader.read_upstream('other') == ('', '')
+        assert reader.read_state() == {'current_branch': 'main', 'remote_branch': 'develop',
+                                       'in_merge_conflict': False}
+
+    def test_config_include_is_not_guessed(self):
+        with open(os.path.join(self.repo, '.git', 'config'), 'a') as f:
+            f.write('[include]\n\tpath = extra.config\n')
+        assert GitMetadataReader(self.repo).read_upstream('main') is None
+
+    def test_linked_worktree(self):
+        worktree = os.path.join(self.temp_dir, 'wt')
+        self.git('worktree', 'add', '-q', worktree, '-b', 'other')
+        reader = GitMetadataReader(worktree)
+        assert reader.git_dir == os.path.join(self.repo, '.git', 'worktrees', 'wt')
+        assert reader.common_dir == os.path.join(self.repo, '.git')
+        assert reader.read_head() == ('other', self.git('rev-parse', 'HEAD'))
+
+    def test_merge_state(self):
+        Path(self.repo, '.git', 'MERGE_HEAD').write_text(self.git('rev-parse', 'HEAD'))
+        assert GitMetadataReader(self.repo).in_merge() is True
+
+    def test_not_a_repository(self):
+        reader = GitMetadataReader(self.temp_dir)
+        assert reader.read_head() is None
+        assert reader.read_state() is None
+
+
+class TestGitContextManagerWithoutSubprocess:
+    """GitContextManager answers branch questions from .git"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        subprocess.run(['git', 'init', '-q', '-b', 'main'], cwd=self.temp_dir, check=True)
+        subprocess.run(['git', 'config', 'branch.main.remote', 'origin'], cwd=self.temp_dir, check=True)
+        subprocess.run(['git', 'config', 'branch.main.merge', 'refs/heads/main'], cwd=self.temp_dir, check=True)
+        self.manager = GitContextManager()
+        self.manager.current_directory = self.temp_dir
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_branch_queries_do_not_start_git(self):
+        with patch.object(GitContextManager, '_run_git_command') as mock_run_git:
+            assert self.manager.get_current_branch(self.temp_dir) == 'main'
+            assert self.manager.get_remote_tracking_branch(self.temp_dir, 'main') == 'main'
+            state = self.manager.get_head_state()
+        mock_run_git.assert_not_called()
+        assert state.is_git_repo is True
+        assert state.current_branch == 'main'
+        assert state.remote_branch == 'main'
+        assert state.repository_root == self.temp_dir
+
+    def test_head_state_falls_back_to_git(self):
+        with patch.object(GitMetadataReader, 'read_head', return_value=None), \
+             patch.object(GitContextManager, '_run_git_command', return_value=(True, 'main')) as mock_run_git:
+            state = self.manager.get_head_state(self.temp_dir)
+        assert state.current_branch == 'main'
+        assert mock_run_git.call_args_list[0][0][0] == ['branch', '--show-current']
+
+    def test_repository_state_keeps_branch_when_status_fails(self):
+        with patch.object(GitContextManager, '_run_git_command', return_value=(False, 'timed out')):
+            state = self.manager.get_repository_state(force_refresh=True)
+        assert state.current_branch == 'main'
+        assert state.remote_branch == 'main'
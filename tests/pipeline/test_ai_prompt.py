@@ -0,0 +1,88 @@
+"""
+Test cases for compact Level 6 prompts and token accounting
+"""
+
+from unittest.mock import Mock
+
+from nlcli.pipeline.ai_prompt import COMPACT_SYSTEM_PROMPT, CompactPromptBuilder, context_lines
+from nlcli.pipeline.ai_translator import AITranslator
+
+
+CONTEXT = {
+    'platform': 'linux',
+    'shell': 'bash',
+    'available_commands': {'file_ops': ['ls', 'cat'], 'network': ['curl', 'ping']},
+    'shell_features': ['history', 'completion'],
+    'git': {'is_git_repo': True, 'current_branch': 'main', 'has_unstaged_changes': True},
+    'environment': {'project_type': 'python', 'framework': 'flask', 'project_root': '/work/app'}
+}
+
+
+class TestCompactPromptBuilder:
+    """Test the static prefix and budgeted context suffix"""
+
+    def test_context_lines_in_priority_order(self):
+        """Platform first, command list last"""
+        lines = context_lines(CONTEXT)
+        assert lines[0] == 'platform: linux, shell: bash'
+        assert 'project: python (flask)' in lines
+        assert 'git: branch main, uncommitted changes' in lines
+        assert lines[-1] == 'commands: cat curl ls ping'
+        assert context_lines({}) == []
+
+    def test_static_prefix_is_identical(self):
+        """System message does not depend on request or context"""
+        builder = CompactPromptBuilder()
+        first, _ = builder.build('find all log files', CONTEXT)
+        second, _ = builder.build('show disk usage', {'platform': 'darwin'})
+        assert first[0]['content'] == second[0]['content'] == COMPACT_SYSTEM_PROMPT
+        assert first[1]['content'].endswith('Request: "find all log files"')
+
+    def test_budget_drops_low_priority_context(self):
+        """Lines that do not fit the budget are dropped, the request is kept"""
+        full_messages, full_usage = CompactPromptBuilder(token_budget=2000).build('list files', CONTEXT)
+        assert full_usage['context_lines_dropped'] == 0
+
+        budget = full_usage['static_tokens'] + 30
+        messages, usage = CompactPromptBuilder(token_budget=budget).build('list files', CONTEXT)
+        assert usage['estimated_prompt_tokens'] <= budget
+        assert 0 < usage['context_lines'] < full_usage['context_lines']
+        assert 'platform: linux' in messages[1]['content']
+        assert 'commands:' not in messages[1]['content']
+
+        messages, usage = CompactPromptBuilder(token_budget=0).build('list files', CONTEXT)
+        assert messages[1]['content'] == 'Request: "list files"'
+        assert usage['context_lines'] == 0
+
+
+class TestPromptTokenAccounting:
+    """Test per-request token recording in AITranslator"""
+
+    def setup_method(self):
+        self.translator = AITranslator(api_key=None, enable_cache=False)
+        self.translator.persistent_context = CONTEXT
+
+    def test_compact_smaller_than_full(self):
+        """Compact mode sends a fraction of the full prompt"""
+        compact_request, compact_usage = self.translator._build_ai_request('find all log files')
+        self.translator.prompt_mode = 'full'
+        full_request, full_usage = self.translator._build_ai_request('find all log files')
+        assert compact_usage['estimated_prompt_tokens'] * 2 < full_usage['estimated_prompt_tokens']
+        assert compact_request['messages'][0]['content'] == COMPACT_SYSTEM_PROMPT
+        assert self.translator.get_prompt_stats()['requests'] == 2
+
+    def test_reported_usage_recorded(self):
+        """Prompt and cached token counts from the API are stored per request"""
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = '{"command": "ls", "explanation": "List files"}'
+        response.usage.prompt_tokens = 240
+        response.usage.prompt_tokens_details.cached_tokens = 192
+        self.translator.client = Mock()
+        self.translator.client.chat.completions.create.return_value = response
+
+        assert self.translator._complete_with_ai('list files')['command'] == 'ls'
+        stats = self.translator.get_prompt_stats()
+        assert stats['prompt_tokens'] == 240
+        assert stats['cached_prompt_tokens'] == 192
+        assert stats['last']['mode'] == 'compact'
@@ -0,0 +1,164 @@
+"""
+Test cases for the streaming Level 6 OpenAI fallback
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import AsyncOpenAI
+
+from nlcli.pipeline.ai_stream import EventLoopThread, StreamingCommandParser, stream_json_completion
+from nlcli.pipeline.ai_translator import AITranslator
+
+
+RESPONSE = {
+    'command': 'find . -name "*.log"',
+    'explanation': 'Finds all log files below the current directory',
+    'confidence': 0.9,
+    'safe': True,
+    'reasoning': 'User asked for log files'
+}
+
+
+class FakeOpenAIServer:
+    """Minimal OpenAI-compatible server streaming chat completion chunks"""
+
+    def __init__(self, content: str, chunk_size: int = 7, delay: float = 0.0):
+        self.content = content
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                server.requests.append((self.path, body))
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                text = server.content
+                for start in range(0, len(text), server.chunk_size):
+                    if server.delay:
+                        time.sleep(server.delay)
+                    chunk = {
+                        'id': 'chatcmpl-test', 'object': 'chat.completion.chunk', 'created': 0,
+                        'model': body['model'],
+                        'choices': [{'index': 0, 'delta': {'content': text[start:start + server.chunk_size]},
+                                     'finish_reason': None}]
+                    }
+                    try:
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                        self.wfile.flush()
+                    except OSError:
+                        return
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestStreamingCommandParser:
+    """Test incremental extraction of the command field"""
+
+    def feed_all(self, text, size=1):
+        parser = StreamingCommandParser()
+        seen = []
+        for start in range(0, len(text), size):
+            command = parser.feed(text[start:start + size])
+            if command is not None:
+                seen.append((command, len(parser.text)))
+        return parser, seen
+
+    def test_command_reported_before_explanation(self):
+        """Command is complete as soon as its closing quote arrives"""
+        text = json.dumps(RESPONSE)
+        parser, seen = self.feed_all(text)
+        assert seen == [(RESPONSE['command'], text.index('"explanation"') - 2)]
+        assert parser.result() == RESPONSE
+
+    def test_escapes_and_key_order(self):
+        """Escaped quotes are decoded and the field is found in any position"""
+        payload = {'explanation': 'says "command": "no"', 'nested': {'command': 'wrong'},
+                   'command': 'echo "a\\b" | grep é'}
+        for size in (1, 3, 50):
+            parser, seen = self.feed_all(json.dumps(payload), size)
+            assert [command for command, _ in seen] == [payload['command']]
+
+    def test_missing_field(self):
+        """No early command without a top-level string field"""
+        parser, seen = self.feed_all(json.dumps({'command': None, 'explanation': 'x'}))
+        assert seen == []
+        assert parser.result()['command'] is None
+
+
+class TestStreamingTranslation:
+    """Test streaming against a local OpenAI-compatible server"""
+
+    def test_stream_json_completion(self):
+        """Chunks are parsed and the command callback fires once"""
+        commands = []
+        loop = EventLoopThread()
+        try:
+            with FakeOpenAIServer(json.dumps(RESPONSE)) as server:
+                client = AsyncOpenAI(api_key='test-key', base_url=server.base_url)
+                request = {'model': 'gpt-4o-mini', 'messages': [{'role': 'user', 'content': 'find logs'}]}
+                result = loop.run(stream_json_completion(client, request, commands.append), timeout=5)
+            assert result == RESPONSE
+            assert commands == [RESPONSE['command']]
+            path, body = server.requests[0]
+            assert path == '/v1/chat/completions'
+            assert body['stream'] is True
+        finally:
+            loop.stop()
+
+    @pytest.fixture
+    def translator(self):
+        translator = AITranslator(api_key='test-key', enable_cache=False)
+        yield translator
+        translator._stream_loop.stop()
+
+    def test_translate_with_ai_streaming(self, translator):
+        """Level 6 streams when a callback is given and reuses the loop across calls"""
+        commands = []
+        with FakeOpenAIServer(json.dumps(RESPONSE)) as server:
+            translator.async_client = AsyncOpenAI(api_key='test-key', base_url=server.base_url)
+            for _ in range(2):
+                result = translator._translate_with_ai('find all log files', 5.0, on_command=commands.append)
+                assert result['command'] == RESPONSE['command']
+                assert result['cached'] is False
+                assert result['instant'] is False
+        assert commands == [RESPONSE['command']] * 2
+        assert len(server.requests) == 2
+
+    def test_streaming_timeout(self, translator):
+        """Slow streams are cancelled after the timeout"""
+        with FakeOpenAIServer(json.dumps(RESPONSE), chunk_size=2, delay=0.05) as server:
+            translator.async_client = AsyncOpenAI(api_key='test-key', base_url=server.base_url)
+            start = time.time()
+            assert translator._translate_with_ai('find all log files', 0.3, on_command=lambda command: None) is None
+            assert time.time() - start < 2.0
+
+    def test_missing_fields_rejected(self, translator):
+        """Streamed responses are validated like blocking ones"""
+        with FakeOpenAIServer(json.dumps({'command': 'ls'})) as server:
+            translator.async_client = AsyncOpenAI(api_key='test-key', base_url=server.base_url)
+            assert translator._translate_with_ai('list', 5.0, on_command=lambda command: None) is None
@@ -0,0 +1,128 @@
+"""
+Test cases for the compiled Level 2 command index
+"""
+
+from nlcli.pipeline.command_filter import CommandFilter
+import pytest
+
+from nlcli.pipeline.command_index import CommandTrie, FrozenResult, KeywordMatcher
+
+
+class TestCommandTrie:
+    """Test CommandTrie lookups"""
+
+    def setup_method(self):
+        """Setup a small trie"""
+        self.direct = {
+            'git': {'command': 'git', 'explanation': 'Git', 'confidence': 1.0},
+            'groupdel': {'command': 'groupdel', 'explanation': 'Direct', 'confidence': 0.7},
+        }
+        self.with_args = {
+            'git status': {'command': 'git status', 'explanation': 'Status', 'confidence': 1.0},
+            'groupdel': {'command': 'groupdel', 'explanation': 'With args', 'confidence': 0.7},
+        }
+        self.synonyms = {'gitty': 'git', 'nothing': 'missing'}
+        self.trie = CommandTrie.build(self.direct, self.with_args, self.synonyms)
+
+    def test_exact_precedence(self):
+        """Direct commands win over commands with args, which win over synonyms"""
+        groupdel = self.trie.get_exact('groupdel')
+        assert groupdel['match_type'] == CommandTrie.EXACT_DIRECT
+        assert groupdel['explanation'] == 'Direct'
+        assert self.trie.get_exact('git status')['match_type'] == CommandTrie.EXACT_WITH_ARGS
+        synonym = self.trie.get_exact('gitty')
+        assert synonym['match_type'] == CommandTrie.SYNONYM
+        assert synonym['explanation'] == 'Git (command synonym)'
+        assert self.trie.get_exact('nothing') is None
+
+    def test_exact_results_are_prebuilt(self):
+        """Exact hits return the same shared instance with pipeline fields filled in"""
+        result = self.trie.get_exact('git')
+        assert result is self.trie.get_exact('git')
+        assert result['pipeline_level'] == 2
+        assert result['source'] == 'command_filter'
+        assert result['cached'] is False
+        assert result['instant'] is True
+        # Source tables are not modified
+        assert 'pipeline_level' not in self.direct['git']
+
+    def test_prefix_matches_longest_first(self):
+        """Prefix walk returns terminal nodes from longest to shortest"""
+        matches = list(self.trie.prefix_matches(['git', 'status', '--short']))
+        assert [depth for depth, _ in matches] == [2, 1]
+        assert matches[0][1].with_args is self.with_args['git status']
+        assert matches[1][1].direct is self.direct['git']
+
+    def test_prefix_matches_respects_word_limit(self):
+        """Keys longer than max_prefix_words are not reachable by prefix"""
+        trie = CommandTrie.build({'a b c d': {'command': 'x'}}, {}, {}, max_prefix_words=3)
+        assert list(trie.prefix_matches(['a', 'b', 'c', 'd', 'e'])) == []
+
+    def test_no_match(self):
+        """Unknown leading word yields no matches"""
+        assert list(self.trie.prefix_matches(['unknown', 'git'])) == []
+
+
+class TestFrozenResult:
+    """Test FrozenResult read-only semantics"""
+
+    def test_mutation_is_rejected(self):
+        """In-place mutation raises TypeError"""
+        result = FrozenResult({'command': 'ls'})
+        with pytest.raises(TypeError):
+            result['command'] = 'rm'
+        with pytest.raises(TypeError):
+            result.update(command='rm')
+        with pytest.raises(TypeError):
+            del result['command']
+        assert result == {'command': 'ls'}
+
+    def test_copy_is_mutable_dict(self):
+        """copy() and unpacking produce ordinary dicts"""
+        result = FrozenResult({'command': 'ls'})
+        private = result.copy()
+        private['command'] = 'rm'
+        assert type(private) is dict
+        assert {**result, 'cached': True}['cached'] is True
+        assert result['command'] == 'ls'
+
+
+class TestKeywordMatcher:
+    """Test KeywordMatcher substring semantics"""
+
+    def test_matches_like_any_substring(self):
+        """Search agrees with any(word in text)"""
+        words = ['all', 'can you', 'in']
+        matcher = KeywordMatcher(words)
+        for text in ['install', 'can you help', 'nothing here', 'xyz', '']:
+            assert matcher.search(text) == any(word in text for word in words)
+
+    def test_empty_matcher(self):
+        """Empty matcher never matches"""
+        assert KeywordMatcher([]).search('anything') is False
+
+    def test_membership(self):
+        """Matcher exposes its words as a frozenset"""
+        assert 'all' in KeywordMatcher(['all'])
+
+
+class TestCommandFilterIndex:
+    """Test CommandFilter integration with the index"""
+
+    def test_rebuild_index_picks_up_new_commands(self):
+        """Runtime additions are visible after rebuild_index"""
+        command_filter = CommandFilter()
+        command_filter.direct_commands['mytool'] = {
+            'command': 'mytool', 'explanation': 'Custom tool', 'confidence': 1.0
+        }
+        assert command_filter.get_pipeline_metadata('mytool') is None
+        command_filter.rebuild_index()
+        result = command_filter.get_pipeline_metadata('mytool')
+        assert result['match_type'] == 'exact_command'
+
+    def test_prefix_falls_back_to_shorter_base(self):
+        """Invalid syntax for the longest prefix falls back like the original scan"""
+        command_filter = CommandFilter()
+        result = command_filter.get_pipeline_metadata('git status --short')
+        assert result['pipeline_level'] == 2
+        assert result['command'] == 'git status --short'
@@ -0,0 +1,81 @@
+"""
+Test cases for on-demand persistent context in AITranslator
+"""
+
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from nlcli.pipeline.ai_translator import AITranslator
+from nlcli.pipeline.shell_adapter import ShellAdapter
+from nlcli.storage.cache_manager import CacheManager
+
+CONTEXT = {'platform': 'linux', 'shell': 'bash', 'git': {'is_git_repo': False},
+           'environment': {'project_type': 'unknown'}}
+
+
+class TestLazyPersistentContext:
+    """Context is collected when needed and memoized per working directory"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cwd = os.getcwd()
+        self.collect = patch.object(ShellAdapter, 'get_enhanced_context', return_value=dict(CONTEXT))
+        self.mock_collect = self.collect.start()
+        self.translator = AITranslator(api_key=None, enable_cache=False)
+
+    def teardown_method(self):
+        os.chdir(self.original_cwd)
+        self.collect.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def test_not_collected_at_construction(self):
+        self.mock_collect.assert_not_called()
+        assert self.translator.translate('ls')['command'] == 'ls'
+        self.mock_collect.assert_not_called()
+
+    def test_collected_once_on_first_access(self):
+        assert self.translator.persistent_context['platform'] == 'linux'
+        assert 'linux' in self.translator.persistent_system_prompt
+        assert self.translator.last_context_hash
+        assert self.mock_collect.call_count == 1
+
+    def test_memoized_per_directory(self):
+        first_hash = self.translator.last_context_hash
+        os.chdir(self.temp_dir)
+        self.mock_collect.return_value = {**CONTEXT, 'environment': {'project_type': 'python'}}
+        assert self.translator.persistent_context['environment']['project_type'] == 'python'
+        assert self.translator.shell_adapter.current_directory == os.getcwd()
+        assert self.mock_collect.call_count == 2
+
+        os.chdir(self.original_cwd)
+        assert self.translator.last_context_hash == first_hash
+        assert self.mock_collect.call_count == 2
+
+    def test_refresh_skips_second_collection(self):
+        assert self.translator._refresh_context_if_needed() is False
+        assert self.mock_collect.call_count == 1
+        self.translator._refresh_context_if_needed()
+        assert self.mock_collect.call_count == 2
+
+    def test_only_context_dependent_cache_hits_collect(self):
+        self.translator.cache_manager = CacheManager(self.temp_dir)
+        self.translator.cache_manager.cache_translation('lsit', 'linux', {'command': 'ls'})
+        assert self.translator._get_cached_result('lsit', 'linux')['command'] == 'ls'
+        self.mock_collect.assert_not_called()
+
+        self.translator.cache_manager.cache_translation('last commit', 'linux', {'command': 'git log -1'},
+                                                        context_hash='some-other-context')
+        assert self.translator._get_cached_result('last commit', 'linux') is None
+        assert self.mock_collect.call_count == 1
+
+
+class TestLegacyContextManagerCreation:
+    """ShellAdapter does not construct the legacy context manager up front"""
+
+    def test_translator_construction_skips_legacy_probes(self):
+        with patch('nlcli.context.context_manager.ContextManager.__init__', return_value=None) as mock_init:
+            translator = AITranslator(api_key=None, enable_cache=False)
+            translator.translate('ls')
+        mock_init.assert_not_called()
@@ -0,0 +1,112 @@
+"""
+Test cases for the Level 5 intent vocabulary index
+"""
+
+from nlcli.pipeline.semantic_index import (
+    IntentVocabularyIndex, SimilarityCache, get_similarity_cache
+)
+from nlcli.pipeline.semantic_matcher import SemanticMatcher
+
+
+class TestIntentVocabularyIndex:
+    """Test IntentVocabularyIndex similarity rows"""
+
+    def setup_method(self):
+        """Setup a matcher and its index"""
+        self.matcher = SemanticMatcher()
+        self.index = self.matcher.vocabulary_index
+
+    def test_matches_pairwise_similarity(self):
+        """Index rows agree with _semantic_word_similarity for every vocabulary word"""
+        for word in ['show', 'proceses', 'netwrk', 'display', 'fies', 'xyz', 'search']:
+            row = self.index.word_similarities(word)
+            for candidate in self.index.vocabulary:
+                expected = self.matcher._semantic_word_similarity(word, candidate)
+                assert row.get(candidate, 0.0) == expected, (word, candidate)
+
+    def test_exact_and_synonym_hits(self):
+        """Exact words score 1.0 and synonyms 0.9"""
+        row = self.index.word_similarities('display')
+        assert row['display'] == 1.0
+        assert row['show'] == 0.9
+
+    def test_similarities_deduplicates_words(self):
+        """Repeated words share a single row"""
+        rows = self.index.similarities(['show', 'show', 'files'])
+        assert list(rows) == ['show', 'files']
+
+
+class TestSimilarityCache:
+    """Test SimilarityCache LRU behaviour"""
+
+    def test_hits_misses_and_eviction(self):
+        """Least recently used entries are evicted and counted"""
+        cache = SimilarityCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        assert cache.get('a') == 1  # 'a' becomes most recent
+        cache.put('c', 3)           # evicts 'b'
+        assert cache.get('b', None) is None
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['evictions'] == 1
+        assert stats['entries'] == 2
+
+    def test_shared_between_matchers(self):
+        """Rows computed by one matcher are served to another"""
+        first, second = SemanticMatcher(), SemanticMatcher()
+        assert first.similarity_cache is second.similarity_cache is get_similarity_cache()
+        first.vocabulary_index.similarities(['zzqx-unique-word'])
+        hits = second.get_cache_stats()['hits']
+        second.vocabulary_index.similarities(['zzqx-unique-word'])
+        assert second.get_cache_stats()['hits'] == hits + 1
+
+    def test_stats_in_pipeline_metadata(self):
+        """get_pipeline_metadata reports cache counters"""
+        matcher = SemanticMatcher()
+        context = {'platform': 'linux'}
+        result = matcher.get_pipeline_metadata('show all running processes', context)
+        assert set(result['metadata']['similarity_cache']) >= {'hits', 'misses', 'hit_rate'}
+        assert result['metadata']['platform'] == 'linux'
+        assert 'similarity_cache' not in result
+        assert context == {'platform': 'linux'}
+
+
+class TestIntentProfile:
+    """Test IntentProfile modifier precedence"""
+
+    def test_last_word_first_modifier_wins(self):
+        """Later words override earlier ones; list order breaks ties within a word"""
+        definition = {
+            'action_words': ['show'],
+            'target_words': ['files'],
+            'modifiers': {'sorting': ['size', 'time', 'name']},
+        }
+        index = IntentVocabularyIndex({'demo': definition}, {})
+        profile = index.profiles[0]
+        words = ['name', 'size']
+        detected = profile.detect_modifiers(words, index.similarities(words), 0.6)
+        assert detected == {'sorting': 'size'}
+
+
+class TestSemanticMatcherIndex:
+    """Test SemanticMatcher integration with the index"""
+
+    def test_classification_uses_index(self):
+        """Process listing is still classified with modifiers"""
+        matcher = SemanticMatcher()
+        matches = matcher._classify_intent_and_resolve('show all running processes', {'platform': 'linux'})
+        assert matches[0].metadata['intent'] == 'monitor_processes'
+        assert matches[0].metadata['detected_modifiers'] == {'scope': 'running'}
+
+    def test_standalone_analyze_intent_match(self):
+        """Ad-hoc definitions can still be analyzed without a prebuilt profile"""
+        matcher = SemanticMatcher()
+        definition = {
+            'action_words': ['brew'],
+            'target_words': ['coffee'],
+            'confidence_base': 1.0,
+        }
+        confidence, _ = matcher._analyze_intent_match(['brew', 'coffee'], definition)
+        assert confidence == 1.0
@@ -5,6 +5,8 @@ Tests platform-aware command adaptation, multi-shell support, and performance
 
 import pytest
 import platform
+import threading
+import time
 from unittest.mock import patch, MagicMock
 from nlcli.pipeline.shell_adapter import ShellAdapter
 
@@ -391,5 +393,69 @@ class TestMultiPlatformIntegration:
             assert result == 'clear', f"Unix enterprise command failed: 'claer' -> '{result}'"
 
 
+
+class TestParallelContextCollection:
+    """Test concurrent context collection with per-collector timeouts"""
+    
+    def setup_method(self):
+        self.adapter = ShellAdapter()
+    
+    def test_collectors_run_concurrently(self):
+        """Slow collectors overlap instead of adding up"""
+        def slow():
+            time.sleep(0.3)
+            return 'done'
+        
+        start = time.monotonic()
+        results = self.adapter.collect_context({'a': slow, 'b': slow, 'c': slow})
+        
+        assert results == {'a': 'done', 'b': 'done', 'c': 'done'}
+        assert time.monotonic() - start < 0.8
+    
+    def test_timeout_gives_partial_results(self):
+        """A collector past its timeout is left out, the others are kept"""
+        release = threading.Event()
+        
+        results = self.adapter.collect_context({'fast': lambda: 1, 'stuck': release.wait}, timeout=0.1)
+        release.set()
+        
+        assert results == {'fast': 1}
+    
+    def test_enhanced_context_uses_fallbacks(self):
+        """Failed or slow collectors fall back to empty context"""
+        release = threading.Event()
+        with patch.object(ShellAdapter, 'get_git_context', side_effect=RuntimeError('boom')), \
+             patch.object(ShellAdapter, 'get_environment_context', side_effect=lambda: release.wait()):
+            context = self.adapter.get_enhanced_context('ls', timeout=0.1)
+        release.set()
+        
+        assert context['git'] == {'is_git_repo': False}
+        assert context['environment']['project_type'] == 'unknown'
+        assert context['platform'] == self.adapter.platform
+    
+    def test_environment_probes_time_out_separately(self):
+        """A stuck environment probe leaves out only its own part"""
+        release = threading.Event()
+        env_context = self.adapter.env_context
+        with patch.object(env_context, 'detect_development_tools', side_effect=lambda: release.wait()), \
+             patch.object(env_context, 'parse_package_json', return_value={'name': 'web', 'scripts': {'test': 'jest'}}):
+            context = self.adapter.get_enhanced_context('ls', timeout=0.5)
+        release.set()
+        
+        environment = context['environment']
+        assert 'development_tools' not in environment
+        assert environment['project_name'] == 'web'
+        assert environment['scripts'] == ['test']
+        assert environment['environment_type'] in ('development', 'production', 'testing')
+    
+    def test_context_manager_created_on_first_use(self):
+        """The legacy context manager is not constructed with the adapter"""
+        from nlcli.context.context_manager import ContextManager
+        assert self.adapter._context_manager_loaded is False
+        assert isinstance(self.adapter.context_manager, ContextManager)
+        self.adapter.context_manager = None
+        assert self.adapter.get_legacy_context() == {}
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Test cases for single-flight coalescing of Level 6 requests
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nlcli.pipeline.ai_translator import AITranslator
+from nlcli.pipeline.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test the generic single-flight group"""
+
+    def setup_method(self):
+        self.group = SingleFlight()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def slow_call(self):
+        self.calls += 1
+        self.release.wait(5)
+        return {'command': 'ls'}
+
+    def run_concurrently(self, keys):
+        with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+            futures = [pool.submit(self.group.do, key, self.slow_call) for key in keys]
+            # Wait until every caller has either started the call or joined one
+            deadline = time.time() + 5
+            while self.group.get_stats()['calls'] < len(keys) and time.time() < deadline:
+                time.sleep(0.01)
+            self.release.set()
+            return [future.result() for future in futures]
+
+    def test_identical_calls_coalesced(self):
+        """Only one execution for concurrent callers with the same key"""
+        results = self.run_concurrently(['a'] * 5)
+        assert self.calls == 1
+        assert sorted(coalesced for _, coalesced in results) == [False, True, True, True, True]
+        assert all(result is results[0][0] for result, _ in results)
+
+        stats = self.group.get_stats()
+        assert stats['executions'] == 1
+        assert stats['coalesced'] == 4
+        assert stats['in_flight'] == 0
+
+    def test_different_keys_run_separately(self):
+        """Distinct keys never wait on each other"""
+        self.run_concurrently(['a', 'b', 'c'])
+        assert self.calls == 3
+        assert self.group.get_stats()['coalesced'] == 0
+
+    def test_sequential_calls_not_cached(self):
+        """A finished call releases its key"""
+        self.release.set()
+        self.group.do('a', self.slow_call)
+        self.group.do('a', self.slow_call)
+        assert self.calls == 2
+
+    def test_exception_shared(self):
+        """Waiting callers see the exception of the shared call"""
+        started = threading.Event()
+
+        def failing_call():
+            started.set()
+            self.release.wait(5)
+            raise ValueError('boom')
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(self.group.do, 'a', failing_call)
+            started.wait(5)
+            follower = pool.submit(self.group.do, 'a', failing_call)
+            while self.group.get_stats()['calls'] < 2:
+                time.sleep(0.01)
+            self.release.set()
+            for future in (leader, follower):
+                with pytest.raises(ValueError):
+                    future.result()
+
+
+class TestTranslatorCoalescing:
+    """Test single-flight in AITranslator Level 6"""
+
+    def test_concurrent_duplicates_share_one_call(self):
+        """Normalized duplicates wait on the same request and get private copies"""
+        translator = AITranslator(api_key=None, enable_cache=False)
+        release = threading.Event()
+        calls = []
+
+        def fake_translate(natural_language, timeout, context=None, on_command=None):
+            calls.append(natural_language)
+            release.wait(5)
+            return {'command': 'find . -name "*.log"', 'explanation': 'Find logs', 'cached': False}
+
+        translator._translate_with_ai = fake_translate
+        inputs = ['find all logs', 'Find all logs ', 'find all logs', 'find all logs']
+        context = {'platform': 'linux'}
+        with ThreadPoolExecutor(max_workers=len(inputs)) as pool:
+            futures = [pool.submit(translator._translate_with_ai_coalesced, text, 5.0, context) for text in inputs]
+            deadline = time.time() + 5
+            while translator.get_coalescing_stats()['calls'] < len(inputs) and time.time() < deadline:
+                time.sleep(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert len(calls) == 1
+        assert all(result['command'] == 'find . -name "*.log"' for result in results)
+        assert sum(1 for result in results if result.get('coalesced')) == 3
+        assert len({id(result) for result in results}) == len(results)
+        assert translator.get_coalescing_stats()['coalesced'] == 3
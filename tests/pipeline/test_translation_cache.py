@@ -0,0 +1,85 @@
+"""
+Test cases for the read-through cache ahead of Levels 4-6
+"""
+
+import shutil
+import tempfile
+from unittest.mock import Mock
+
+from nlcli.pipeline.ai_translator import AITranslator
+from nlcli.storage.cache_manager import CacheManager
+
+
+class TestReadThroughCache:
+    """Test cache lookup before the expensive pipeline levels"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.translator = AITranslator(api_key=None, enable_cache=False)
+        self.translator.cache_manager = CacheManager(self.temp_dir)
+        self.translator.shell_adapter.get_pipeline_metadata = Mock(return_value={'platform': 'linux'})
+        self.translator.last_context_hash = 'context-1'
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_level4_result_served_from_cache(self):
+        """Second lookup skips the typo corrector"""
+        first = self.translator.translate('lsit')
+        assert first['cached'] is False
+
+        self.translator.typo_corrector.get_pipeline_metadata = Mock(return_value=None)
+        second = self.translator.translate('lsit')
+        assert second['command'] == first['command']
+        assert second['cached'] is True
+        assert second['source'] == first['source']
+        self.translator.typo_corrector.get_pipeline_metadata.assert_not_called()
+
+    def test_level6_result_invalidated_by_context_change(self):
+        """AI results are stored for the context they were made in"""
+        ai_result = {'command': 'git log -1', 'explanation': 'Last commit', 'confidence': 0.9}
+        self.translator._translate_with_ai = Mock(return_value=ai_result)
+        self.translator.typo_corrector.get_pipeline_metadata = Mock(return_value=None)
+        self.translator._semantic_matcher = Mock(get_pipeline_metadata=Mock(return_value=None))
+
+        self.translator.translate('what did i do last')
+        assert self.translator.translate('what did i do last')['cached'] is True
+        assert self.translator._translate_with_ai.call_count == 1
+
+        self.translator.last_context_hash = 'context-2'
+        assert self.translator.translate('what did i do last')['command'] == 'git log -1'
+        assert self.translator._translate_with_ai.call_count == 2
+
+    def test_negative_caching(self):
+        """A failed AI translation is not retried while the negative entry is valid"""
+        self.translator.client = Mock()
+        self.translator._complete_with_ai = Mock(side_effect=RuntimeError('invalid request'))
+        self.translator.typo_corrector.get_pipeline_metadata = Mock(return_value=None)
+        self.translator._semantic_matcher = Mock(get_pipeline_metadata=Mock(return_value=None))
+
+        assert self.translator.translate('qwzx frobnicate') is None
+        assert self.translator.translate('qwzx frobnicate') is None
+        assert self.translator._complete_with_ai.call_count == 1
+
+        self.translator.negative_cache_ttl = 0
+        self.translator.cache_manager = CacheManager(tempfile.mkdtemp(dir=self.temp_dir))
+        self.translator.translate('qwzx frobnicate')
+        self.translator.translate('qwzx frobnicate')
+        assert self.translator._complete_with_ai.call_count == 3
+
+    def test_transient_failures_not_cached(self):
+        """A timeout or a missing API key is retried on the next request"""
+        self.translator.typo_corrector.get_pipeline_metadata = Mock(return_value=None)
+        self.translator._semantic_matcher = Mock(get_pipeline_metadata=Mock(return_value=None))
+        self.translator.client = None
+        self.translator._prompt_for_api_key = Mock(return_value=False)
+
+        assert self.translator.translate('qwzx frobnicate') is None
+        assert self.translator.translate('qwzx frobnicate') is None
+        assert self.translator._prompt_for_api_key.call_count == 2
+
+        self.translator.client = Mock()
+        self.translator._complete_with_ai = Mock(side_effect=TimeoutError)
+        self.translator.translate('qwzx frobnicate')
+        self.translator.translate('qwzx frobnicate')
+        assert self.translator._complete_with_ai.call_count == 2
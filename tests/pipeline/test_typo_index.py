@@ -0,0 +1,152 @@
+"""
+Test cases for the Level 4 typo correction index
+"""
+
+import os
+import stat
+
+from nlcli.pipeline.simple_typo_corrector import (
+    NON_LETTER_PATTERN, LevenshteinMatcher, PhoneticMatcher, SimpleTypoCorrector, phonetic_key
+)
+from nlcli.pipeline.typo_index import DeletionIndex, levenshtein_distance
+from nlcli.utils.known_command_registry import KnownCommandRegistry
+
+
+class TestLevenshteinDistance:
+    """Test the edit distance helper"""
+
+    def test_distances(self):
+        """Basic insert, delete and substitute distances"""
+        assert levenshtein_distance('ls', 'ls') == 0
+        assert levenshtein_distance('gerp', 'grep') == 2
+        assert levenshtein_distance('dockr', 'docker') == 1
+        assert levenshtein_distance('', 'abc') == 3
+
+    def test_bounded_distance(self):
+        """Bounded computation stops early and reports max_distance + 1"""
+        assert levenshtein_distance('kubectl', 'ls', max_distance=2) == 3
+        assert levenshtein_distance('chmdo', 'chmod', max_distance=2) == 2
+
+
+class TestDeletionIndex:
+    """Test DeletionIndex lookups"""
+
+    def test_search_matches_brute_force(self):
+        """Index results equal a linear scan with the same distance"""
+        words = ['ls', 'cat', 'chmod', 'chown', 'docker', 'git', 'grep', 'python3', 'kubectl']
+        index = DeletionIndex(words, max_distance=2)
+        for query in ['gti', 'chmdo', 'dockr', 'pyhton3', 'kubctl', 'zzzzzz', 'l']:
+            expected = sorted(
+                (levenshtein_distance(query, word), word) for word in words
+                if levenshtein_distance(query, word) <= 2
+            )
+            assert index.search(query) == expected
+
+    def test_smaller_query_distance(self):
+        """Queries may use a tighter bound than the index"""
+        index = DeletionIndex(['grep', 'git'], max_distance=2)
+        assert index.search('gerp', 1) == []
+        assert index.search('gep', 1) == [(1, 'grep')]
+
+    def test_add_is_idempotent(self):
+        """Duplicate words are ignored"""
+        index = DeletionIndex(['ls'])
+        assert index.add('ls') is False
+        assert len(index) == 1
+        assert 'ls' in index
+
+
+class TestLevenshteinMatcherIndex:
+    """Test LevenshteinMatcher on top of the index"""
+
+    def test_registry_commands_are_candidates(self):
+        """Commands from the known command registry are corrected, not just the curated list"""
+        matcher = LevenshteinMatcher()
+        command, score, metadata = matcher.match('dockr')
+        assert command == 'docker'
+        assert metadata['method'] == 'sequence_similarity'
+
+    def test_extra_commands(self):
+        """Extra commands such as $PATH binaries can be indexed"""
+        matcher = LevenshteinMatcher(extra_commands=['terraform'])
+        assert matcher.match('terrafrom')[0] == 'terraform'
+
+    def test_exact_typo_mapping_still_wins(self):
+        """Curated typo mappings are checked before the index"""
+        assert LevenshteinMatcher().match('lss')[0] == 'ls'
+
+    def test_exact_command_before_candidates(self):
+        """A command in the index is returned as is"""
+        command, score, metadata = LevenshteinMatcher().match('patch')
+        assert (command, score, metadata['method']) == ('patch', 1.0, 'exact_command')
+
+    def test_known_word_not_corrected(self):
+        """Regression: 'path' was corrected to 'patch' once the registry was indexed"""
+        assert LevenshteinMatcher().match('path') is None
+        corrector = SimpleTypoCorrector()
+        for word in ('path', 'Path', 'name', 'stop'):
+            assert corrector.get_pipeline_metadata(word) is None, word
+        assert corrector.get_pipeline_metadata('pyhton')['command'] == 'python'
+
+
+class TestPhoneticIndex:
+    """Test precomputed phonetic keys in PhoneticMatcher"""
+
+    def setup_method(self):
+        self.matcher = PhoneticMatcher()
+
+    def brute_force(self, text, threshold=0.6):
+        """Original scan calling _phonetic_similarity for every variation"""
+        text_clean = NON_LETTER_PATTERN.sub('', text.lower().strip())
+        best_match, best_score = None, 0
+        for command, variations in self.matcher.phonetic_mappings.items():
+            for variation in variations:
+                score = self.matcher._phonetic_similarity(text_clean, variation)
+                if score > best_score and score >= threshold:
+                    best_match, best_score = command, score
+        return (best_match, best_score) if best_match else None
+
+    def test_keys_precomputed(self):
+        """Every non-empty skeleton is indexed at construction"""
+        assert phonetic_key('see-dee') == 'sd'
+        assert self.matcher.key_to_command['sd'] == 'cd'
+        assert ('ls', 'lst') in self.matcher.phonetic_keys
+
+    def test_exact_key_lookup(self):
+        """Identical skeletons score 1.0 without a fuzzy scan"""
+        command, score, metadata = self.matcher.match('lyst')
+        assert (command, score) == ('ls', 1.0)
+        assert metadata['algorithm'] == 'PhoneticMatcher'
+
+    def test_matches_brute_force(self):
+        """Indexed lookup returns the same command and score as the full scan"""
+        for text in ['liss', 'prcesses', 'dsk usge', 'kopy', 'remoove', 'find all files',
+                     'secure shel', 'zp', 'aeiou', '123', 'show me', 'pees', 'tape']:
+            for threshold in (0.6, 0.75):
+                result = self.matcher.match(text, threshold)
+                expected = self.brute_force(text, threshold)
+                assert (result[:2] if result else None) == expected, text
+
+    def test_rebuild_after_mapping_change(self):
+        """Runtime changes to phonetic_mappings apply after a rebuild"""
+        self.matcher.phonetic_mappings['htop'] = ['aitch-top']
+        self.matcher.rebuild_phonetic_index()
+        assert self.matcher.match('aitch top')[0] == 'htop'
+
+
+class TestPathCommands:
+    """Test $PATH scanning in the known command registry"""
+
+    def test_get_path_commands(self, tmp_path, monkeypatch):
+        """Executable files on PATH are reported, other files are not"""
+        tool = tmp_path / 'mytool'
+        tool.write_text('#!/bin/sh\n')
+        tool.chmod(tool.stat().st_mode | stat.S_IXUSR)
+        (tmp_path / 'notes.txt').write_text('text')
+        monkeypatch.setenv('PATH', str(tmp_path) + os.pathsep + str(tmp_path / 'missing'))
+
+        registry = KnownCommandRegistry()
+        commands = registry.get_path_commands()
+        assert 'mytool' in commands
+        assert 'notes.txt' not in commands
+        assert registry.get_path_commands() is commands
@@ -0,0 +1,389 @@
+"""
+Unit tests for the append-only cache log
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from nlcli.storage.cache_index import CacheIndex
+from nlcli.storage.cache_log import CacheLog, HAS_FCNTL, LOG_MAGIC
+from nlcli.storage.file_cache import FileCacheManager, get_input_hash
+
+
+def make_key(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def write_keys(path, prefix, count):
+    log = CacheLog(path)
+    for i in range(count):
+        log.put(make_key(f'{prefix}-{i}'), {'n': i})
+    log.close()
+
+
+class TestCacheLog(unittest.TestCase):
+    """Test cases for CacheLog"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / 'cache.log'
+        self.log = CacheLog(self.path)
+
+    def tearDown(self):
+        self.log.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_put_get_delete(self):
+        """Latest value wins and deletes are tombstoned"""
+        key = make_key('a')
+        self.log.put(key, {'command': 'ls'})
+        self.log.put(key, {'command': 'ls -la'})
+        self.assertEqual(self.log.get(key), {'command': 'ls -la'})
+        self.assertEqual(len(self.log), 1)
+
+        self.assertTrue(self.log.delete(key))
+        self.assertFalse(self.log.delete(key))
+        self.assertIsNone(self.log.get(key))
+
+    def test_reopen_restores_index(self):
+        """A new instance sees the same live records"""
+        keys = [make_key(str(i)) for i in range(20)]
+        self.log.put_many((key, {'n': i}) for i, key in enumerate(keys))
+        self.log.delete(keys[0])
+
+        reopened = CacheLog(self.path)
+        self.assertEqual(len(reopened), 19)
+        self.assertEqual(reopened.get(keys[5]), {'n': 5})
+        self.assertNotIn(keys[0], reopened)
+        reopened.close()
+
+    def test_writes_append_only(self):
+        """A put grows the file by one record instead of rewriting it"""
+        self.log.put_many((make_key(str(i)), {'n': i}) for i in range(100))
+        before = self.path.read_bytes()
+        self.log.put(make_key('new'), {'n': 'new'})
+        after = self.path.read_bytes()
+        self.assertTrue(after.startswith(before))
+        self.assertLess(len(after) - len(before), 100)
+
+    def test_refresh_sees_other_writer(self):
+        """Records appended by another instance become visible after refresh"""
+        other = CacheLog(self.path)
+        other.put(make_key('x'), {'command': 'pwd'})
+        self.log.refresh()
+        self.assertEqual(self.log.get(make_key('x')), {'command': 'pwd'})
+        other.close()
+
+    def test_torn_tail_ignored_and_truncated(self):
+        """An interrupted record is skipped on read and cut off by the next write"""
+        self.log.put(make_key('a'), {'command': 'ls'})
+        with open(self.path, 'ab') as f:
+            f.write(b'\x40\x00\x00\x00\x00' + b'\x11' * 10)
+
+        reopened = CacheLog(self.path)
+        self.assertEqual(len(reopened), 1)
+        reopened.put(make_key('b'), {'command': 'pwd'})
+        reopened.close()
+
+        again = CacheLog(self.path)
+        self.assertEqual(again.get(make_key('a')), {'command': 'ls'})
+        self.assertEqual(again.get(make_key('b')), {'command': 'pwd'})
+        again.close()
+
+    def test_compaction_drops_superseded_records(self):
+        """Compaction keeps only live values and other instances follow it"""
+        key = make_key('a')
+        for i in range(50):
+            self.log.put(key, {'n': i})
+        other = CacheLog(self.path)
+        size = self.log.size_bytes
+
+        self.log.compact()
+        self.assertLess(self.log.size_bytes, size / 10)
+        self.assertTrue(self.path.read_bytes().startswith(LOG_MAGIC))
+
+        other.refresh()
+        self.assertEqual(other.get(key), {'n': 49})
+        other.close()
+
+    def test_compaction_keeps_log_when_replace_fails(self):
+        """A log that cannot be replaced (open elsewhere on Windows) stays usable"""
+        key = make_key('a')
+        for i in range(5):
+            self.log.put(key, {'n': i})
+        replace = os.replace
+
+        def replace_except_log(source, target):
+            if Path(target) == self.path:
+                raise PermissionError('in use')
+            replace(source, target)
+
+        with patch('os.replace', side_effect=replace_except_log):
+            self.log.compact()
+        self.assertFalse(self.path.with_suffix('.compact').exists())
+        self.assertEqual(self.log.get(key), {'n': 4})
+        self.log.put(key, {'n': 5})
+        self.assertEqual(CacheLog(self.path).get(key), {'n': 5})
+
+    def test_without_pread(self):
+        """Reads fall back to seek and read where os.pread is missing"""
+        self.log.close()
+        with patch('nlcli.storage.cache_log.HAS_PREAD', False):
+            write_keys(self.path, 'a', 20)
+            log = CacheLog(self.path)
+            self.assertEqual(log.get(make_key('a-7')), {'n': 7})
+            log.put(make_key('a-7'), {'n': 70})
+            log.compact()
+            self.assertEqual(dict(log.items())[make_key('a-7')], {'n': 70})
+            log.close()
+        self.log = CacheLog(self.path)
+
+    def test_automatic_compaction(self):
+        """The log compacts itself once mostly dead"""
+        log = CacheLog(Path(self.temp_dir) / 'auto.log', compact_min_bytes=1024)
+        key = make_key('a')
+        for i in range(200):
+            log.put(key, {'n': i, 'padding': 'x' * 20})
+        self.assertLess(log.size_bytes, 1024 * 2)
+        self.assertEqual(log.get(key)['n'], 199)
+        log.close()
+
+    @unittest.skipUnless(HAS_FCNTL, "requires fcntl")
+    def test_concurrent_processes_lose_no_writes(self):
+        """Appends from several processes all end up indexed"""
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=write_keys, args=(self.path, name, 100)) for name in 'abc']
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+
+        self.log.refresh()
+        self.assertEqual(len(self.log), 300)
+        self.assertEqual(self.log.get(make_key('b-99')), {'n': 99})
+
+    def test_update_many_merges_latest_value(self):
+        """The merge function sees writes made by another instance"""
+        key = make_key('a')
+        other = CacheLog(self.path)
+        self.log.put(key, {'count': 1})
+        other.put(key, {'count': 5})
+        self.log.update_many([key], lambda _, value: dict(value, count=value['count'] + 1))
+        self.assertEqual(other.get(key), {'count': 6})
+        other.close()
+
+    def test_unencodable_record_dropped(self):
+        """A value that cannot be encoded is skipped without losing the rest of the batch"""
+        good, bad = make_key('good'), make_key('bad')
+        self.assertEqual(self.log.put_many([(bad, {'value': object()}), (good, {'command': 'ls'})]), 1)
+        self.assertEqual(self.log.get(good), {'command': 'ls'})
+        self.assertNotIn(bad, self.log)
+
+    def test_rejects_foreign_file(self):
+        """A file without the log header is not parsed"""
+        path = Path(self.temp_dir) / 'other.log'
+        path.write_text('{"not": "a log"}')
+        with self.assertRaises(ValueError):
+            CacheLog(path)
+
+
+class TestCacheIndex(unittest.TestCase):
+    """Test cases for the memory-mapped index"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / 'cache.idx'
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_apply_lookup_and_tombstone(self):
+        """Puts overwrite, deletes leave a tombstone"""
+        index = CacheIndex(self.path, log_inode=1)
+        digest = bytes.fromhex(make_key('a'))
+        index.apply(digest, 100, 10, 110)
+        index.apply(digest, 200, 20, 220)
+        self.assertEqual(index.lookup(digest), (200, 20))
+        self.assertEqual((index.live, index.live_bytes, index.indexed_end), (1, 20, 220))
+
+        index.apply(digest, 0, None, 260)
+        self.assertIsNone(index.lookup(digest))
+        self.assertEqual(index.live, 0)
+        index.close()
+
+    def test_growth_keeps_entries(self):
+        """The table is rebuilt larger once the load factor is reached"""
+        index = CacheIndex(self.path, log_inode=1, min_capacity=8)
+        digests = [bytes.fromhex(make_key(str(i))) for i in range(100)]
+        for i, digest in enumerate(digests):
+            index.apply(digest, i * 10, 5, i * 10 + 5)
+        self.assertTrue(all(index.lookup(digest) == (i * 10, 5) for i, digest in enumerate(digests)))
+        self.assertEqual(index.live, 100)
+        index.close()
+
+    def test_stale_index_discarded(self):
+        """An index written for another log is recreated empty"""
+        index = CacheIndex(self.path, log_inode=1)
+        index.apply(bytes.fromhex(make_key('a')), 100, 10, 110)
+        index.close()
+
+        index = CacheIndex(self.path, log_inode=2)
+        self.assertEqual((index.live, index.indexed_end), (0, 0))
+        index.close()
+
+    def test_log_reopen_uses_index(self):
+        """Opening a log only indexes records appended after the index"""
+        log = CacheLog(Path(self.temp_dir) / 'cache.log')
+        log.put_many((make_key(str(i)), {'n': i}) for i in range(50))
+        log.close()
+
+        reopened = CacheLog(Path(self.temp_dir) / 'cache.log')
+        self.assertEqual(reopened.size_bytes, os.path.getsize(Path(self.temp_dir) / 'cache.log'))
+        self.assertEqual(reopened.get(make_key('7')), {'n': 7})
+        reopened.close()
+
+    def test_shared_between_processes_without_rescan(self):
+        """A second instance sees a new key through the shared index"""
+        first = CacheLog(Path(self.temp_dir) / 'cache.log')
+        second = CacheLog(Path(self.temp_dir) / 'cache.log')
+        first.put(make_key('a'), {'command': 'ls'})
+        self.assertEqual(second.get(make_key('a')), {'command': 'ls'})
+        first.close()
+        second.close()
+
+
+class TestFileCacheLog(unittest.TestCase):
+    """Test FileCacheManager on top of the log"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = FileCacheManager(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_shared_between_instances(self):
+        """A flushed write is visible to another instance"""
+        self.cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        self.cache.flush()
+        other = FileCacheManager(self.temp_dir)
+        result = other.get_cached_translation('list files', 'linux')
+        self.assertEqual(result['command'], 'ls')
+        self.assertEqual(result['cache_source'], 'file')
+
+    def test_loosely_typed_result_persisted(self):
+        """String or missing confidence values are converted instead of blocking the flush"""
+        self.cache.cache_translation('list files', 'linux', {'command': 'ls', 'confidence': '0.9'})
+        self.cache.cache_translation('show disk', 'linux', {'command': 'df -h', 'confidence': None})
+        self.cache.cache_translation('show date', 'linux', {'command': 'date', 'confidence': 'high'})
+        self.cache.flush()
+        self.assertEqual(self.cache._pending, {})
+
+        other = FileCacheManager(self.temp_dir)
+        self.assertEqual(other.get_cached_translation('list files', 'linux')['confidence'], 0.9)
+        self.assertEqual(other.get_cached_translation('show disk', 'linux')['confidence'], 0.0)
+        self.assertEqual(other.get_cached_translation('show date', 'linux')['confidence'], 0.0)
+
+    def test_use_count_persisted_on_save(self):
+        """Usage updates are appended on flush"""
+        self.cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        self.cache.get_cached_translation('list files', 'linux')
+        self.cache.force_save()
+
+        other = FileCacheManager(self.temp_dir)
+        self.assertEqual(other.get_cached_translation('list files', 'linux')['use_count'], 3)
+
+    def test_popular_commands_survive_restart(self):
+        """Ranking is built from the log, not only from entries used in this process"""
+        self.cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        self.cache.cache_translation('show disk', 'linux', {'command': 'df -h'})
+        for _ in range(3):
+            self.cache.get_cached_translation('show disk', 'linux')
+        self.cache.flush()
+
+        other = FileCacheManager(self.temp_dir)
+        popular = other.get_popular_commands(limit=5)
+        self.assertEqual([(entry['command'], entry['use_count']) for entry in popular],
+                         [('df -h', 4), ('ls', 1)])
+
+        # Unflushed uses count too
+        for _ in range(4):
+            other.get_cached_translation('list files', 'linux')
+        top = other.get_popular_commands(limit=1)[0]
+        self.assertEqual((top['command'], top['use_count']), ('ls', 5))
+
+    def test_use_counts_merged_between_instances(self):
+        """Uses counted by two instances are added, not overwritten"""
+        self.cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        self.cache.flush()
+        other = FileCacheManager(self.temp_dir)
+        for _ in range(3):
+            self.cache.get_cached_translation('list files', 'linux')
+        for _ in range(2):
+            other.get_cached_translation('list files', 'linux')
+        self.cache.force_save()
+        other.force_save()
+
+        stored = self.cache.log.get(get_input_hash('list files', 'linux'))
+        self.assertEqual(stored['use_count'], 6)
+
+    def test_legacy_json_imported(self):
+        """An existing translation_cache.json is moved into the log once"""
+        legacy_dir = tempfile.mkdtemp()
+        try:
+            key = get_input_hash('show disk', 'linux')
+            with open(os.path.join(legacy_dir, 'translation_cache.json'), 'w') as f:
+                json.dump({key: {'command': 'df -h', 'platform': 'linux'}}, f)
+
+            cache = FileCacheManager(legacy_dir)
+            self.assertEqual(cache.get_cached_translation('show disk', 'linux')['command'], 'df -h')
+            self.assertFalse(os.path.exists(os.path.join(legacy_dir, 'translation_cache.json')))
+            self.assertEqual(FileCacheManager(legacy_dir).get_cache_stats()['total_entries'], 1)
+        finally:
+            shutil.rmtree(legacy_dir)
+
+    def test_cleanup_compacts(self):
+        """Old entries are removed from memory and the log"""
+        self.cache.cache_translation('old', 'linux', {'command': 'ls'})
+        self.cache.cache_translation('new', 'linux', {'command': 'pwd'})
+        key = get_input_hash('old', 'linux')
+        old_entry = self.cache.memory_cache[key]
+        old_entry.last_used -= 40 * 24 * 3600
+        self.cache.log.put(key, old_entry.to_dict())
+
+        self.assertEqual(self.cache.cleanup_old_entries(days=30), 1)
+        other = FileCacheManager(self.temp_dir)
+        self.assertIsNone(other.get_cached_translation('old', 'linux'))
+        self.assertEqual(other.get_cached_translation('new', 'linux')['command'], 'pwd')
+
+    def test_lazy_open(self):
+        """No cache file is opened until the first lookup"""
+        cache = FileCacheManager(os.path.join(self.temp_dir, 'lazy'))
+        self.assertFalse(os.path.exists(cache.cache_file))
+        self.assertIsNone(cache._log)
+
+        self.assertIsNone(cache.get_cached_translation('list files', 'linux'))
+        self.assertTrue(os.path.exists(cache.cache_file))
+        cache.close()
+
+    def test_prefetch_opens_log(self):
+        """Prefetch opens the log in a background thread"""
+        self.cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        self.cache.flush()
+
+        other = FileCacheManager(self.temp_dir)
+        other.prefetch().join(5)
+        self.assertIsNotNone(other._log)
+        self.assertEqual(other.get_cached_translation('list files', 'linux')['cache_source'], 'file')
+        other.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
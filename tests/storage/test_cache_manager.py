@@ -196,7 +196,76 @@ class TestCacheManager(unittest.TestCase):
         stats = self.cache_manager.get_cache_stats()
         self.assertEqual(stats.get('total_hits', 0), 2)
         self.assertEqual(stats.get('hit_rate', 0.0), 50.0)  # 2 hits out of 4 attempts = 50%
+    
+    def test_entry_ttl(self):
+        """Expired entries are treated as misses"""
+        translation_data = {'command': 'ls', 'explanation': 'List files', 'confidence': 0.9}
+        self.cache_manager.cache_translation('list files', 'Linux', translation_data, ttl=-1)
+        
+        self.assertIsNone(self.cache_manager.get_cached_translation('list files', 'Linux'))
+        self.assertEqual(self.cache_manager.get_cache_stats()['stale'], 1)
+    
+    def test_context_hash_invalidation(self):
+        """Entries tied to a context are only returned for that context"""
+        translation_data = {'command': 'git status', 'explanation': 'Show status', 'confidence': 0.9}
+        self.cache_manager.cache_translation('what changed', 'Linux', translation_data, context_hash='ctx-1')
+        
+        self.assertIsNotNone(self.cache_manager.get_cached_translation('what changed', 'Linux', 'ctx-1'))
+        self.assertIsNone(self.cache_manager.get_cached_translation('what changed', 'Linux', 'ctx-2'))
+        
+        # Context independent entries survive context changes
+        self.cache_manager.cache_translation('lsit', 'Linux', {'command': 'ls', 'explanation': 'Typo'})
+        self.assertIsNotNone(self.cache_manager.get_cached_translation('lsit', 'Linux', 'ctx-2'))
+    
+    def test_negative_entry(self):
+        """Failed translations are remembered with a negative marker"""
+        self.cache_manager.cache_translation('gibberish', 'Linux', {}, ttl=60, negative=True)
+        
+        result = self.cache_manager.get_cached_translation('gibberish', 'Linux')
+        self.assertTrue(result['negative'])
+        self.assertEqual(self.cache_manager.get_cache_stats()['negative_hits'], 1)
+
+    
+    def test_batch_get_put(self):
+        """put_many and get_many match the single-key API"""
+        items = [(f'request {i}', {'command': f'echo {i}', 'explanation': 'Echo'}) for i in range(20)]
+        self.cache_manager.put_many(items, 'Linux')
+        
+        results = self.cache_manager.get_many(['request 3', 'missing', 'request 19', 'request 3'], 'Linux')
+        self.assertEqual(results[0]['command'], 'echo 3')
+        self.assertIsNone(results[1])
+        self.assertEqual(results[2]['command'], 'echo 19')
+        self.assertEqual(results[3]['use_count'], 3)
+        
+        single = self.cache_manager.get_cached_translation('request 5', 'Linux')
+        self.assertEqual(single['command'], 'echo 5')
+        self.assertEqual(self.cache_manager.get_cache_stats()['total_entries'], 20)
+    
+    def test_batch_get_put_sqlite(self):
+        """The SQLite backend supports the same batch calls"""
+        sqlite_manager = CacheManager(os.path.join(self.temp_dir, 'sqlite'), use_file_cache=False)
+        items = [(f'request {i}', {'command': f'echo {i}', 'explanation': 'Echo'}) for i in range(600)]
+        sqlite_manager.put_many(items, 'Linux')
+        
+        texts = [f'request {i}' for i in range(0, 600, 7)] + ['missing']
+        results = sqlite_manager.get_many(texts, 'Linux')
+        self.assertEqual([r['command'] for r in results[:-1]], [f'echo {i}' for i in range(0, 600, 7)])
+        self.assertIsNone(results[-1])
+        self.assertEqual(results[0]['use_count'], 2)
+        self.assertEqual(sqlite_manager.get_cached_translation('request 7', 'Linux')['use_count'], 3)
+    
+    def test_sqlite_context_and_expiry(self):
+        """The SQLite backend honours context_hash and ttl like the file cache"""
+        sqlite_manager = CacheManager(os.path.join(self.temp_dir, 'sqlite'), use_file_cache=False)
+        sqlite_manager.cache_translation('last commit', 'Linux', {'command': 'git log -1'}, context_hash='repo-a')
+        sqlite_manager.cache_translation('weather', 'Linux', {'command': 'curl wttr.in'}, ttl=-1)
+        
+        self.assertEqual(sqlite_manager.get_cached_translation('last commit', 'Linux', 'repo-a')['command'],
+                         'git log -1')
+        self.assertIsNone(sqlite_manager.get_cached_translation('last commit', 'Linux', 'repo-b'))
+        self.assertIsNone(sqlite_manager.get_many(['last commit'], 'Linux', 'repo-b')[0])
+        self.assertIsNone(sqlite_manager.get_cached_translation('weather', 'Linux'))
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -8,6 +8,7 @@ import pytest
 import tempfile
 import os
 import json
+import time
 from unittest.mock import patch, mock_open
 from nlcli.storage.file_history import FileHistoryManager
 
@@ -19,6 +20,7 @@ class TestFileHistoryManager:
         """Set up test environment for each test"""
         self.test_dir = tempfile.mkdtemp()
         self.history_file = os.path.join(self.test_dir, 'command_history.json')
+        self.binary_history_file = os.path.join(self.test_dir, 'command_history.bin')
         self.stats_file = os.path.join(self.test_dir, 'history_stats.json')
         self.manager = FileHistoryManager(self.test_dir)
     
@@ -29,9 +31,9 @@ class TestFileHistoryManager:
     
     def test_initialization(self):
         """Test FileHistoryManager initialization"""
-        assert str(self.manager.history_file) == self.history_file
+        assert str(self.manager.history_file) == self.binary_history_file
         assert str(self.manager.stats_file) == self.stats_file
-        assert self.manager.entries == []
+        assert list(self.manager.entries) == []
         stats = self.manager.get_statistics()
         assert stats['total_commands'] == 0
         assert stats['successful_commands'] == 0
@@ -175,18 +177,14 @@ class TestFileHistoryManager:
         self.manager.force_save()
         
         # Verify file exists and contains data
-        assert os.path.exists(self.history_file)
+        assert os.path.exists(self.binary_history_file)
         assert os.path.exists(self.stats_file)
         
-        with open(self.history_file, 'r') as f:
-            data = json.load(f)
-            # File format may include metadata, check entries
-            if 'entries' in data:
-                assert len(data['entries']) >= 1
-                assert data['entries'][0]['natural_language'] == "test cmd"
-            else:
-                assert len(data) >= 1
-                assert data[0]['natural_language'] == "test cmd"
+        with open(self.binary_history_file, 'rb') as f:
+            entries, metadata = self.manager.serializer.load_table(f.read())
+            assert len(entries) >= 1
+            assert entries[0]['natural_language'] == "test cmd"
+            assert metadata['next_id'] == 2
         
         with open(self.stats_file, 'r') as f:
             stats = json.load(f)
@@ -228,7 +226,7 @@ class TestFileHistoryManager:
         
         # Should handle gracefully and start fresh
         manager = FileHistoryManager(self.test_dir)
-        assert manager.entries == []
+        assert list(manager.entries) == []
     
     def test_file_write_error_handling(self):
         """Test handling of file write errors"""
@@ -339,6 +337,151 @@ class TestFileHistoryManager:
         loaded_entries = [e for e in manager.entries if e.natural_language == 'old cmd']
         assert len(loaded_entries) >= 1
     
+    def test_json_history_converted(self):
+        """An existing JSON history is converted to the binary format once"""
+        with open(self.history_file, 'w') as f:
+            json.dump({'entries': [{'id': 7, 'natural_language': 'old cmd', 'command': 'ls',
+                                    'timestamp': 1234567890.0}], 'next_id': 8}, f)
+        
+        manager = FileHistoryManager(self.test_dir)
+        assert [e.natural_language for e in manager.entries] == ['old cmd']
+        assert manager.add_command("new cmd", "pwd", "", True) == 8
+        assert not os.path.exists(self.history_file)
+        assert os.path.exists(self.history_file + '.migrated')
+        
+        reloaded = FileHistoryManager(self.test_dir)
+        assert [e.natural_language for e in reloaded.entries] == ['new cmd', 'old cmd']
+    
+    def test_unreadable_json_history_quarantined(self):
+        """A history that cannot be decoded is set aside as .corrupt"""
+        with open(self.history_file, 'w') as f:
+            f.write('{"entries": [')
+        
+        manager = FileHistoryManager(self.test_dir)
+        assert len(manager.entries) == 0
+        assert os.path.exists(self.history_file + '.corrupt')
+    
+    def test_history_kept_when_conversion_cannot_write(self):
+        """An I/O error leaves the history in place for the next start"""
+        with open(self.history_file, 'w') as f:
+            json.dump({'entries': [{'id': 1, 'natural_language': 'old cmd', 'command': 'ls',
+                                    'timestamp': 1234567890.0}], 'next_id': 2}, f)
+        
+        with patch('pathlib.Path.write_bytes', side_effect=OSError('disk full')):
+            FileHistoryManager(self.test_dir).entries
+        assert os.path.exists(self.history_file)
+        assert not os.path.exists(self.history_file + '.corrupt')
+        assert [p for p in os.listdir(self.test_dir) if p.endswith('.tmp')] == []
+        
+        manager = FileHistoryManager(self.test_dir)
+        assert [e.natural_language for e in manager.entries] == ['old cmd']
+    
+    def test_json_serializer_option(self):
+        """The JSON format is still available"""
+        manager = FileHistoryManager(self.test_dir, serializer='json')
+        manager.add_command("test cmd", "echo test", "", True)
+        manager.force_save()
+        with open(self.history_file) as f:
+            assert json.load(f)['entries'][0]['command'] == 'echo test'
+    
+    def test_add_command_appends_to_journal(self):
+        """Each command appends one record instead of rewriting the history"""
+        self.manager.add_command("cmd1", "ls", "List", True)
+        journal = self.manager.journal_file.read_bytes()
+        self.manager.add_command("cmd2", "pwd", "Print dir", False)
+        
+        assert self.manager.journal_file.read_bytes().startswith(journal)
+        assert not os.path.exists(self.binary_history_file)
+        
+        reloaded = FileHistoryManager(self.test_dir)
+        assert [e.command for e in reloaded.entries] == ['pwd', 'ls']
+        assert reloaded.next_id == 3
+        assert reloaded.get_statistics()['total_commands'] == 2
+        assert reloaded.get_statistics()['successful_commands'] == 1
+    
+    def test_journal_compacted_in_background(self):
+        """The snapshot is rewritten once the journal outgrows max_entries"""
+        manager = FileHistoryManager(self.test_dir, max_entries=10)
+        for i in range(11):
+            manager.add_command(f"cmd{i}", f"echo {i}", "", True)
+        manager._compactor.join(5)
+        
+        assert not manager.journal_file.exists()
+        reloaded = FileHistoryManager(self.test_dir, max_entries=10)
+        assert len(reloaded.entries) == 10
+        assert reloaded.entries[0].command == 'echo 10'
+        assert reloaded.get_statistics()['total_commands'] == 11
+    
+    def test_journal_after_snapshot_not_duplicated(self):
+        """Journal records already in the snapshot are skipped on load"""
+        self.manager.add_command("cmd1", "ls", "List", True)
+        journal = self.manager.journal_file.read_bytes()
+        self.manager.force_save()
+        with open(self.manager.journal_file, 'wb') as f:
+            f.write(journal)
+        
+        reloaded = FileHistoryManager(self.test_dir)
+        assert [e.command for e in reloaded.entries] == ['ls']
+    
+    def test_torn_journal_record_dropped(self):
+        """An interrupted append is cut off and later appends stay readable"""
+        self.manager.add_command("cmd1", "ls", "List", True)
+        with open(self.manager.journal_file, 'ab') as f:
+            f.write(b'\x40\x00\x00\x00partial')
+        
+        manager = FileHistoryManager(self.test_dir)
+        manager.add_command("cmd2", "pwd", "Print dir", True)
+        
+        reloaded = FileHistoryManager(self.test_dir)
+        assert [e.command for e in reloaded.entries] == ['pwd', 'ls']
+    
+    def test_statistics_saved_without_compaction(self):
+        """Counters reach the stats file before the next compaction, without double counting on load"""
+        self.manager.add_command("cmd1", "ls", "List", True)
+        self.manager.add_command("cmd2", "pwd", "Print dir", False)
+        self.manager.search_commands("ls")
+        assert self.manager.flush_due(time.time() + 60)
+        self.manager.flush()
+        assert not self.manager.flush_due(time.time() + 60)
+        
+        reloaded = FileHistoryManager(self.test_dir)
+        stats = reloaded.get_statistics()
+        assert (stats['total_commands'], stats['successful_commands'], stats['searches_performed']) == (2, 1, 1)
+    
+    def test_instances_sharing_history_lose_no_commands(self):
+        """Appends of another process are picked up before compaction drops the journal"""
+        other = FileHistoryManager(self.test_dir)
+        self.manager.add_command("cmd1", "ls", "List", True)
+        other.add_command("cmd2", "pwd", "Print dir", True)
+        self.manager.add_command("cmd3", "date", "Show date", True)
+        self.manager.force_save()
+        other.add_command("cmd4", "whoami", "Show user", True)
+        
+        reloaded = FileHistoryManager(self.test_dir)
+        assert [(e.id, e.command) for e in reloaded.entries] == [(4, 'whoami'), (3, 'date'), (2, 'pwd'), (1, 'ls')]
+    
+    def test_lazy_loading(self):
+        """The history file is not read until the first access"""
+        self.manager.add_command("test cmd", "echo test", "", True)
+        
+        with patch.object(FileHistoryManager, '_load_from_file') as load:
+            manager = FileHistoryManager(self.test_dir)
+            load.assert_not_called()
+        
+        manager = FileHistoryManager(self.test_dir)
+        assert not manager._loaded
+        assert manager.get_statistics()['total_commands'] == 1
+        assert [e.command for e in manager.entries] == ['echo test']
+    
+    def test_prefetch(self):
+        """Prefetch loads the history in the background"""
+        self.manager.add_command("test cmd", "echo test", "", True)
+        
+        manager = FileHistoryManager(self.test_dir)
+        manager.prefetch().join(5)
+        assert manager._loaded
+        assert manager._entries[0].command == 'echo test'
+    
     def test_performance_metrics(self):
         """Test performance of file operations"""
         import time
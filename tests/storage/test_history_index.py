@@ -0,0 +1,115 @@
+"""
+Unit tests for the command history search index
+"""
+
+import random
+import shutil
+import tempfile
+import unittest
+
+from nlcli.storage.file_history import FileHistoryManager, HistoryEntry
+from nlcli.storage.history_index import FAILURE_PENALTY, HistorySearchIndex
+
+
+def make_entry(i, natural_language, command, success=True):
+    return HistoryEntry(id=i, natural_language=natural_language, command=command,
+                        success=success, timestamp=1.7e9 + i)
+
+
+class TestHistorySearchIndex(unittest.TestCase):
+    """Test cases for HistorySearchIndex"""
+
+    def setUp(self):
+        self.index = HistorySearchIndex()
+        self.entries = [
+            make_entry(1, 'list files', 'ls'),
+            make_entry(2, 'show processes', 'ps aux'),
+            make_entry(3, 'list directories', 'ls -d */'),
+        ]
+        self.index.add_all(self.entries)
+
+    def test_substring_match_newest_first(self):
+        """Trigram queries match inside words, newest first"""
+        results = self.index.search('ist')
+        self.assertEqual([e.id for e in results], [3, 1])
+        self.assertEqual([e.id for e in self.index.search('PROC')], [2])
+        self.assertEqual(self.index.search('nonexistent'), [])
+
+    def test_short_query(self):
+        """Queries under three characters still match substrings"""
+        self.assertEqual([e.id for e in self.index.search('ps')], [2])
+
+    def test_failed_commands_ranked_lower(self):
+        """A recent failure ranks below an older success"""
+        failed = HistoryEntry(id=4, natural_language='list all', command='ls -a',
+                              success=False, timestamp=1.7e9 + 10)
+        self.index.add(failed)
+        self.assertEqual([e.id for e in self.index.search('list')], [3, 1, 4])
+
+        recent = HistoryEntry(id=5, natural_language='list more', command='ls',
+                              success=False, timestamp=1.7e9 + 3 + FAILURE_PENALTY + 1)
+        self.index.add(recent)
+        self.assertEqual(self.index.search('list', limit=1)[0].id, 5)
+
+    def test_remove(self):
+        """Removed entries are no longer found"""
+        self.index.remove(self.entries[0])
+        self.index.remove(self.entries[2])
+        self.assertEqual(self.index.search('list'), [])
+        self.assertEqual(len(self.index), 1)
+
+    def test_word_mode(self):
+        """Without trigrams every query word must appear as a word"""
+        index = HistorySearchIndex(use_trigrams=False)
+        index.add_all(self.entries)
+        self.assertEqual([e.id for e in index.search('list files')], [1])
+        self.assertEqual(index.search('ist'), [])
+
+    def test_matches_linear_scan(self):
+        """Top results agree with ranking every entry"""
+        rng = random.Random(7)
+        words = ['git', 'status', 'push', 'list', 'files', 'docker', 'ps', 'logs', 'kill', 'port']
+        index = HistorySearchIndex()
+        entries = []
+        for i in range(2000):
+            text = ' '.join(rng.choice(words) for _ in range(3))
+            entries.append(make_entry(i, text, text.replace(' ', '-'), success=rng.random() > 0.3))
+        index.add_all(entries)
+
+        for query in ['git', 'ps', 'docker logs', 'us', 'ill po']:
+            expected = sorted(
+                (e for e in entries if query in e.natural_language or query in e.command),
+                key=lambda e: (e.timestamp - (0 if e.success else FAILURE_PENALTY), e.id),
+                reverse=True
+            )[:10]
+            self.assertEqual([e.id for e in index.search(query)], [e.id for e in expected])
+
+
+class TestFileHistorySearch(unittest.TestCase):
+    """Test the index kept by FileHistoryManager"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # The background flusher may still be saving statistics into the directory
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_index_follows_evictions_and_reload(self):
+        """Evicted entries leave the index and a reload rebuilds it"""
+        manager = FileHistoryManager(self.temp_dir, max_entries=5)
+        for i in range(8):
+            manager.add_command(f'request {i}', f'echo {i}', '', True)
+        self.assertEqual([r['command'] for r in manager.search_commands('request')],
+                         ['echo 7', 'echo 6', 'echo 5', 'echo 4', 'echo 3'])
+        self.assertEqual(manager.search_commands('request 1'), [])
+
+        reloaded = FileHistoryManager(self.temp_dir, max_entries=5)
+        self.assertEqual(reloaded.search_commands('echo 3')[0]['natural_language'], 'request 3')
+
+        reloaded.clear_command_history()
+        self.assertEqual(reloaded.search_commands('request'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
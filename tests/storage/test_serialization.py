@@ -0,0 +1,112 @@
+"""
+Unit tests for record serializers and format migration
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from nlcli.storage.cache_log import CacheLog, read_log_format
+from nlcli.storage.cache_migrator import CacheMigrator
+from nlcli.storage.file_cache import CacheEntry, FileCacheManager
+from nlcli.storage.file_history import HistoryEntry
+from nlcli.storage.serialization import BinarySerializer, JSONSerializer, get_serializer
+
+
+class TestSerializers(unittest.TestCase):
+    """Test binary and JSON serializers"""
+
+    def setUp(self):
+        self.entry = CacheEntry(command='find . -name "*.py"', explanation='Find Python files — ünïcode',
+                                confidence=0.95, created_at=1.5, last_used=2.5, use_count=3,
+                                platform='linux', context_hash='abc', negative=False)
+
+    def test_slot_record(self):
+        """Entries have no __dict__ and compare by value"""
+        self.assertFalse(hasattr(self.entry, '__dict__'))
+        self.assertEqual(CacheEntry.from_dict(self.entry.to_dict()), self.entry)
+        self.assertIn("command='find", repr(self.entry))
+
+    def test_record_round_trip(self):
+        """Single records decode to the same dict"""
+        for serializer in (BinarySerializer(CacheEntry), JSONSerializer(CacheEntry)):
+            data = serializer.dumps(self.entry.to_dict())
+            self.assertEqual(serializer.loads(data), self.entry.to_dict())
+
+    def test_binary_is_smaller(self):
+        """The binary record is more compact than JSON"""
+        record = self.entry.to_dict()
+        self.assertLess(len(BinarySerializer(CacheEntry).dumps(record)), len(JSONSerializer().dumps(record)))
+
+    def test_missing_and_none_fields_use_defaults(self):
+        """Older records without newer fields still encode"""
+        data = BinarySerializer(CacheEntry).dumps({'command': 'ls', 'confidence': None})
+        decoded = BinarySerializer(CacheEntry).loads(data)
+        self.assertEqual((decoded['command'], decoded['confidence'], decoded['source']), ('ls', 0.0, ''))
+
+    def test_values_converted_to_field_types(self):
+        """Numbers given as strings are converted, unconvertible values raise ValueError"""
+        serializer = BinarySerializer(CacheEntry)
+        decoded = serializer.loads(serializer.dumps({'command': 'ls', 'confidence': '0.9', 'use_count': 2.0,
+                                                     'negative': 0}))
+        self.assertEqual((decoded['confidence'], decoded['use_count'], decoded['negative']), (0.9, 2, False))
+        with self.assertRaises(ValueError):
+            serializer.dumps({'command': 'ls', 'confidence': 'high'})
+
+    def test_table_interns_strings(self):
+        """Repeated strings are stored once in a table"""
+        serializer = get_serializer('binary', HistoryEntry)
+        entries = [HistoryEntry(id=i, natural_language='list files', command='ls', timestamp=float(i),
+                                platform='Linux').to_dict() for i in range(1, 101)]
+        data = serializer.dump_table(entries, {'next_id': 101})
+        self.assertEqual(data.count(b'list files'), 1)
+
+        records, metadata = serializer.load_table(data)
+        self.assertEqual(records, entries)
+        self.assertEqual(metadata, {'next_id': 101})
+        with self.assertRaises(ValueError):
+            serializer.load_table(data[:-1])
+
+    def test_unknown_serializer(self):
+        with self.assertRaises(ValueError):
+            get_serializer('xml', CacheEntry)
+
+
+class TestCacheLogMigration(unittest.TestCase):
+    """Test conversion of JSON cache logs"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / 'translation_cache.log'
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_json_log_converted_on_open(self):
+        """A JSON record log is rewritten as binary when FileCacheManager opens it"""
+        cache = FileCacheManager(self.temp_dir, serializer='json', flush_interval=0)
+        cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        cache.close()
+        self.assertEqual(read_log_format(self.log_path), JSONSerializer.format_id)
+
+        cache = FileCacheManager(self.temp_dir)
+        self.assertEqual(cache.get_cached_translation('list files', 'linux')['command'], 'ls')
+        self.assertEqual(read_log_format(self.log_path), BinarySerializer.format_id)
+        self.assertEqual(sorted(p.name for p in Path(self.temp_dir).glob('*migrating*')), [])
+        cache.close()
+
+    def test_matching_format_untouched(self):
+        """Nothing is rewritten when the format already matches"""
+        serializer = BinarySerializer(CacheEntry)
+        log = CacheLog(self.log_path, serializer=serializer)
+        log.put('ab' * 32, CacheEntry(command='ls').to_dict())
+        log.close()
+        inode = self.log_path.stat().st_ino
+
+        self.assertTrue(CacheMigrator(Path(self.temp_dir)).migrate_cache_log(serializer))
+        self.assertEqual(self.log_path.stat().st_ino, inode)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Unit tests for the SQLite history backend
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from nlcli.storage.file_history import FileHistoryManager
+from nlcli.storage.history_manager import HistoryManager
+from nlcli.storage.sqlite_history import SQLiteHistoryManager
+
+
+class TestSQLiteHistoryManager(unittest.TestCase):
+    """Test cases for SQLiteHistoryManager"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'nlcli_history.db')
+        self.manager = SQLiteHistoryManager(self.db_path)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_lazy_open(self):
+        """The database is created on first use"""
+        self.assertFalse(os.path.exists(self.db_path))
+        self.assertEqual(self.manager.get_recent_commands(), [])
+        self.assertTrue(os.path.exists(self.db_path))
+
+    def test_wal_mode_and_indexes(self):
+        """The database uses WAL and indexes the queried columns"""
+        self.manager.add_command('list files', 'ls', 'List', True)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+            indexes = {row[1] for row in conn.execute('PRAGMA index_list(command_history)')}
+        self.assertTrue({'idx_history_timestamp', 'idx_history_success', 'idx_history_session'} <= indexes)
+
+    def test_add_and_read(self):
+        """Commands come back newest first with their fields"""
+        first = self.manager.add_command('list files', 'ls', 'List', True, session_id='s1')
+        second = self.manager.add_command('show processes', 'ps aux', 'Processes', False)
+        self.assertEqual((first, second), (1, 2))
+
+        recent = self.manager.get_recent_commands()
+        self.assertEqual([r['command'] for r in recent], ['ps aux', 'ls'])
+        self.assertIs(recent[0]['success'], False)
+        self.assertEqual(self.manager.get_command_by_id(1)['session_id'], 's1')
+        self.assertIsNone(self.manager.get_command_by_id(99))
+
+    def test_search(self):
+        """Substring search ranks recent successes first"""
+        self.manager.add_command('list files', 'ls', 'List', True)
+        self.manager.add_command('show processes', 'ps aux', 'Processes', True)
+        self.manager.add_command('list directories', 'ls -d */', 'List dirs', False)
+
+        self.assertEqual([r['command'] for r in self.manager.search_commands('ist')], ['ls', 'ls -d */'])
+        self.assertEqual([r['command'] for r in self.manager.search_commands('ps')], ['ps aux'])
+        self.assertEqual(self.manager.search_commands('100%'), [])
+        self.assertEqual(self.manager.get_statistics()['searches_performed'], 3)
+
+    def test_statistics_and_clear(self):
+        """Statistics are computed from the table and reset by clear"""
+        self.manager.add_command('a', 'ls', '', True)
+        self.manager.add_command('b', 'pwd', '', False)
+        stats = self.manager.get_statistics()
+        self.assertEqual((stats['total_commands'], stats['successful_commands'], stats['success_rate']),
+                         (2, 1, 0.5))
+
+        self.manager.clear_command_history()
+        self.assertEqual(self.manager.get_statistics()['total_commands'], 0)
+        self.assertEqual(self.manager.search_commands('pwd'), [])
+        self.assertEqual(self.manager.add_command('c', 'id', '', True), 1)
+
+    def test_recent_natural_language_unique(self):
+        """Repeated requests are listed once, newest first"""
+        for text in ['a', 'b', 'a', 'c']:
+            self.manager.add_command(text, 'ls', '', True)
+        self.assertEqual(self.manager.get_recent_natural_language_commands(limit=2), ['c', 'a'])
+
+    def test_delete_command(self):
+        """Deleted commands disappear from queries and search"""
+        command_id = self.manager.add_command('list files', 'ls', 'List', True)
+        self.assertTrue(self.manager.delete_command(command_id))
+        self.assertFalse(self.manager.delete_command(command_id))
+        self.assertEqual(self.manager.search_commands('list'), [])
+
+    def test_threads_use_own_connections(self):
+        """Concurrent writers from several threads all succeed"""
+        def add(prefix):
+            for i in range(20):
+                self.manager.add_command(f'{prefix} {i}', 'ls', '', True)
+
+        threads = [threading.Thread(target=add, args=(name,)) for name in 'abcd']
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.manager.get_statistics()['total_commands'], 80)
+
+    def test_imports_file_history(self):
+        """A new database starts with the existing file-based history"""
+        file_history = FileHistoryManager(self.temp_dir)
+        file_history.add_command('old one', 'ls', '', True)
+        file_history.add_command('old two', 'pwd', '', False)
+
+        manager = SQLiteHistoryManager(os.path.join(self.temp_dir, 'imported.db'), import_dir=self.temp_dir)
+        self.assertEqual([r['natural_language'] for r in manager.get_recent_commands()], ['old two', 'old one'])
+        manager.close()
+
+        reopened = SQLiteHistoryManager(os.path.join(self.temp_dir, 'imported.db'), import_dir=self.temp_dir)
+        self.assertEqual(reopened.get_statistics()['total_commands'], 2)
+        reopened.close()
+
+
+class TestHistoryManagerBackend(unittest.TestCase):
+    """Test backend selection in HistoryManager"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'nlcli_history.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_default_is_file(self):
+        history = HistoryManager(self.db_path)
+        self.assertIsInstance(history.backend, FileHistoryManager)
+        self.assertIs(history.file_history, history.backend)
+        self.assertFalse(history.delete_command(1))
+
+    def test_sqlite_backend(self):
+        history = HistoryManager(self.db_path, backend='sqlite')
+        self.assertIsInstance(history.backend, SQLiteHistoryManager)
+        command_id = history.add_command('list files', 'ls', 'List', True)
+        self.assertEqual(history.search_commands('files')[0]['command'], 'ls')
+        self.assertTrue(history.delete_command(command_id))
+        history.backend.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Unit tests for write-behind flushing of the file cache
+"""
+
+import gc
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from nlcli.storage.file_cache import FileCacheManager, get_input_hash
+from nlcli.storage.write_behind import WriteBehindFlusher
+
+
+class TestWriteBehind(unittest.TestCase):
+    """Test buffered writes in FileCacheManager"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def stored(self, cache, text):
+        return cache.log.get(get_input_hash(text, 'linux'))
+
+    def test_writes_buffered_until_background_flush(self):
+        """A write reaches the log within the flush interval"""
+        cache = FileCacheManager(self.temp_dir, flush_interval=0.05)
+        cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        self.assertIsNone(self.stored(cache, 'list files'))
+        self.assertEqual(cache.get_cache_stats()['pending_writes'], 1)
+
+        deadline = time.time() + 5
+        while self.stored(cache, 'list files') is None and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.stored(cache, 'list files')['command'], 'ls')
+        cache.close()
+
+    def test_repeated_writes_coalesced(self):
+        """Several writes of one key produce a single record"""
+        cache = FileCacheManager(self.temp_dir, flush_interval=60)
+        for command in ('ls', 'ls -l', 'ls -la'):
+            cache.cache_translation('list files', 'linux', {'command': command})
+        size = cache.log.size_bytes
+        cache.flush()
+        self.assertEqual(self.stored(cache, 'list files')['command'], 'ls -la')
+        self.assertLess(cache.log.size_bytes - size, 400)
+        cache.close()
+
+    def test_full_buffer_flushes_in_writer(self):
+        """The buffer is bounded, a full one is written synchronously"""
+        cache = FileCacheManager(self.temp_dir, flush_interval=60, flush_batch_size=2)
+        for i in range(cache.max_pending):
+            cache.cache_translation(f'request {i}', 'linux', {'command': 'ls'})
+        self.assertEqual(cache.get_cache_stats()['pending_writes'], 0)
+        self.assertEqual(len(cache.log), cache.max_pending)
+        cache.close()
+
+    def test_write_through_when_disabled(self):
+        """flush_interval 0 writes every change immediately"""
+        cache = FileCacheManager(self.temp_dir, flush_interval=0)
+        cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        self.assertEqual(self.stored(cache, 'list files')['command'], 'ls')
+        cache.close()
+
+    def test_evicted_entry_served_from_buffer(self):
+        """An unflushed entry stays readable after leaving the memory cache"""
+        cache = FileCacheManager(self.temp_dir, max_memory_entries=1, flush_interval=60)
+        cache.cache_translation('first', 'linux', {'command': 'ls'})
+        cache.cache_translation('second', 'linux', {'command': 'pwd'})
+        self.assertEqual(cache.get_cached_translation('first', 'linux')['command'], 'ls')
+        cache.close()
+
+    def test_stop_flushes_registered_caches(self):
+        """Shutdown (the atexit hook) flushes what is still buffered"""
+        flusher = WriteBehindFlusher(name='test-flush')
+        cache = FileCacheManager(self.temp_dir, flush_interval=60)
+        flusher.register(cache)
+        cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        flusher.stop()
+        self.assertEqual(self.stored(cache, 'list files')['command'], 'ls')
+        cache.close()
+
+    def test_collected_cache_writes_buffer(self):
+        """A cache dropped without close() still writes what it buffered"""
+        cache = FileCacheManager(self.temp_dir, flush_interval=60)
+        cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        cached = cache.get_cached_translation('list files', 'linux')
+        del cache, cached
+        gc.collect()
+
+        cache = FileCacheManager(self.temp_dir, flush_interval=60)
+        self.assertEqual(self.stored(cache, 'list files')['command'], 'ls')
+        cache.close()
+
+    def test_failed_flush_retried_with_backoff_then_dropped(self):
+        """Writes that keep failing are retried a bounded number of times"""
+        cache = FileCacheManager(self.temp_dir, flush_interval=60)
+        cache.cache_translation('list files', 'linux', {'command': 'ls'})
+        with patch.object(cache.log, 'put_many', side_effect=OSError('disk full')):
+            cache.flush()
+            self.assertEqual(cache.get_cache_stats()['pending_writes'], 1)
+            self.assertFalse(cache.flush_due(time.time() + 60))
+            self.assertTrue(cache.flush_due(time.time() + 600))
+            for _ in range(cache.max_flush_attempts - 1):
+                cache.flush()
+        self.assertEqual(cache.get_cache_stats()['pending_writes'], 0)
+        self.assertIsNone(self.stored(cache, 'list files'))
+
+        cache.cache_translation('show date', 'linux', {'command': 'date'})
+        cache.flush()
+        self.assertEqual(self.stored(cache, 'show date')['command'], 'date')
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()